@@ -0,0 +1,94 @@
+"""Measure the CPU time spent per request with and without the parsed GraphQL document cache.
+
+This simulates a query that takes 200 polls to complete against a fake in-process transport, so
+the numbers only include client-side overhead (rendering, parsing, variables and response decoding).
+
+Run with: `python -m benchmarks.document_cache`
+"""
+
+import time
+from argparse import ArgumentParser
+from typing import Any, Dict, Optional, Type
+
+from gql import gql
+from gql.transport.requests import RequestsHTTPTransport
+from graphql import DocumentNode, ExecutionResult
+
+from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+from dbtsl.api.graphql.protocol import ProtocolOperation
+
+
+class FakeTransport(RequestsHTTPTransport):
+    """An in-process transport that reports RUNNING until the last poll."""
+
+    def __init__(self, url: str, polls: int) -> None:
+        super().__init__(url=url)
+        self.polls = polls
+        self.calls = 0
+
+    def execute(  # pyright: ignore[reportIncompatibleMethodOverride]
+        self, document: DocumentNode, variable_values: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> ExecutionResult:
+        assert variable_values is not None
+        self.calls += 1
+        status = "SUCCESSFUL" if self.calls >= self.polls else "RUNNING"
+        query = {
+            "queryId": variable_values["queryId"],
+            "status": status,
+            "sql": None,
+            "error": None,
+            "totalPages": 1 if status == "SUCCESSFUL" else None,
+            "arrowResult": None,
+        }
+        return ExecutionResult(data={"query": query})
+
+
+class FakeSyncGraphQLClient(SyncGraphQLClient):
+    """A client whose requests are answered in-process by a `FakeTransport`."""
+
+    def __init__(self, polls: int) -> None:
+        # set before the parent constructor, since it creates the transport
+        self.polls = polls
+        super().__init__(server_host="bench", environment_id=1, auth_token="bench", timeout=60, lazy=False)
+
+    def _create_transport(self, url: str, headers: Dict[str, str]) -> RequestsHTTPTransport:
+        return FakeTransport(url, self.polls)
+
+
+class UncachedSyncGraphQLClient(FakeSyncGraphQLClient):
+    """Behaves like the client before documents were cached."""
+
+    def _get_document(self, op: ProtocolOperation[Any, Any]) -> DocumentNode:
+        # the benchmark clients are never lazy
+        return gql(op.render_request_text(lazy=False))
+
+
+def run(cls: Type[FakeSyncGraphQLClient], polls: int) -> float:
+    client = cls(polls)
+    with client.session():
+        start = time.process_time()
+        for _ in range(polls):
+            client.run_many([("get_query_result", {"query_id": "bench", "page_num": 1})])
+        return time.process_time() - start
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--polls", type=int, default=200)
+    p.add_argument("--repeat", type=int, default=10)
+    args = p.parse_args()
+
+    results: Dict[str, float] = {}
+    for name, cls in (("uncached", UncachedSyncGraphQLClient), ("cached", FakeSyncGraphQLClient)):
+        results[name] = min(run(cls, args.polls) for _ in range(args.repeat))
+
+    for name, total_s in results.items():
+        per_request_us = total_s / args.polls * 1e6
+        print(f"{name:>9}: {total_s * 1000:8.2f} ms total, {per_request_us:8.1f} us/request")
+
+    saved_us = (results["uncached"] - results["cached"]) / args.polls * 1e6
+    print(f"    saved: {saved_us:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
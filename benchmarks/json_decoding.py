@@ -0,0 +1,137 @@
+"""Measure how long it takes to parse a large GraphQL metadata response, and how much memory it uses.
+
+The payload is a `metrics` response with `lazy=False`, where every metric inlines all its
+dimensions, measures and entities. This compares:
+- what the transports do with the standard library: decode the body into a string, then parse it
+- parsing the raw body with the standard library
+- parsing the raw body with the fast JSON backend, which is what the transports do when one is installed
+
+Most of the parsing time of such a payload can go to the garbage collector, which runs over and over
+while millions of new containers are created, so times are also reported with the collector paused.
+
+Run with: `python -m benchmarks.json_decoding`
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Any, Callable, Dict, List, Tuple
+
+from dbtsl.api.shared import fast_json
+
+MB = 1024 * 1024
+
+
+def make_metric(i: int, n_dimensions: int) -> Dict[str, Any]:
+    return {
+        "name": f"metric_{i}",
+        "description": f"The metric number {i}, which is very important to the business",
+        "type": "SIMPLE",
+        "label": f"Metric {i}",
+        "requiresMetricTime": False,
+        "queryableGranularities": ["DAY", "WEEK", "MONTH"],
+        "queryableTimeGranularities": ["day", "week", "month"],
+        "dimensions": [
+            {
+                "name": f"dim_{j}",
+                "qualifiedName": f"model__dim_{j}",
+                "description": f"The dimension number {j}",
+                "type": "TIME" if j % 2 else "CATEGORICAL",
+                "label": None,
+                "isPartition": False,
+                "expr": f"column_{j}",
+                "queryableGranularities": ["DAY", "WEEK"] if j % 2 else [],
+                "queryableTimeGranularities": ["day", "week"] if j % 2 else [],
+            }
+            for j in range(n_dimensions)
+        ],
+        "measures": [
+            {"name": f"measure_{i}", "aggTimeDimension": "metric_time", "agg": "SUM", "expr": "amount"},
+        ],
+        "entities": [
+            {"name": "customer", "description": None, "type": "FOREIGN", "role": None, "expr": "customer_id"},
+        ],
+    }
+
+
+def make_payload(size_mb: float, n_dimensions: int) -> bytes:
+    """Make a `metrics` response body of roughly `size_mb` megabytes."""
+    metric_size = len(json.dumps(make_metric(0, n_dimensions)).encode("utf-8"))
+    n_metrics = max(1, int(size_mb * MB / metric_size))
+    response = {"data": {"metrics": [make_metric(i, n_dimensions) for i in range(n_metrics)]}}
+    return json.dumps(response).encode("utf-8")
+
+
+def stdlib_text(body: bytes) -> Any:
+    return json.loads(body.decode("utf-8"))
+
+
+def stdlib_bytes(body: bytes) -> Any:
+    return json.loads(body)
+
+
+def fast(body: bytes) -> Any:
+    return fast_json.loads(body)
+
+
+def best_time(body: bytes, parse: Callable[[bytes], Any], repeat: int, *, pause_gc: bool) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        if pause_gc:
+            gc.disable()
+        start = time.perf_counter()
+        result = parse(body)
+        best = min(best, time.perf_counter() - start)
+        gc.enable()
+        del result
+    return best
+
+
+def measure(body: bytes, parse: Callable[[bytes], Any], repeat: int) -> Tuple[float, float, float]:
+    """Return (peak MB while parsing, best time in seconds, best time in seconds with the GC paused).
+
+    Time is measured separately from memory, since tracing allocations slows everything down.
+    """
+    elapsed_s = best_time(body, parse, repeat, pause_gc=False)
+    paused_s = best_time(body, parse, repeat, pause_gc=True)
+
+    gc.collect()
+    tracemalloc.start()
+    result = parse(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / MB, elapsed_s, paused_s
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--size-mb", type=float, default=50)
+    p.add_argument("--dimensions", type=int, default=100, help="The number of dimensions in each metric")
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    body = make_payload(args.size_mb, args.dimensions)
+    size_mb = len(body) / MB
+    print(f"{size_mb:.1f} MB payload, fast JSON backend: {fast_json.FAST_JSON_BACKEND}")
+    print(f"{'':>16} | {'peak (MB)':>9} | {'time (s)':>8} | {'MB/s':>6} | {'GC paused (s)':>13} | {'MB/s':>6}")
+    parsers: List[Tuple[str, Callable[[bytes], Any]]] = [
+        ("stdlib (text)", stdlib_text),
+        ("stdlib (bytes)", stdlib_bytes),
+    ]
+    if fast_json.FAST_JSON_BACKEND is not None:
+        parsers.append((fast_json.FAST_JSON_BACKEND, fast))
+
+    for name, parse in parsers:
+        peak_mb, elapsed_s, paused_s = measure(body, parse, args.repeat)
+        print(
+            f"{name:>16} | {peak_mb:>9.1f} | {elapsed_s:>8.3f} | {size_mb / elapsed_s:>6.0f} "
+            f"| {paused_s:>13.3f} | {size_mb / paused_s:>6.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Measure how long it takes to decode a large list of dimensions, and how much memory it uses.
+
+This compares:
+- decoding the raw GraphQL response into `Dimension` models with a new mashumaro decoder on each call,
+  which is what `parse_response` used to do
+- decoding it into models, reusing the decoder
+- decoding it into models, then into a table row by row, which is what catalog sync jobs used to do
+- decoding it straight into a table
+
+Python memory is measured with `tracemalloc`, which doesn't see the memory allocated by Arrow, so
+that is reported separately.
+
+Run with: `python -m benchmarks.metadata_decoding`
+"""
+
+import gc
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Any, Callable, Dict, List, Tuple
+
+import pyarrow as pa
+from mashumaro.codecs.basic import decode as mashumaro_decode
+
+from dbtsl.api.graphql.protocol import GraphQLProtocol
+from dbtsl.models import Dimension
+
+MB = 1024 * 1024
+
+
+def make_response(n: int) -> Dict[str, Any]:
+    return {
+        "dimensions": [
+            {
+                "name": f"dim_{i}",
+                "qualifiedName": f"model__dim_{i}",
+                "description": f"The dimension number {i}",
+                "type": "TIME" if i % 2 else "CATEGORICAL",
+                "label": None,
+                "isPartition": False,
+                "expr": None,
+                "queryableGranularities": ["DAY", "WEEK"] if i % 2 else [],
+                "queryableTimeGranularities": ["day", "week"] if i % 2 else [],
+            }
+            for i in range(n)
+        ]
+    }
+
+
+def models_then_table(data: Dict[str, Any]) -> pa.Table:
+    dimensions = GraphQLProtocol.dimensions.parse_response(data)
+    return pa.Table.from_pylist([d.to_dict() for d in dimensions])
+
+
+def models_new_decoder(data: Dict[str, Any]) -> List[Dimension]:
+    return mashumaro_decode(data["dimensions"], List[Dimension])
+
+
+def models(data: Dict[str, Any]) -> List[Any]:
+    return GraphQLProtocol.dimensions.parse_response(data)
+
+
+def table(data: Dict[str, Any]) -> pa.Table:
+    return GraphQLProtocol.dimensions_table.parse_response(data)
+
+
+def measure(data: Dict[str, Any], decode: Callable[[Dict[str, Any]], Any]) -> Tuple[float, float, float]:
+    """Return (peak Python MB while decoding, Arrow MB of the result, seconds).
+
+    Time is measured separately from memory, since tracing allocations slows everything down.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = decode(data)
+    elapsed_s = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    arrow_baseline = pa.total_allocated_bytes()
+    tracemalloc.start()
+    result = decode(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_bytes = pa.total_allocated_bytes() - arrow_baseline
+    del result
+    return peak / MB, arrow_bytes / MB, elapsed_s
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--dimensions", type=int, default=10_000)
+    args = p.parse_args()
+
+    data = make_response(args.dimensions)
+    # warm up mashumaro's lazy compilation
+    models(make_response(1))
+
+    print(f"{args.dimensions} dimensions")
+    print(f"{'':>20} | {'Python peak (MB)':>16} | {'Arrow (MB)':>10} | {'time (s)':>8} | {'records/s':>9}")
+    decoders = (
+        ("models (new decoder)", models_new_decoder),
+        ("models", models),
+        ("models -> table", models_then_table),
+        ("table", table),
+    )
+    for name, decode in decoders:
+        peak_mb, arrow_mb, elapsed_s = measure(data, decode)
+        throughput = args.dimensions / elapsed_s
+        print(f"{name:>20} | {peak_mb:>16.1f} | {arrow_mb:>10.1f} | {elapsed_s:>8.3f} | {throughput:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""A local mock of the Semantic Layer GraphQL API, used by the benchmarks.
+
+It only understands the operations needed to run queries (`createQuery`, `getQueryStatus` and
+`getQueryResults`) and serves the same pre-encoded Arrow page for every page number. It can also serve a fixed list of
+dimensions for `getDimensions`, and batches of `getQueryStatus` merged into a single `composite`
+request. The server runs in a background thread
+with its own event loop, so it can be used by both sync and asyncio clients.
+
+Knobs:
+- `latency_ms`: time each request spends "in the network" before being handled
+- `capacity`: how many requests the server handles at the same time, others queue up
+- `max_queued`: requests beyond `capacity + max_queued` get rejected with HTTP 429
+- `job_duration_ms`: how long it takes for a created query to become SUCCESSFUL. It can also be a function
+  of the `createQuery` variables, to give different queries different durations
+- `sql_length`: about how many characters long the compiled SQL of queries is
+- `dimensions`: how many dimensions `getDimensions` returns
+- `compression`: whether to compress responses according to the request's `Accept-Encoding`
+- `bandwidth_mbps`: if set, the time it takes to send the response body is simulated as well
+
+It supports automatic persisted queries: requests can send the SHA-256 hash of a query instead of
+its text, once it has been sent with its text.
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import pyarrow as pa
+from aiohttp import web
+
+OPERATION_PAT = re.compile(r"(query|mutation)\s+(\w+)")
+# The prefixes of the status checks merged into a `composite` request
+COMPOSITE_STATUS_PAT = re.compile(r"(op\d+_)query\s*:\s*query\b")
+
+# Encodings the server can compress responses with, most preferred first
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {}
+try:
+    import zstandard  # pyright: ignore[reportMissingImports]
+
+    COMPRESSORS["zstd"] = zstandard.ZstdCompressor().compress  # pyright: ignore
+except ImportError:
+    pass
+try:
+    import brotli  # pyright: ignore[reportMissingImports]
+
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=5)  # pyright: ignore
+except ImportError:
+    pass
+COMPRESSORS["gzip"] = lambda body: gzip.compress(body, compresslevel=6)
+COMPRESSORS["deflate"] = zlib.compress
+
+
+def make_arrow_page(rows: int) -> str:
+    """Get a base64 encoded Arrow IPC stream with `rows` rows."""
+    table = pa.Table.from_arrays(
+        [pa.array(range(rows)), pa.array([f"value-{i}" for i in range(rows)])],  # pyright: ignore[reportUnknownMemberType]
+        names=["id", "value"],
+    )
+    stream = io.BytesIO()
+    with pa.ipc.new_stream(stream, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(stream.getvalue()).decode("ascii")
+
+
+def make_sql(length: int) -> str:
+    """Get a SQL query which is about `length` characters long."""
+    columns: List[str] = []
+    while sum(len(c) + 2 for c in columns) < length - 20:
+        columns.append(f"metric_time__day_{len(columns)}")
+    return f"SELECT {', '.join(columns) or '1'} FROM t"
+
+
+def make_dimensions(n: int) -> List[Dict[str, Any]]:
+    """Get a raw GraphQL list of `n` dimensions."""
+    return [
+        {
+            "name": f"dim_{i}",
+            "qualifiedName": f"model__dim_{i}",
+            "description": f"The dimension number {i}",
+            "type": "TIME" if i % 2 else "CATEGORICAL",
+            "label": None,
+            "isPartition": False,
+            "expr": None,
+            "queryableGranularities": ["DAY", "WEEK"] if i % 2 else [],
+            "queryableTimeGranularities": ["day", "week"] if i % 2 else [],
+        }
+        for i in range(n)
+    ]
+
+
+@dataclass
+class ServerStats:
+    """Counters about what the server saw."""
+
+    requests: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    operations: Dict[str, int] = field(default_factory=dict)
+    # when each status check was received, from `time.monotonic`, including the ones batched in
+    # `composite` requests
+    poll_times: List[float] = field(default_factory=list)
+    # request body bytes
+    request_bytes: int = 0
+    persisted_query_misses: int = 0
+    # response body bytes before and after compression
+    body_bytes: int = 0
+    wire_bytes: int = 0
+
+
+class MockSemanticLayerServer:
+    """A fake Semantic Layer GraphQL API running in a background thread."""
+
+    def __init__(
+        self,
+        *,
+        pages: int = 1,
+        rows_per_page: int = 1000,
+        latency_ms: float = 20,
+        capacity: int = 16,
+        max_queued: int = 64,
+        job_duration_ms: Union[float, Callable[[Dict[str, Any]], float]] = 0,
+        sql_length: int = 8,
+        dimensions: int = 0,
+        compression: bool = False,
+        bandwidth_mbps: Optional[float] = None,
+    ) -> None:
+        self.pages = pages
+        self.latency_ms = latency_ms
+        self.capacity = capacity
+        self.max_queued = max_queued
+        self.job_duration_ms = job_duration_ms
+        self.compression = compression
+        self.bandwidth_mbps = bandwidth_mbps
+
+        self.arrow_page = make_arrow_page(rows_per_page)
+        self.sql = make_sql(sql_length)
+        self.dimensions = make_dimensions(dimensions)
+        self.stats = ServerStats()
+        self.port: Optional[int] = None
+
+        self._jobs: Dict[str, float] = {}
+        self._persisted_queries: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._started = threading.Event()
+
+    @property
+    def host(self) -> str:
+        """The `server_host` to give to clients."""
+        return f"127.0.0.1:{self.port}"
+
+    url_format = "http://{server_host}/api/graphql"
+
+    def job_done_at(self, query_id: str) -> float:
+        """Get the time at which a job will be done."""
+        return self._jobs[query_id]
+
+    def _status(self, query_id: str) -> str:
+        return "SUCCESSFUL" if time.monotonic() >= self._jobs[query_id] else "RUNNING"
+
+    def _get_query(self, body: Dict[str, Any]) -> Optional[str]:
+        """Get the query of a request, or `None` if it's a persisted query the server doesn't know."""
+        query: Optional[str] = body.get("query")
+        extensions: Dict[str, Any] = body.get("extensions") or {}
+        persisted: Optional[Dict[str, Any]] = extensions.get("persistedQuery")
+        if persisted is None:
+            return query
+
+        query_hash: str = persisted["sha256Hash"]
+        if query is not None:
+            assert hashlib.sha256(query.encode("utf-8")).hexdigest() == query_hash, "Wrong persisted query hash"
+            self._persisted_queries[query_hash] = query
+            return query
+
+        return self._persisted_queries.get(query_hash)
+
+    def _resolve(self, operation: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        if operation == "createQuery":
+            query_id = uuid.uuid4().hex
+            duration_ms = self.job_duration_ms(variables) if callable(self.job_duration_ms) else self.job_duration_ms
+            self._jobs[query_id] = time.monotonic() + duration_ms / 1000
+            return {"createQuery": {"queryId": query_id}}
+
+        if operation == "getQueryResults":
+            query_id = variables["queryId"]
+            status = self._status(query_id)
+            done = status == "SUCCESSFUL"
+            return {
+                "query": {
+                    "queryId": query_id,
+                    "status": status,
+                    "sql": self.sql,
+                    "error": None,
+                    "totalPages": self.pages if done else None,
+                    "arrowResult": self.arrow_page if done else None,
+                }
+            }
+
+        if operation == "getQueryStatus":
+            query_id = variables["queryId"]
+            status = self._status(query_id)
+            return {
+                "query": {
+                    "queryId": query_id,
+                    "status": status,
+                    "error": None,
+                    "totalPages": self.pages if status == "SUCCESSFUL" else None,
+                }
+            }
+
+        if operation == "getDimensions":
+            return {"dimensions": self.dimensions}
+
+        raise ValueError(f"Unsupported operation: {operation}")
+
+    def _resolve_composite(self, prefixes: List[str], variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve a batch of status checks, whose fields and variables are prefixed by their index."""
+        data: Dict[str, Any] = {}
+        for prefix in prefixes:
+            status = self._resolve("getQueryStatus", {"queryId": variables[f"{prefix}queryId"]})
+            data[f"{prefix}query"] = status["query"]
+        return data
+
+    def _encode(self, request: web.Request, data: Dict[str, Any]) -> web.Response:
+        """Encode the response, compressing it with the client's preferred encoding if enabled."""
+        body = json.dumps({"data": data}).encode("utf-8")
+        self.stats.body_bytes += len(body)
+        headers = {"content-type": "application/json"}
+
+        if self.compression:
+            accepted = [e.split(";")[0].strip() for e in request.headers.get("accept-encoding", "").split(",")]
+            for encoding in accepted:
+                compress = COMPRESSORS.get(encoding)
+                if compress is not None:
+                    body = compress(body)
+                    headers["content-encoding"] = encoding
+                    break
+
+        self.stats.wire_bytes += len(body)
+        return web.Response(body=body, headers=headers)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        stats = self.stats
+        stats.requests += 1
+        if stats.in_flight >= self.capacity + self.max_queued:
+            stats.rejected += 1
+            return web.Response(status=429, text="Too many requests")
+
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            raw_body = await request.read()
+            stats.request_bytes += len(raw_body)
+            body = json.loads(raw_body)
+            query = self._get_query(body)
+            if query is None:
+                stats.persisted_query_misses += 1
+                error = {"message": "PersistedQueryNotFound", "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}
+                return web.json_response({"errors": [error]})
+
+            match = OPERATION_PAT.search(query)
+            assert match is not None
+            operation = match.group(2)
+            stats.operations[operation] = stats.operations.get(operation, 0) + 1
+            variables: Dict[str, Any] = body.get("variables") or {}
+            prefixes: List[str] = []
+            if operation == "getQueryStatus":
+                stats.poll_times.append(time.monotonic())
+            elif operation == "composite":
+                prefixes = COMPOSITE_STATUS_PAT.findall(query)
+                stats.poll_times.extend([time.monotonic()] * len(prefixes))
+
+            async with self._capacity:
+                await asyncio.sleep(self.latency_ms / 1000)
+                if operation == "composite":
+                    data = self._resolve_composite(prefixes, variables)
+                else:
+                    data = self._resolve(operation, variables)
+                response = self._encode(request, data)
+
+            if self.bandwidth_mbps is not None:
+                assert isinstance(response.body, bytes)
+                await asyncio.sleep(len(response.body) * 8 / (self.bandwidth_mbps * 1_000_000))
+
+            return response
+        finally:
+            stats.in_flight -= 1
+
+    async def _start(self) -> None:
+        self._capacity = asyncio.Semaphore(self.capacity)
+        app = web.Application()
+        app.router.add_post("/api/graphql", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def _run_loop(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._start())
+        self._started.set()
+        self._loop.run_forever()
+
+    def __enter__(self) -> "MockSemanticLayerServer":
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def __exit__(self, *_args: object) -> None:
+        assert self._loop is not None and self._runner is not None and self._thread is not None
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def reset_stats(self) -> None:
+        """Reset all counters."""
+        self.stats = ServerStats()
@@ -0,0 +1,102 @@
+"""Measure how long it takes to read every field of many models, and how much memory they use.
+
+This compares the previous implementation of deprecation warnings, where `BaseModel.__getattribute__`
+checked every attribute read against the deprecated fields, with the current one, which only installs
+a descriptor on deprecated fields. Reading a deprecated field is excluded, since it warns either way.
+
+It also compares regular models with their compact (slotted) variant.
+
+Run with: `python -m benchmarks.model_attribute_access`
+"""
+
+import gc
+import time
+import tracemalloc
+import warnings
+from argparse import ArgumentParser
+from dataclasses import dataclass, fields
+from typing import Any, Callable, List, Tuple
+
+from dbtsl.models import BaseModel, Dimension, DimensionType
+from dbtsl.models.compact import CompactDimension
+
+
+@dataclass
+class PreviousDimension(Dimension):
+    """A `Dimension` which checks for deprecations on every attribute read, like models used to."""
+
+    def __getattribute__(self, name: str) -> Any:  # noqa: D105
+        v = object.__getattribute__(self, name)
+        if not name.startswith("__") and not callable(v):
+            key = BaseModel._get_deprecation_key("Dimension", name)  # pyright: ignore[reportPrivateUsage]
+            reason = BaseModel._deprecated_fields.get(key)  # pyright: ignore[reportPrivateUsage]
+            if reason is not None:
+                warnings.warn(reason, DeprecationWarning)
+
+        return v
+
+
+FIELDS = [f.name for f in fields(Dimension) if BaseModel.DEPRECATED not in f.metadata]
+
+
+def make_dimensions(cls: Callable[..., Dimension], n: int) -> List[Dimension]:
+    return [
+        cls(
+            name=f"dim_{i}",
+            qualified_name=f"model__dim_{i}",
+            description=None,
+            type=DimensionType.CATEGORICAL,
+            label=None,
+            is_partition=False,
+            expr=None,
+            queryable_granularities=[],
+            queryable_time_granularities=[],
+        )
+        for i in range(n)
+    ]
+
+
+def read_all_fields(dimensions: List[Dimension]) -> None:
+    for d in dimensions:
+        d.name
+        d.qualified_name
+        d.description
+        d.type
+        d.label
+        d.is_partition
+        d.expr
+        d.queryable_time_granularities
+
+
+def measure(cls: Callable[..., Dimension], n: int, repeat: int) -> Tuple[float, float]:
+    """Return (bytes per dimension, best time in seconds to read all fields of all dimensions)."""
+    gc.collect()
+    tracemalloc.start()
+    dimensions = make_dimensions(cls, n)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_all_fields(dimensions)
+        best = min(best, time.perf_counter() - start)
+    return size / n, best
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--models", type=int, default=50_000)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    n_reads = args.models * len(FIELDS)
+    print(f"{args.models} dimensions, {n_reads} attribute reads")
+    print(f"{'':>9} | {'B/model':>7} | {'time (s)':>8} | {'ns/read':>7}")
+    for name, cls in (("previous", PreviousDimension), ("current", Dimension), ("compact", CompactDimension)):
+        model_bytes, elapsed_s = measure(cls, args.models, args.repeat)
+        print(f"{name:>9} | {model_bytes:>7.0f} | {elapsed_s:>8.3f} | {elapsed_s * 1e9 / n_reads:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Measure how many requests it takes to poll for many concurrent queries, with and without sharing them.
+
+This runs many queries at the same time against a local mock server, whose jobs take between 0.5s
+and 3s to complete, from both the asyncio client (with `asyncio.gather`) and the sync client (with
+threads), and compares:
+- each query polling for its own status, which is what clients used to do
+- all queries of a client sharing a poller, which checks the status of all the queries which are due
+  in a single request
+
+Run with: `python -m benchmarks.multiplexed_polling`
+"""
+
+import asyncio
+import random
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+
+from benchmarks.mock_server import MockSemanticLayerServer
+from dbtsl.api.graphql.client.asyncio import AsyncGraphQLClient
+from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+from dbtsl.backoff import ExponentialBackoff, PollingStrategy
+from dbtsl.models.query import QueryResult, QueryStatus, QueryStatusResult
+
+POLLING = ExponentialBackoff(base_interval_ms=500, max_interval_ms=60000)
+
+
+def query_alone_sync(client: SyncGraphQLClient, strategy: PollingStrategy) -> QueryResult:
+    """Run a query which polls for its own status, like the sync client used to do."""
+    [query_id] = client.run_many([("create_query", {"metrics": ["m"], "read_cache": False})])
+    for sleep_ms in strategy.iter_ms():
+        status: QueryStatusResult = client.run_many([("get_query_status", {"query_id": query_id})])[0]
+        if status.status in (QueryStatus.SUCCESSFUL, QueryStatus.FAILED):
+            break
+        time.sleep(sleep_ms / 1000)
+
+    first_page: QueryResult = client.run_many([("get_query_result", {"query_id": query_id, "page_num": 1})])[0]
+    return first_page
+
+
+async def query_alone_async(client: AsyncGraphQLClient, strategy: PollingStrategy) -> QueryResult:
+    """Run a query which polls for its own status, like the asyncio client used to do."""
+    [query_id] = await client.run_many([("create_query", {"metrics": ["m"], "read_cache": False})])
+    for sleep_ms in strategy.iter_ms():
+        status: QueryStatusResult = (await client.run_many([("get_query_status", {"query_id": query_id})]))[0]
+        if status.status in (QueryStatus.SUCCESSFUL, QueryStatus.FAILED):
+            break
+        await asyncio.sleep(sleep_ms / 1000)
+
+    first_page: QueryResult = (await client.run_many([("get_query_result", {"query_id": query_id, "page_num": 1})]))[0]
+    return first_page
+
+
+def job_duration_ms(_variables: Dict[str, Any]) -> float:
+    return random.uniform(500, 3000)
+
+
+def client_args(server: MockSemanticLayerServer) -> Dict[str, Any]:
+    return {
+        "server_host": server.host,
+        "environment_id": 1,
+        "auth_token": "bench",
+        "url_format": server.url_format,
+        "lazy": False,
+        "polling_strategy": POLLING,
+    }
+
+
+async def run_async(server: MockSemanticLayerServer, shared: bool, queries: int) -> float:
+    client = AsyncGraphQLClient(**client_args(server))
+    async with client.session():
+        start = time.perf_counter()
+        if shared:
+            await asyncio.gather(*(client.query(metrics=["m"], read_cache=False) for _ in range(queries)))
+        else:
+            await asyncio.gather(*(query_alone_async(client, POLLING) for _ in range(queries)))
+        return time.perf_counter() - start
+
+
+def run_sync(server: MockSemanticLayerServer, shared: bool, queries: int) -> float:
+    client = SyncGraphQLClient(**client_args(server))
+    with client.session(), ThreadPoolExecutor(max_workers=queries) as pool:
+        start = time.perf_counter()
+        if shared:
+            futures = [pool.submit(client.query, metrics=["m"], read_cache=False) for _ in range(queries)]
+        else:
+            futures = [pool.submit(query_alone_sync, client, POLLING) for _ in range(queries)]
+        for future in futures:
+            future.result()
+        return time.perf_counter() - start
+
+
+def measure(server: MockSemanticLayerServer, client: str, shared: bool, queries: int) -> Tuple[int, int, float]:
+    """Return (status requests, status checks, seconds)."""
+    random.seed(0)
+    server.reset_stats()
+    if client == "asyncio":
+        elapsed_s = asyncio.run(run_async(server, shared, queries))
+    else:
+        elapsed_s = run_sync(server, shared, queries)
+
+    # batched status checks are sent as a `composite` operation
+    stats = server.stats
+    status_requests = stats.operations.get("getQueryStatus", 0) + stats.operations.get("composite", 0)
+    return status_requests, len(stats.poll_times), elapsed_s
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--queries", type=int, default=50)
+    p.add_argument("--latency-ms", type=float, default=20)
+    args = p.parse_args()
+
+    server = MockSemanticLayerServer(latency_ms=args.latency_ms, job_duration_ms=job_duration_ms, rows_per_page=10)
+    print(f"{args.queries} concurrent queries of 0.5-3s, {args.latency_ms}ms latency")
+    print(f"{'':>17} | {'status requests':>15} | {'status checks':>13} | {'time (s)':>8}")
+    with server:
+        for client in ("asyncio", "sync"):
+            for shared in (False, True):
+                status_requests, checks, elapsed_s = measure(server, client, shared, args.queries)
+                name = f"{client} ({'shared' if shared else 'own'})"
+                print(f"{name:>17} | {status_requests:>15} | {checks:>13} | {elapsed_s:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
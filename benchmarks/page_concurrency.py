@@ -0,0 +1,69 @@
+"""Measure how `AsyncGraphQLClient.query` behaves with different `page_concurrency` values.
+
+This runs a multi-page query against a local mock server which has a limited capacity and rejects
+requests (HTTP 429) when too many of them are queued, similar to a rate limited API.
+
+This is what `AsyncGraphQLClient.DEFAULT_PAGE_CONCURRENCY` was tuned with.
+
+Run with: `python -m benchmarks.page_concurrency`
+"""
+
+import asyncio
+import time
+from argparse import ArgumentParser
+from typing import List
+
+from benchmarks.mock_server import MockSemanticLayerServer
+from dbtsl.api.graphql.client.asyncio import AsyncGraphQLClient
+
+
+async def run_query(server: MockSemanticLayerServer, page_concurrency: int) -> float:
+    client = AsyncGraphQLClient(
+        server_host=server.host,
+        environment_id=1,
+        auth_token="bench",
+        url_format=server.url_format,
+        lazy=False,
+    )
+    async with client.session():
+        start = time.perf_counter()
+        await client.query(metrics=["m"], page_concurrency=page_concurrency)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--pages", type=int, default=400)
+    p.add_argument("--rows-per-page", type=int, default=1000)
+    p.add_argument("--latency-ms", type=float, default=20)
+    p.add_argument("--capacity", type=int, default=16)
+    p.add_argument("--max-queued", type=int, default=64)
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64, 400])
+    args = p.parse_args()
+
+    server = MockSemanticLayerServer(
+        pages=args.pages,
+        rows_per_page=args.rows_per_page,
+        latency_ms=args.latency_ms,
+        capacity=args.capacity,
+        max_queued=args.max_queued,
+    )
+
+    print(f"{args.pages} pages, {args.latency_ms}ms latency, server capacity={args.capacity}")
+    print(f"{'concurrency':>11} | {'time (s)':>8} | {'max in flight':>13} | result")
+    with server:
+        concurrency_values: List[int] = args.concurrency
+        for concurrency in concurrency_values:
+            server.reset_stats()
+            try:
+                elapsed_s = asyncio.run(run_query(server, concurrency))
+                result = "ok"
+            except Exception as err:
+                elapsed_s = float("nan")
+                result = f"failed ({err.__class__.__name__}, {server.stats.rejected} rejected)"
+
+            print(f"{concurrency:>11} | {elapsed_s:>8.2f} | {server.stats.max_in_flight:>13} | {result}")
+
+
+if __name__ == "__main__":
+    main()
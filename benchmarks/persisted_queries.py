@@ -0,0 +1,78 @@
+"""Measure how much smaller GraphQL requests get with automatic persisted queries.
+
+This first prints the size of the request text of each operation against the size of its hash,
+then runs many `dimensions` requests against a local mock server, with and without
+`persisted_queries`, and reports the request bytes the server received.
+
+Run with: `python -m benchmarks.persisted_queries`
+"""
+
+import json
+import time
+from argparse import ArgumentParser
+from typing import List, Tuple
+
+from benchmarks.mock_server import MockSemanticLayerServer
+from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+from dbtsl.api.graphql.protocol import GraphQLProtocol
+
+# What gets sent instead of the query text
+HASH_PAYLOAD_BYTES = len(json.dumps({"extensions": {"persistedQuery": {"version": 1, "sha256Hash": "0" * 64}}}))
+
+
+def print_request_sizes() -> None:
+    ops: List[Tuple[str, bool]] = [
+        ("metrics", False),
+        ("metrics", True),
+        ("dimensions", False),
+        ("saved_queries", False),
+        ("get_query_result", False),
+    ]
+    print(f"{'':>30} | {'text (B)':>8} | {'hash (B)':>8}")
+    for name, lazy in ops:
+        text = getattr(GraphQLProtocol, name).get_request_text(lazy=lazy)
+        label = f"{name} (lazy={lazy})"
+        print(f"{label:>30} | {len(text.encode('utf-8')):>8} | {HASH_PAYLOAD_BYTES:>8}")
+    print()
+
+
+def run(server: MockSemanticLayerServer, persisted_queries: bool, requests: int) -> float:
+    client = SyncGraphQLClient(
+        server_host=server.host,
+        environment_id=1,
+        auth_token="bench",
+        url_format=server.url_format,
+        lazy=False,
+        persisted_queries=persisted_queries,
+    )
+    with client.session():
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.dimensions(metrics=["m"])
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--requests", type=int, default=500)
+    p.add_argument("--dimensions", type=int, default=10)
+    p.add_argument("--latency-ms", type=float, default=0)
+    args = p.parse_args()
+
+    print_request_sizes()
+
+    server = MockSemanticLayerServer(latency_ms=args.latency_ms, dimensions=args.dimensions)
+    print(f"{args.requests} `dimensions` requests")
+    print(f"{'persisted queries':>17} | {'request (B)':>11} | {'misses':>6} | {'time (s)':>8}")
+    with server:
+        for persisted_queries in (False, True):
+            server.reset_stats()
+            elapsed_s = run(server, persisted_queries, args.requests)
+            stats = server.stats
+            enabled = "on" if persisted_queries else "off"
+            request_bytes = stats.request_bytes / args.requests
+            print(f"{enabled:>17} | {request_bytes:>11.0f} | {stats.persisted_query_misses:>6} | {elapsed_s:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
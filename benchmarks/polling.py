@@ -0,0 +1,113 @@
+"""Measure how long queries wait for their results with different polling strategies.
+
+This runs queries against a local mock server where each metric takes a different, fixed time to
+compute, and reports, for each polling strategy:
+- how long after its job completed each query got its results on average, and how many times it was
+  polled, when the same queries run one after the other (so adaptive polling can learn their duration)
+- the maximum number of polls the server received within 100ms when many clients start the same slow
+  query at the same time, which shows whether they keep polling in lockstep. Only polls from 1.5s
+  after the first one are counted, since all queries get created at the same time.
+
+Run with: `python -m benchmarks.polling`
+"""
+
+import asyncio
+import bisect
+import contextlib
+import time
+from argparse import ArgumentParser
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.mock_server import MockSemanticLayerServer
+from dbtsl.api.graphql.client.asyncio import AsyncGraphQLClient
+from dbtsl.backoff import AdaptivePolling, ExponentialBackoff, PollingStrategy
+
+# how long the query of each metric takes to complete
+JOB_DURATIONS_MS = {"fast": 120, "medium": 1500, "slow": 6000}
+
+STRATEGIES: List[Tuple[str, Callable[[], PollingStrategy]]] = [
+    ("default", lambda: ExponentialBackoff(base_interval_ms=500, max_interval_ms=60000)),
+    ("fast first polls", lambda: ExponentialBackoff(500, 60000, first_intervals_ms=(100, 200))),
+    ("decorrelated", lambda: ExponentialBackoff(100, 60000, jitter="decorrelated")),
+    ("adaptive", AdaptivePolling),
+]
+
+
+def job_duration_ms(variables: Dict[str, Any]) -> float:
+    return JOB_DURATIONS_MS[variables["metrics"][0]["name"]]
+
+
+def new_client(server: MockSemanticLayerServer, strategy: PollingStrategy) -> AsyncGraphQLClient:
+    return AsyncGraphQLClient(
+        server_host=server.host,
+        environment_id=1,
+        auth_token="bench",
+        url_format=server.url_format,
+        lazy=False,
+        polling_strategy=strategy,
+    )
+
+
+async def sequential(server: MockSemanticLayerServer, strategy: PollingStrategy, repeat: int) -> Dict[str, float]:
+    """Run each query `repeat` times in turn, and get the mean delay after completion of each, in ms."""
+    client = new_client(server, strategy)
+    delays_ms: Dict[str, float] = {}
+    async with client.session():
+        for metric, duration_ms in JOB_DURATIONS_MS.items():
+            total_s = 0.0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                await client.query(metrics=[metric], read_cache=False)
+                total_s += time.perf_counter() - start
+            delays_ms[metric] = total_s / repeat * 1000 - duration_ms
+    return delays_ms
+
+
+async def simultaneous(server: MockSemanticLayerServer, strategy: PollingStrategy, clients: int) -> int:
+    """Start the slow query from many clients at once, and get the max number of polls within 100ms."""
+    server.reset_stats()
+
+    async with contextlib.AsyncExitStack() as stack:
+        # open all connections first, so that queries really start together
+        all_clients = [new_client(server, strategy) for _ in range(clients)]
+        for client in all_clients:
+            await stack.enter_async_context(client.session())
+        await asyncio.gather(*(client.query(metrics=["slow"], read_cache=False) for client in all_clients))
+
+    poll_times = sorted(server.stats.poll_times)
+    poll_times = poll_times[bisect.bisect_left(poll_times, poll_times[0] + 1.5) :]
+    return max(bisect.bisect_left(poll_times, t + 0.1) - i for i, t in enumerate(poll_times))
+
+
+async def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--repeat", type=int, default=10)
+    p.add_argument("--clients", type=int, default=200)
+    p.add_argument("--latency-ms", type=float, default=20)
+    args = p.parse_args()
+
+    server = MockSemanticLayerServer(
+        latency_ms=args.latency_ms,
+        rows_per_page=10,
+        job_duration_ms=job_duration_ms,
+        capacity=1000,
+        max_queued=1000,
+    )
+    durations = ", ".join(f"{metric}={duration_ms}ms" for metric, duration_ms in JOB_DURATIONS_MS.items())
+    print(f"queries: {durations}, {args.latency_ms}ms latency")
+    print(f"{'':>16} | {'delay after completion (ms)':^29} | {'polls/query':>11} | {'peak polls/100ms':>16}")
+    print(f"{'':>16} | {'fast':>9} {'medium':>9} {'slow':>9} | {'':>11} | {f'({args.clients} clients)':>16}")
+    with server:
+        for name, make_strategy in STRATEGIES:
+            server.reset_stats()
+            delays_ms = await sequential(server, make_strategy(), args.repeat)
+            polls = server.stats.operations.get("getQueryStatus", 0) / (args.repeat * len(JOB_DURATIONS_MS))
+
+            peak_polls = await simultaneous(server, make_strategy(), args.clients)
+
+            delays = " ".join(f"{delays_ms[metric]:>9.0f}" for metric in JOB_DURATIONS_MS)
+            print(f"{name:>16} | {delays} | {polls:>11.1f} | {peak_polls:>16}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""Measure how long a single thread takes to run many queries, with and without query handles.
+
+This runs queries whose jobs take 1s against a local mock server, from a single thread, and compares:
+- calling `query` for each query, which waits for it to complete before creating the next one
+- calling `submit_query` for every query, then collecting their results with `as_completed`, so
+  that all the queries run in the warehouse at the same time
+
+Run with: `python -m benchmarks.query_handles`
+"""
+
+import time
+from argparse import ArgumentParser
+
+from benchmarks.mock_server import MockSemanticLayerServer
+from dbtsl.api.graphql.client.query_handle import as_completed
+from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+
+
+def run_sequential(client: SyncGraphQLClient, queries: int) -> None:
+    for _ in range(queries):
+        client.query(metrics=["m"], read_cache=False)
+
+
+def run_handles(client: SyncGraphQLClient, queries: int) -> None:
+    handles = [client.submit_query(metrics=["m"], read_cache=False) for _ in range(queries)]
+    for handle in as_completed(handles):
+        handle.result()
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--queries", type=int, default=20)
+    p.add_argument("--job-duration-ms", type=float, default=1000)
+    p.add_argument("--latency-ms", type=float, default=20)
+    args = p.parse_args()
+
+    server = MockSemanticLayerServer(
+        latency_ms=args.latency_ms,
+        job_duration_ms=args.job_duration_ms,
+        rows_per_page=10,
+    )
+    print(f"{args.queries} queries of {args.job_duration_ms}ms from a single thread, {args.latency_ms}ms latency")
+    print(f"{'':>10} | {'time (s)':>8} | {'requests':>8}")
+    with server:
+        for name, run in (("sequential", run_sequential), ("handles", run_handles)):
+            client = SyncGraphQLClient(
+                server_host=server.host,
+                environment_id=1,
+                auth_token="bench",
+                url_format=server.url_format,
+                lazy=False,
+            )
+            server.reset_stats()
+            with client.session():
+                start = time.perf_counter()
+                run(client, args.queries)
+                elapsed_s = time.perf_counter() - start
+            print(f"{name:>10} | {elapsed_s:>8.2f} | {server.stats.requests:>8}")
+
+
+if __name__ == "__main__":
+    main()
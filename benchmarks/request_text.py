@@ -0,0 +1,97 @@
+"""Measure the cost of rendering GraphQL request texts, and how caching them changes request overhead.
+
+This compares:
+- rendering the request text of each operation, which is what `get_request_text` used to do on
+  every call, with getting its cached text
+- the client-side overhead of `metrics()` against a fake in-process transport, both for a client
+  which already ran it (its parsed document is cached), and for the first request of new clients
+  (which need the request text to parse the document, and open their session)
+
+Run with: `python -m benchmarks.request_text`
+"""
+
+import time
+from argparse import ArgumentParser
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Iterator, Optional
+from unittest.mock import patch
+
+from gql.transport.requests import RequestsHTTPTransport
+from graphql import DocumentNode, ExecutionResult
+
+from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+from dbtsl.api.graphql.protocol import GraphQLProtocol, ProtocolOperation
+
+
+class FakeTransport(RequestsHTTPTransport):
+    """An in-process transport which answers every request with an empty list of metrics."""
+
+    def execute(  # pyright: ignore[reportIncompatibleMethodOverride]
+        self, document: DocumentNode, variable_values: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> ExecutionResult:
+        return ExecutionResult(data={"metrics": []})
+
+
+class FakeSyncGraphQLClient(SyncGraphQLClient):
+    """A client whose requests are answered in-process by a `FakeTransport`."""
+
+    def _create_transport(self, url: str, headers: Dict[str, str]) -> RequestsHTTPTransport:
+        return FakeTransport(url=url)
+
+
+def uncached_request_text(op: ProtocolOperation[Any, Any], *, lazy: bool) -> str:
+    """Render the request text on every call, like `get_request_text` used to."""
+    return op.render_request_text(lazy=lazy)
+
+
+def new_client(stack: ExitStack) -> SyncGraphQLClient:
+    client = FakeSyncGraphQLClient(server_host="bench", environment_id=1, auth_token="bench", lazy=False)
+    stack.enter_context(client.session())
+    return client
+
+
+def best_us(fn: Callable[[], Any], n: int, repeat: int) -> float:
+    """Get the best time of `repeat` runs of `n` calls to `fn`, in microseconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / n * 1e6
+
+
+def operations() -> Iterator[ProtocolOperation[Any, Any]]:
+    for name in ("metrics", "dimensions", "saved_queries", "get_query_result", "create_query"):
+        yield getattr(GraphQLProtocol, name)
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--n", type=int, default=2000)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    print(f"{'':>25} | {'render (us)':>11} | {'cached (us)':>11}")
+    for op in operations():
+        for lazy in (False, True):
+            render_us = best_us(lambda: op.render_request_text(lazy=lazy), args.n, args.repeat)
+            cached_us = best_us(lambda: op.get_request_text(lazy=lazy), args.n, args.repeat)
+            name = f"{op.__class__.__name__[:-9]} (lazy={lazy})"
+            print(f"{name:>25} | {render_us:>11.1f} | {cached_us:>11.2f}")
+    print()
+
+    with ExitStack() as stack:
+        client = new_client(stack)
+        print(f"{'metrics() overhead (us)':>25} | {'before':>11} | {'after':>11}")
+        with patch.object(ProtocolOperation, "get_request_text", uncached_request_text):
+            same_before = best_us(lambda: client.metrics(), args.n, args.repeat)
+            first_before = best_us(lambda: new_client(stack).metrics(), args.n // 10, args.repeat)
+        same_after = best_us(lambda: client.metrics(), args.n, args.repeat)
+        first_after = best_us(lambda: new_client(stack).metrics(), args.n // 10, args.repeat)
+    print(f"{'same client':>25} | {same_before:>11.1f} | {same_after:>11.1f}")
+    print(f"{'first request of client':>25} | {first_before:>11.1f} | {first_after:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
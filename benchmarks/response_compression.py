@@ -0,0 +1,106 @@
+"""Measure how much response compression saves on the wire, and how much faster requests get.
+
+This fetches a large list of dimensions and runs a multi-page query against a local mock server which
+compresses its responses according to the `Accept-Encoding` the clients send, and simulates the time it
+takes to send response bodies over a link with limited bandwidth. Both clients are run with and without
+`response_compression`.
+
+Run with: `python -m benchmarks.response_compression`
+"""
+
+import asyncio
+import time
+from argparse import ArgumentParser
+from typing import Callable, Tuple
+
+from benchmarks.mock_server import MockSemanticLayerServer
+from dbtsl.api.graphql.client.asyncio import AsyncGraphQLClient
+from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+
+MB = 1024 * 1024
+
+
+def run_sync(server: MockSemanticLayerServer, compression: bool, metadata: bool) -> float:
+    client = SyncGraphQLClient(
+        server_host=server.host,
+        environment_id=1,
+        auth_token="bench",
+        url_format=server.url_format,
+        lazy=False,
+        response_compression=compression,
+    )
+    with client.session():
+        start = time.perf_counter()
+        if metadata:
+            client.dimensions(metrics=["m"])
+        else:
+            client.query(metrics=["m"])
+        return time.perf_counter() - start
+
+
+async def run_async(server: MockSemanticLayerServer, compression: bool, metadata: bool) -> float:
+    client = AsyncGraphQLClient(
+        server_host=server.host,
+        environment_id=1,
+        auth_token="bench",
+        url_format=server.url_format,
+        lazy=False,
+        response_compression=compression,
+    )
+    async with client.session():
+        start = time.perf_counter()
+        if metadata:
+            await client.dimensions(metrics=["m"])
+        else:
+            await client.query(metrics=["m"])
+        return time.perf_counter() - start
+
+
+def measure(server: MockSemanticLayerServer, run: Callable[[], float], repeat: int) -> Tuple[float, float, float]:
+    """Return (response MB, MB on the wire, best time in seconds) of one run."""
+    best = float("inf")
+    for _ in range(repeat):
+        server.reset_stats()
+        best = min(best, run())
+    return server.stats.body_bytes / MB, server.stats.wire_bytes / MB, best
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--dimensions", type=int, default=50_000)
+    p.add_argument("--pages", type=int, default=20)
+    p.add_argument("--rows-per-page", type=int, default=10_000)
+    p.add_argument("--latency-ms", type=float, default=20)
+    p.add_argument("--bandwidth-mbps", type=float, default=100)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    server = MockSemanticLayerServer(
+        pages=args.pages,
+        rows_per_page=args.rows_per_page,
+        latency_ms=args.latency_ms,
+        dimensions=args.dimensions,
+        compression=True,
+        bandwidth_mbps=args.bandwidth_mbps,
+    )
+
+    print(f"{args.latency_ms}ms latency, {args.bandwidth_mbps} Mbps")
+    print(f"{'':>24} | {'compression':>11} | {'body (MB)':>9} | {'wire (MB)':>9} | {'time (s)':>8}")
+    with server:
+        for workload, metadata in ((f"{args.dimensions} dimensions", True), (f"{args.pages} pages", False)):
+            for client_name in ("sync", "async"):
+                for compression in (False, True):
+
+                    def run() -> float:
+                        if client_name == "sync":
+                            return run_sync(server, compression, metadata)
+                        return asyncio.run(run_async(server, compression, metadata))
+
+                    body_mb, wire_mb, elapsed_s = measure(server, run, args.repeat)
+                    name = f"{workload} ({client_name})"
+                    enabled = "on" if compression else "off"
+                    print(f"{name:>24} | {enabled:>11} | {body_mb:>9.1f} | {wire_mb:>9.1f} | {elapsed_s:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Measure the memory used to decode a large page of query results.
+
+This compares the previous decoding path of `QueryResult.result_table` (stdlib base64 decoding and
+keeping `arrow_result` around) with the current one. Memory is measured with `tracemalloc`, which
+tracks all Python allocations, including the buffers that back the resulting Arrow table.
+
+Run with: `python -m benchmarks.result_decoding`
+"""
+
+import base64
+import gc
+import io
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Callable, Tuple
+
+import pyarrow as pa
+
+from dbtsl.models.query import QueryId, QueryResult, QueryStatus
+
+MB = 1024 * 1024
+
+
+def make_page(size_mb: int) -> str:
+    rows = size_mb * MB // 8
+    table = pa.Table.from_arrays([pa.array(range(rows), type=pa.int64())], names=["value"])  # pyright: ignore[reportUnknownMemberType]
+    stream = io.BytesIO()
+    with pa.ipc.new_stream(stream, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(stream.getvalue()).decode("ascii")
+
+
+def make_query_result(arrow_result: str) -> QueryResult:
+    return QueryResult(
+        query_id=QueryId("bench"),
+        status=QueryStatus.SUCCESSFUL,
+        sql=None,
+        error=None,
+        total_pages=1,
+        arrow_result=arrow_result,
+    )
+
+
+def previous_result_table(qr: QueryResult) -> pa.Table:
+    """How `QueryResult.result_table` used to decode results."""
+    assert qr.arrow_result is not None
+    decoded = base64.b64decode(qr.arrow_result)
+    with pa.ipc.open_stream(decoded) as stream:
+        return pa.Table.from_batches(stream, stream.schema)
+
+
+def current_result_table(qr: QueryResult) -> pa.Table:
+    return qr.result_table
+
+
+def measure(arrow_result: str, decode: Callable[[QueryResult], pa.Table]) -> Tuple[float, float, float]:
+    """Return (peak MB while decoding, MB retained after decoding, seconds)."""
+    qr = make_query_result(arrow_result)
+    del arrow_result
+    gc.collect()
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    table = decode(qr)
+    elapsed_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # What's kept alive by the QueryResult and the table, including the base64 string if it wasn't dropped
+    retained = table.nbytes + (len(qr.arrow_result) if qr.arrow_result is not None else 0)
+    del table, qr
+    return (peak - baseline) / MB, retained / MB, elapsed_s
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--size-mb", type=int, default=100)
+    args = p.parse_args()
+
+    print(f"{args.size_mb} MB page")
+    print(f"{'':>9} | {'peak extra (MB)':>15} | {'retained (MB)':>13} | {'time (s)':>8}")
+    for name, decode in (("previous", previous_result_table), ("current", current_result_table)):
+        peak_mb, retained_mb, elapsed_s = measure(make_page(args.size_mb), decode)
+        print(f"{name:>9} | {peak_mb:>15.1f} | {retained_mb:>13.1f} | {elapsed_s:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
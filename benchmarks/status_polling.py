@@ -0,0 +1,82 @@
+"""Measure how many bytes polling for query results transfers, with and without status-only polls.
+
+This runs queries against a local mock server, polling every 50ms, and compares:
+- polling with `getQueryResults` for page 1, which is what clients used to do, so every response
+  carries the query's SQL, and the first page of results comes with the poll that sees it complete
+- polling with `getQueryStatus`, which only returns the status, then fetching page 1 once
+
+Run with: `python -m benchmarks.status_polling`
+"""
+
+import time
+from argparse import ArgumentParser
+
+from benchmarks.mock_server import MockSemanticLayerServer
+from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+from dbtsl.backoff import ExponentialBackoff, PollingStrategy
+from dbtsl.models.query import QueryResult, QueryStatus
+
+POLLING = ExponentialBackoff(base_interval_ms=50, max_interval_ms=50)
+
+
+def query_full_polls(client: SyncGraphQLClient, strategy: PollingStrategy) -> QueryResult:
+    """Run a query by polling for its first page of results, like the client used to do."""
+    [query_id] = client.run_many([("create_query", {"metrics": ["m"], "read_cache": False})])
+    for sleep_ms in strategy.iter_ms():
+        first_page: QueryResult = client.run_many([("get_query_result", {"query_id": query_id, "page_num": 1})])[0]
+        if first_page.status in (QueryStatus.SUCCESSFUL, QueryStatus.FAILED):
+            return first_page
+        time.sleep(sleep_ms / 1000)
+
+    raise ValueError("The polling strategy ran out of intervals.")
+
+
+def run(server: MockSemanticLayerServer, client: SyncGraphQLClient, full_polls: bool, queries: int) -> float:
+    server.reset_stats()
+    with client.session():
+        start = time.perf_counter()
+        for _ in range(queries):
+            if full_polls:
+                query_full_polls(client, POLLING)
+            else:
+                client.query(metrics=["m"], read_cache=False)
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    p = ArgumentParser()
+    p.add_argument("--queries", type=int, default=10)
+    p.add_argument("--job-duration-ms", type=float, default=2000)
+    p.add_argument("--sql-length", type=int, default=4000)
+    p.add_argument("--latency-ms", type=float, default=20)
+    args = p.parse_args()
+
+    server = MockSemanticLayerServer(
+        latency_ms=args.latency_ms,
+        job_duration_ms=args.job_duration_ms,
+        sql_length=args.sql_length,
+        rows_per_page=1000,
+    )
+    print(
+        f"{args.queries} queries of {args.job_duration_ms}ms, {args.sql_length} characters of SQL, polling every 50ms"
+    )
+    print(f"{'':>11} | {'requests/query':>14} | {'response kB/query':>17} | {'time/query (ms)':>15}")
+    with server:
+        for name, full_polls in (("full polls", True), ("status", False)):
+            client = SyncGraphQLClient(
+                server_host=server.host,
+                environment_id=1,
+                auth_token="bench",
+                url_format=server.url_format,
+                lazy=False,
+                polling_strategy=POLLING,
+            )
+            elapsed_s = run(server, client, full_polls, args.queries)
+            stats = server.stats
+            requests = stats.requests / args.queries
+            response_kb = stats.body_bytes / args.queries / 1000
+            print(f"{name:>11} | {requests:>14.1f} | {response_kb:>17.1f} | {elapsed_s * 1000 / args.queries:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Optional
+from typing import AsyncGenerator, AsyncIterator, Optional, Union
 
 import pyarrow as pa
 from typing_extensions import Self, Unpack
@@ -9,6 +9,18 @@ from dbtsl.api.adbc.client.base import BaseADBCClient
 from dbtsl.api.shared.query_params import DimensionValuesQueryParameters, QueryParameters
 
 
+def _read_next_batch(reader: pa.RecordBatchReader) -> Union[pa.RecordBatch, None]:
+    """Read the next batch from a reader, or None if it's exhausted.
+
+    We can't let `StopIteration` propagate out of an executor, since it doesn't play well
+    with futures.
+    """
+    try:
+        return reader.read_next_batch()
+    except StopIteration:
+        return None
+
+
 class AsyncADBCClient(BaseADBCClient):
     """An asyncio client to access the Semantic Layer via ADBC."""
 
@@ -45,11 +57,35 @@ class AsyncADBCClient(BaseADBCClient):
         ctx = self._get_connection_context_manager()
         self._conn_unsafe = await self._loop.run_in_executor(None, ctx.__enter__)
 
-        yield self
+        try:
+            yield self
+        finally:
+            await self._loop.run_in_executor(None, self._close_pooled_connections)
 
         await self._loop.run_in_executor(None, ctx.__exit__, None, None, None)
         self._conn_unsafe = None
 
+    @asynccontextmanager
+    async def _pooled_connection(self) -> AsyncGenerator[None, None]:
+        """Run the operations of the current task on a pooled connection of their own.
+
+        This lets many tasks run queries at the same time. The connection is opened the first
+        time it is needed, and reused by the next tasks until the session closes.
+        """
+        if self._conn_unsafe is None:
+            raise ValueError("Cannot perform operation without opening a session first.")
+
+        conn = self._take_idle_connection()
+        if conn is None:
+            conn = await self._loop.run_in_executor(None, self._open_pooled_connection)
+
+        token = self._borrowed_conn.set(conn)
+        try:
+            yield
+        finally:
+            self._borrowed_conn.reset(token)
+            self._release_pooled_connection(conn)
+
     async def query(self, **query_params: Unpack[QueryParameters]) -> pa.Table:
         """Query for a dataframe in the Semantic Layer."""
         query_sql = self.PROTOCOL.get_query_sql(query_params)
@@ -65,6 +101,29 @@ class AsyncADBCClient(BaseADBCClient):
 
         return table
 
+    async def query_batches(self, **query_params: Unpack[QueryParameters]) -> AsyncIterator[pa.RecordBatch]:
+        """Query the Semantic Layer, yielding the results as record batches while they are streamed.
+
+        Unlike `query`, this doesn't buffer the whole result in memory. Each batch is only read
+        from the server when the iterator gets advanced.
+        """
+        query_sql = self.PROTOCOL.get_query_sql(query_params)
+
+        # NOTE: We don't need to wrap this in a `loop.run_in_executor` since
+        # just creating the cursor object doesn't perform any blocking IO.
+        with self._conn.cursor() as cur:
+            try:
+                await self._loop.run_in_executor(None, cur.execute, query_sql)  # pyright: ignore[reportUnknownArgumentType,reportUnknownMemberType]
+            except Exception as err:
+                self._handle_error(err)
+            reader = await self._loop.run_in_executor(None, cur.fetch_record_batch)
+
+            while True:
+                batch = await self._loop.run_in_executor(None, _read_next_batch, reader)
+                if batch is None:
+                    break
+                yield batch
+
     async def dimension_values(self, **query_params: Unpack[DimensionValuesQueryParameters]) -> pa.Table:
         """Query for the possible values of a dimension."""
         query_sql = self.PROTOCOL.get_dimension_values_sql(query_params)
@@ -1,6 +1,8 @@
+import threading
 from abc import abstractmethod
 from contextlib import AbstractContextManager
-from typing import Dict, Generic, Optional, Protocol, TypeVar, Union
+from contextvars import ContextVar
+from typing import Dict, Generic, List, Optional, Protocol, TypeVar, Union
 
 from adbc_driver_flightsql import DatabaseOptions
 from adbc_driver_flightsql.dbapi import Connection
@@ -41,6 +43,14 @@ class BaseADBCClient:
 
         self._conn_unsafe: Union[Connection, None] = None
 
+        # Extra connections which concurrent queries can borrow for themselves, since a connection
+        # shouldn't run many queries at the same time. They stay open until the session closes.
+        self._pool_lock = threading.Lock()
+        self._idle_conns: List[Connection] = []
+        self._pooled_conn_ctxs: List[AbstractContextManager[Connection]] = []
+        # The pooled connection borrowed by the current thread or task, if any
+        self._borrowed_conn: ContextVar[Optional[Connection]] = ContextVar("dbtsl_adbc_borrowed_conn", default=None)
+
     def _get_connection_context_manager(self) -> AbstractContextManager[Connection]:
         return adbc_connect(
             self._conn_str,
@@ -51,6 +61,34 @@ class BaseADBCClient:
             },
         )
 
+    def _take_idle_connection(self) -> Optional[Connection]:
+        """Take an idle pooled connection, if there is one."""
+        with self._pool_lock:
+            if len(self._idle_conns) == 0:
+                return None
+            return self._idle_conns.pop()
+
+    def _open_pooled_connection(self) -> Connection:
+        """Open a new connection which will be closed with the session. This blocks."""
+        ctx = self._get_connection_context_manager()
+        conn = ctx.__enter__()
+        with self._pool_lock:
+            self._pooled_conn_ctxs.append(ctx)
+        return conn
+
+    def _release_pooled_connection(self, conn: Connection) -> None:
+        """Give back a pooled connection, so that other queries can borrow it."""
+        with self._pool_lock:
+            self._idle_conns.append(conn)
+
+    def _close_pooled_connections(self) -> None:
+        """Close all pooled connections. This blocks."""
+        with self._pool_lock:
+            ctxs, self._pooled_conn_ctxs = self._pooled_conn_ctxs, []
+            self._idle_conns = []
+        for ctx in ctxs:
+            ctx.__exit__(None, None, None)
+
     def _handle_error(self, err: Exception) -> None:
         if isinstance(err, ProgrammingError):
             if err.status_code in (AdbcStatusCode.UNAUTHENTICATED, AdbcStatusCode.UNAUTHORIZED):
@@ -70,11 +108,16 @@ class BaseADBCClient:
     def _conn(self) -> Connection:
         """Safe accessor to `_conn_unsafe`.
 
-        Raises if it is None and return the value if it is not None.
+        Raises if it is None and return the value if it is not None. If the current thread or task
+        borrowed a pooled connection, return it instead.
         """
         if self._conn_unsafe is None:
             raise ValueError("Cannot perform operation without opening a session first.")
 
+        borrowed = self._borrowed_conn.get()
+        if borrowed is not None:
+            return borrowed
+
         return self._conn_unsafe
 
     @property
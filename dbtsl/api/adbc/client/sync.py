@@ -1,5 +1,6 @@
+import weakref
 from contextlib import contextmanager
-from typing import Iterator, Optional
+from typing import Generator, Iterator, Optional
 
 import pyarrow as pa
 from typing_extensions import Self, Unpack
@@ -43,9 +44,33 @@ class SyncADBCClient(BaseADBCClient):
         ctx = self._get_connection_context_manager()
         with ctx as conn:
             self._conn_unsafe = conn
-            yield self
+            try:
+                yield self
+            finally:
+                self._close_pooled_connections()
             self._conn_unsafe = None
 
+    @contextmanager
+    def _pooled_connection(self) -> Generator[None, None, None]:
+        """Run the operations of the current thread on a pooled connection of their own.
+
+        This lets many threads run queries at the same time. The connection is opened the first
+        time it is needed, and reused by the next threads until the session closes.
+        """
+        if self._conn_unsafe is None:
+            raise ValueError("Cannot perform operation without opening a session first.")
+
+        conn = self._take_idle_connection()
+        if conn is None:
+            conn = self._open_pooled_connection()
+
+        token = self._borrowed_conn.set(conn)
+        try:
+            yield
+        finally:
+            self._borrowed_conn.reset(token)
+            self._release_pooled_connection(conn)
+
     def query(self, **query_params: Unpack[QueryParameters]) -> pa.Table:
         """Query for a dataframe in the Semantic Layer."""
         query_sql = self.PROTOCOL.get_query_sql(query_params)
@@ -60,6 +85,40 @@ class SyncADBCClient(BaseADBCClient):
 
         return table
 
+    def query_reader(self, **query_params: Unpack[QueryParameters]) -> pa.RecordBatchReader:
+        """Query the Semantic Layer, returning a reader that streams the results as record batches.
+
+        Unlike `query`, this doesn't buffer the whole result in memory. Batches are read from the
+        server as the reader gets consumed. The underlying cursor is closed once the reader is
+        exhausted or garbage collected, so make sure to consume it while the session is open.
+        """
+        query_sql = self.PROTOCOL.get_query_sql(query_params)
+
+        cur = self._conn.cursor()
+        try:
+            cur.execute(query_sql)  # pyright: ignore[reportUnknownMemberType]
+        except Exception as err:
+            cur.close()
+            self._handle_error(err)
+
+        reader = cur.fetch_record_batch()
+
+        def read_and_close() -> Iterator[pa.RecordBatch]:
+            try:
+                yield from reader
+            finally:
+                close_cursor()
+
+        batch_reader = pa.RecordBatchReader.from_batches(reader.schema, read_and_close())
+        # the generator's `finally` doesn't run if it never started, so also close the cursor when
+        # the reader gets garbage collected. A finalizer only runs once, whichever happens first.
+        close_cursor = weakref.finalize(batch_reader, cur.close)
+        return batch_reader
+
+    def query_batches(self, **query_params: Unpack[QueryParameters]) -> Iterator[pa.RecordBatch]:
+        """Query the Semantic Layer, yielding the results as record batches while they are streamed."""
+        yield from self.query_reader(**query_params)
+
     def dimension_values(self, **query_params: Unpack[DimensionValuesQueryParameters]) -> pa.Table:
         """Query for the possible values of a dimension."""
         query_sql = self.PROTOCOL.get_dimension_values_sql(query_params)
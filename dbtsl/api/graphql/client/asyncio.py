@@ -1,27 +1,41 @@
 import asyncio
-import time
+import json
 from builtins import TimeoutError as BuiltinTimeoutError
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Optional, Union
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
 
 import pyarrow as pa
-from gql import gql
+from aiohttp import ClientResponse
 from gql.client import AsyncClientSession
 from gql.transport.aiohttp import AIOHTTPTransport
+from gql.transport.exceptions import TransportQueryError
+from graphql import DocumentNode
 from typing_extensions import Self, Unpack, override
 
-from dbtsl.api.graphql.client.base import BaseGraphQLClient, TimeoutOptions
+from dbtsl.api.graphql.client.base import (
+    BaseGraphQLClient,
+    BatchRequest,
+    OperationRequest,
+    PendingBatchRequest,
+    TimeoutOptions,
+)
+from dbtsl.api.graphql.client.query_handle import AsyncQueryHandle
+from dbtsl.api.graphql.client.status_poller import AsyncStatusPoller
 from dbtsl.api.graphql.protocol import (
+    GetQueryResultVariables,
     ProtocolOperation,
-    TJobStatusResult,
-    TJobStatusVariables,
     TResponse,
     TVariables,
 )
-from dbtsl.api.shared.query_params import QueryParameters
-from dbtsl.backoff import ExponentialBackoff
-from dbtsl.error import ConnectTimeoutError, ExecuteTimeoutError, QueryFailedError, RetryTimeoutError, TimeoutError
-from dbtsl.models.query import QueryStatus
+from dbtsl.api.shared import fast_json
+from dbtsl.api.shared.query_params import QueryParameters, query_fingerprint, validate_query_parameters
+from dbtsl.api.shared.singleflight import AsyncSingleFlight
+from dbtsl.backoff import PollingStrategy
+from dbtsl.error import ConnectTimeoutError, ExecuteTimeoutError, QueryFailedError, TimeoutError
+from dbtsl.models.metric import Metric
+from dbtsl.models.query import QueryResult, QueryStatus, QueryStatusResult
 
 # aiohttp only started distinguishing between read and connect timeouts after version 3.10
 # If the user is using an older version, we fall back to considering them both the same thing
@@ -38,10 +52,65 @@ except ImportError:
     AiohttpConnectionTimeout = AsyncioTimeoutError
     _new_aiohttp = False
 
+# aiohttp decodes brotli and zstd responses if the libraries for them are installed. Older versions
+# don't tell us, so we only ask for what every version supports
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+
+    _has_brotli = HAS_BROTLI
+except ImportError:
+    _has_brotli = False
+
+try:
+    from aiohttp.compression_utils import HAS_ZSTD  # pyright: ignore[reportAttributeAccessIssue]
+
+    _has_zstd: bool = HAS_ZSTD
+except ImportError:
+    _has_zstd = False
+
+
+def _validate_page_concurrency(page_concurrency: int) -> None:
+    if page_concurrency < 1:
+        raise ValueError("page_concurrency must be at least 1.")
+
+
+class FastJSONClientResponse(ClientResponse):
+    """An aiohttp response which decodes JSON with the fast JSON backend.
+
+    gql decodes responses with `response.json(content_type=None)`, which decodes the body into a
+    string before parsing it. This parses the raw UTF-8 body instead, and falls back to aiohttp for
+    any other arguments. See `dbtsl.api.shared.fast_json`.
+    """
+
+    @override
+    async def json(
+        self,
+        *,
+        encoding: Optional[str] = None,
+        loads: Callable[[str], Any] = json.loads,
+        content_type: Optional[str] = "application/json",
+    ) -> Any:
+        charset = (self.charset or "utf-8").lower()
+        if (
+            encoding is not None
+            or loads is not json.loads
+            or content_type is not None
+            or charset not in ("utf-8", "utf8")
+        ):
+            return await super().json(encoding=encoding, loads=loads, content_type=content_type)
+
+        body = (await self.read()).strip()
+        if not body:
+            return None
+        return fast_json.loads(body)
+
 
 class AsyncGraphQLClient(BaseGraphQLClient[AIOHTTPTransport, AsyncClientSession]):
     """An asyncio client to access semantic layer via GraphQL, backed by aiohttp."""
 
+    # Tuned with `benchmarks/page_concurrency.py`
+    DEFAULT_PAGE_CONCURRENCY = 16
+
     def __init__(
         self,
         server_host: str,
@@ -51,6 +120,13 @@ class AsyncGraphQLClient(BaseGraphQLClient[AIOHTTPTransport, AsyncClientSession]
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
+        page_concurrency: int = DEFAULT_PAGE_CONCURRENCY,
     ):
         """Initialize the metadata client.
 
@@ -63,15 +139,68 @@ class AsyncGraphQLClient(BaseGraphQLClient[AIOHTTPTransport, AsyncClientSession]
                 will be assumed.
             timeout: TimeoutOptions or total timeout (in seconds) for all GraphQL requests.
             lazy: Whether to lazy load large subfields
+            metadata_cache_ttl: How long (in seconds) to cache the responses of metadata requests such
+                as `metrics` or `dimensions`. If `None`, metadata is not cached.
+            compact_models: Whether to return the compact (slotted) variant of metadata models,
+                which use less memory. See `dbtsl.models.compact`.
+            precompile_decoders: Whether to build the decoders of all responses when a session opens,
+                instead of when each kind of response is first received.
+            response_compression: Which compressed encodings to accept for responses. If `True`, accept
+                every encoding the transport can decode. If `False`, ask for uncompressed responses.
+            persisted_queries: Whether to send the SHA-256 hash of each GraphQL document instead of its
+                text, if the server already knows it (automatic persisted queries).
+            polling_strategy: How long to wait between the polls of a query until it completes. If `None`,
+                use an exponential backoff. See `dbtsl.backoff`.
+            page_concurrency: The maximum number of result pages that will be fetched at the same
+                time. Can be overridden on a per-query basis.
 
         NOTE: If `timeout` is a `TimeoutOptions`, the `connect_timeout` will not be used, due to
         limitations of `gql`'s `aiohttp` transport.
         See: https://github.com/graphql-python/gql/blob/b066e8944b0da0a4bbac6c31f43e5c3c7772cd51/gql/transport/aiohttp.py#L110
         """
-        super().__init__(server_host, environment_id, auth_token, url_format, timeout, lazy=lazy)
+        _validate_page_concurrency(page_concurrency)
+        self.page_concurrency = page_concurrency
+
+        self._query_flights = AsyncSingleFlight()
+
+        # Loads waiting to be dispatched at the end of the current event loop iteration
+        self._pending_loads: List[Tuple[ProtocolOperation[Any, Any], Mapping[str, Any], "asyncio.Future[Any]"]] = []
+        # Keep references to running dispatches so they don't get garbage collected
+        self._load_tasks: Set["asyncio.Task[None]"] = set()
+
+        super().__init__(
+            server_host,
+            environment_id,
+            auth_token,
+            url_format,
+            timeout,
+            lazy=lazy,
+            metadata_cache_ttl=metadata_cache_ttl,
+            compact_models=compact_models,
+            precompile_decoders=precompile_decoders,
+            response_compression=response_compression,
+            persisted_queries=persisted_queries,
+            polling_strategy=polling_strategy,
+        )
+
+        self._status_poller = AsyncStatusPoller(self.PROTOCOL.get_query_status, self._run_batch)
+
+    @classmethod
+    @override
+    def _supported_encodings(cls) -> Set[str]:
+        encodings = {"gzip", "deflate"}
+        if _has_brotli:
+            encodings.add("br")
+        if _has_zstd:
+            encodings.add("zstd")
+        return encodings
 
     @override
     def _create_transport(self, url: str, headers: Dict[str, str]) -> AIOHTTPTransport:
+        client_session_args: Optional[Dict[str, Any]] = None
+        if fast_json.FAST_JSON_BACKEND is not None:
+            client_session_args = {"response_class": FastJSONClientResponse}
+
         return AIOHTTPTransport(
             url=url,
             headers=headers,
@@ -80,6 +209,7 @@ class AsyncGraphQLClient(BaseGraphQLClient[AIOHTTPTransport, AsyncClientSession]
             # See: https://docs.aiohttp.org/en/stable/client_reference.html#aiohttp.ClientTimeout
             timeout=self.timeout.execute_timeout,  # type: ignore
             ssl_close_timeout=self.timeout.tls_close_timeout,
+            client_session_args=client_session_args,
         )
 
     @asynccontextmanager
@@ -92,20 +222,77 @@ class AsyncGraphQLClient(BaseGraphQLClient[AIOHTTPTransport, AsyncClientSession]
         if self._gql_session_unsafe is not None:
             raise ValueError("A client session is already open.")
 
+        self._prepare_operations()
+
         async with self._gql as session:
             assert isinstance(session, AsyncClientSession)
             self._gql_session_unsafe = session
-            yield self
-            self._gql_session_unsafe = None
+            try:
+                yield self
+            finally:
+                try:
+                    await self._stop_background_tasks()
+                finally:
+                    self._gql_session_unsafe = None
+
+    async def _stop_background_tasks(self) -> None:
+        """Cancel status polling and lazy loads, which can't run once the session closes, and wait for them."""
+        loads, self._pending_loads = self._pending_loads, []
+        for _, _, future in loads:
+            future.cancel()
+
+        load_tasks = list(self._load_tasks)
+        for task in load_tasks:
+            task.cancel()
+
+        await self._status_poller.close()
+        if len(load_tasks) > 0:
+            await asyncio.wait(load_tasks)
+
+    async def _execute(
+        self, op: ProtocolOperation[Any, Any], gql_query: DocumentNode, variables: Dict[str, Any]
+    ) -> Any:
+        """Execute a GraphQL request, as a persisted query if `persisted_queries` is enabled.
+
+        Queries are only sent as a hash once the server is known to have them. Otherwise, or if the
+        server doesn't have them anymore, they are sent with their full text so that the server
+        persists them.
+        """
+        if not self.persisted_queries:
+            return await self._gql_session.execute(gql_query, variable_values=variables)  # type: ignore
+
+        query, query_hash = self._get_persisted_query(op)
+        if query_hash in self._known_query_hashes:
+            try:
+                return await self._gql_session.execute(  # type: ignore
+                    gql_query,
+                    variable_values=variables,
+                    extra_args=self._persisted_query_payload(query_hash, variables),
+                )
+            except TransportQueryError as err:
+                if not self._is_persisted_query_miss(err):
+                    raise
+                self._known_query_hashes.discard(query_hash)
+
+        res = await self._gql_session.execute(  # type: ignore
+            gql_query, variable_values=variables, extra_args=self._persisted_query_payload(query_hash, variables, query)
+        )
+        self._known_query_hashes.add(query_hash)
+        return res
 
     async def _run(self, op: ProtocolOperation[TVariables, TResponse], raw_variables: TVariables) -> TResponse:
         """Run a `ProtocolOperation`."""
-        raw_query = op.get_request_text(lazy=self.lazy)
+        gql_query = self._get_document(op)
         variables = op.get_request_variables(environment_id=self.environment_id, variables=raw_variables)
-        gql_query = gql(raw_query)
+
+        cache_key = self._metadata_cache_key(op, variables)
+        if cache_key is not None:
+            cached = self._get_cached_metadata(cache_key)
+            if cached is not None:
+                return cached
 
         try:
-            res = await self._gql_session.execute(gql_query, variable_values=variables)  # type: ignore
+            res = await self._execute(op, gql_query, variables)
         except AiohttpConnectionTimeout as err:
             if _new_aiohttp:
                 raise ConnectTimeoutError(timeout_s=self.timeout.connect_timeout) from err
@@ -119,56 +306,290 @@ class AsyncGraphQLClient(BaseGraphQLClient[AIOHTTPTransport, AsyncClientSession]
 
         resp = op.parse_response(res)
         self._attach_self_to_parsed_response(resp)
+        if cache_key is not None:
+            self._cache_metadata(cache_key, resp)
         return resp
 
-    async def _poll_until_complete(
+    async def _run_batch(self, requests: Sequence[BatchRequest]) -> List[Any]:
+        """Run many operations in as few GraphQL requests as possible.
+
+        Returns the response of each operation in order, or the exception it raised.
+        """
+        results, chunks = self._plan_batch(requests)
+        chunk_results = await asyncio.gather(*(self._run_batch_chunk(chunk) for chunk in chunks))
+        for chunk, res in zip(chunks, chunk_results):
+            self._finish_batch_chunk(chunk, res, results)
+        return results
+
+    async def _run_batch_chunk(self, chunk: Sequence[PendingBatchRequest]) -> List[Any]:
+        """Run a chunk of a batch in a single GraphQL request."""
+        if len(chunk) == 1:
+            try:
+                return [await self._run(op=chunk[0].op, raw_variables=chunk[0].raw_variables)]
+            except Exception as err:
+                return [err]
+
+        op, variables = self._make_composite(chunk)
+        try:
+            return await self._run(op=op, raw_variables=variables)
+        except TransportQueryError as err:
+            return self._split_composite_error(op, err)
+        except Exception as err:
+            return [err] * len(chunk)
+
+    async def _load(self, op: ProtocolOperation[TVariables, TResponse], raw_variables: TVariables) -> TResponse:
+        """Run an operation to lazy load a field.
+
+        All loads started in the same event loop iteration (e.g by `asyncio.gather`) get batched
+        into as few GraphQL requests as possible.
+        """
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[TResponse]" = loop.create_future()
+        self._pending_loads.append((op, raw_variables, future))
+        if len(self._pending_loads) == 1:
+            loop.call_soon(self._dispatch_loads)
+        return await future
+
+    def _dispatch_loads(self) -> None:
+        """Send all pending loads as a single batch."""
+        loads, self._pending_loads = self._pending_loads, []
+        if len(loads) == 0:
+            # the session closed before they got dispatched
+            return
+
+        task = asyncio.ensure_future(self._run_loads(loads))
+        self._load_tasks.add(task)
+        task.add_done_callback(self._load_tasks.discard)
+
+    async def _run_loads(
+        self, loads: Sequence[Tuple[ProtocolOperation[Any, Any], Mapping[str, Any], "asyncio.Future[Any]"]]
+    ) -> None:
+        results: List[Any]
+        try:
+            results = await self._run_batch([(op, raw_variables) for op, raw_variables, _ in loads])
+        except Exception as err:
+            results = [err] * len(loads)
+        except asyncio.CancelledError:
+            # don't leave the waiters hanging if the session closes
+            for _, _, future in loads:
+                future.cancel()
+            raise
+
+        for (_, _, future), result in zip(loads, results):
+            # the waiter might have been cancelled
+            if future.done():
+                continue
+
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def load_all(
         self,
-        poll_op: ProtocolOperation[TJobStatusVariables, TJobStatusResult],
-        variables: TJobStatusVariables,
-        backoff: Optional[ExponentialBackoff] = None,
-    ) -> TJobStatusResult:
-        """Poll for a job's results until it is in a completed state (SUCCESSFUL or FAILED)."""
-        if backoff is None:
-            backoff = self._default_backoff()
-
-        # support for deprecated ExponentialBackoff.timeout_ms
-        total_timeout_s = backoff.timeout_ms * 1000.0 if backoff.timeout_ms is not None else self.timeout.total_timeout
-
-        start_s = time.time()
-        for sleep_ms in backoff.iter_ms():
-            qr = await self._run(op=poll_op, raw_variables=variables)
-            if qr.status in (QueryStatus.SUCCESSFUL, QueryStatus.FAILED):
-                return qr
-
-            elapsed_s = time.time() - start_s
-            if elapsed_s > total_timeout_s:
-                raise RetryTimeoutError(timeout_s=total_timeout_s, status=qr.status.value)
-
-            await asyncio.sleep(sleep_ms / 1000)
-
-        # This should be unreachable
-        raise ValueError()
-
-    async def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
-        """Query the Semantic Layer."""
+        metrics: Sequence[Metric],
+        fields: Sequence[str] = ("dimensions", "measures", "entities"),
+    ) -> None:
+        """Lazy load `fields` of all `metrics`, in as few GraphQL requests as possible.
+
+        Args:
+            metrics: the metrics to load fields for.
+            fields: which lazy loadable fields to load.
+        """
+        targets, requests = self._load_all_requests(metrics, fields)
+        self._set_loaded_fields(targets, await self._run_batch(requests))
+
+    async def run_many(self, requests: Sequence[OperationRequest], *, return_exceptions: bool = False) -> List[Any]:
+        """Run many operations in as few GraphQL requests as possible.
+
+        Each request is the name of a method of this client, like `"metrics"`, optionally with the
+        keyword arguments to call it with, like `("dimensions", {"metrics": ["revenue"]})`. They all
+        get merged into a single GraphQL request (or a few, if there are a lot of them), and the
+        response gets split back into what each method would have returned.
+
+        All operations must either be queries or mutations, they can't be mixed.
+
+        Args:
+            requests: the operations to run.
+            return_exceptions: if true, return the exception raised by an operation in place of its
+                result. Otherwise, raise the first exception after all operations are done.
+
+        Returns:
+            The result of each operation, in order.
+        """
+        results = await self._run_batch(self._run_many_requests(requests))
+        if not return_exceptions:
+            self._raise_first_error(results)
+        return results
+
+    async def _create_query_and_wait(self, params: QueryParameters) -> QueryResult:
+        """Create a query and wait for it to complete, returning its first page of results."""
         query_id = await self.create_query(**params)
-        first_page_results = await self._poll_until_complete(
-            poll_op=self.PROTOCOL.get_query_result,
-            variables={"query_id": query_id, "page_num": 1},
-        )
-        if first_page_results.status != QueryStatus.SUCCESSFUL:
-            raise QueryFailedError(first_page_results.error, first_page_results.status, query_id)
+        # only poll for the status, so that the SQL and results aren't sent over and over, and
+        # together with other queries of this client, so that they share requests
+        status = await self._status_poller.wait(query_id, **self._status_poll_options(params))
+        return await self._first_page(status)
 
+    async def _first_page(self, status: QueryStatusResult) -> QueryResult:
+        """Fetch the first page of results of a completed query, raising if it failed."""
+        query_id = status.query_id
+        if status.status != QueryStatus.SUCCESSFUL:
+            raise QueryFailedError(status.error, status.status, query_id)
+
+        first_page_variables: GetQueryResultVariables = {"query_id": query_id, "page_num": 1}
+        first_page_results = await self._run(op=self.PROTOCOL.get_query_result, raw_variables=first_page_variables)
         assert first_page_results.total_pages is not None
+        return first_page_results
+
+    async def _iter_pages(
+        self,
+        first_page: QueryResult,
+        prefetch: int,
+        page_concurrency: int,
+    ) -> AsyncIterator[QueryResult]:
+        """Iterate over all pages of a successful query, in order.
+
+        While a page is being consumed, up to `prefetch` of the following pages get fetched in
+        the background, with at most `page_concurrency` requests in flight. If `prefetch` is 0,
+        each page only gets fetched once it is needed.
+        """
+        assert first_page.total_pages is not None
+        query_id = first_page.query_id
+
+        # Only allow `page_concurrency` requests in flight at once, otherwise large results
+        # would trip rate limits
+        semaphore = asyncio.Semaphore(page_concurrency)
+
+        async def fetch_page(page: int) -> QueryResult:
+            async with semaphore:
+                return await self.get_query_result(query_id=query_id, page_num=page)
+
+        pages = iter(range(2, first_page.total_pages + 1))
+        if prefetch == 0:
+            yield first_page
+            for page in pages:
+                yield await fetch_page(page)
+            return
+
+        pending: Deque["asyncio.Future[QueryResult]"] = deque(
+            asyncio.ensure_future(fetch_page(page)) for page in islice(pages, prefetch)
+        )
+        try:
+            yield first_page
+
+            while len(pending) > 0:
+                result = await pending.popleft()
+                # keep `prefetch` pages in flight while the caller consumes this one
+                pending.extend(asyncio.ensure_future(fetch_page(page)) for page in islice(pages, 1))
+                yield result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def query(
+        self,
+        *,
+        page_concurrency: Optional[int] = None,
+        **params: Unpack[QueryParameters],
+    ) -> "pa.Table":
+        """Query the Semantic Layer.
+
+        Concurrent calls with equivalent parameters share the same query and its results, unless
+        `read_cache=False` is passed.
+
+        Args:
+            page_concurrency: The maximum number of result pages to fetch at the same time. If `None`,
+                the client's `page_concurrency` will be used.
+            **params: The query parameters.
+        """
+        if page_concurrency is None:
+            page_concurrency = self.page_concurrency
+        _validate_page_concurrency(page_concurrency)
+
+        if not params.get("read_cache", True):
+            return await self._query(params, page_concurrency)
 
+        key = query_fingerprint(validate_query_parameters(params))
+        return await self._query_flights.do(key, lambda: self._query(params, page_concurrency))
+
+    async def _query(self, params: QueryParameters, page_concurrency: int) -> "pa.Table":
+        """Query the Semantic Layer and fetch all pages of results."""
+        return await self._fetch_table(await self._create_query_and_wait(params), page_concurrency)
+
+    async def _fetch_table(self, first_page_results: QueryResult, page_concurrency: Optional[int]) -> "pa.Table":
+        """Fetch all pages of results of a successful query into a single table."""
+        if page_concurrency is None:
+            page_concurrency = self.page_concurrency
+        _validate_page_concurrency(page_concurrency)
+
+        assert first_page_results.total_pages is not None
         if first_page_results.total_pages == 1:
             return first_page_results.result_table
 
-        tasks = [
-            self.get_query_result(query_id=query_id, page_num=page)
-            for page in range(2, first_page_results.total_pages + 1)
-        ]
-        all_page_results = [first_page_results] + await asyncio.gather(*tasks)
-        tables = [r.result_table for r in all_page_results]
+        # We need all pages anyways, so let all of them be fetched as fast as `page_concurrency` allows
+        pages = self._iter_pages(
+            first_page_results,
+            prefetch=first_page_results.total_pages - 1,
+            page_concurrency=page_concurrency,
+        )
+        tables = [r.result_table async for r in pages]
         final_table = pa.concat_tables(tables)  # type: ignore
         return final_table
+
+    async def query_batches(
+        self,
+        *,
+        prefetch: Optional[int] = None,
+        page_concurrency: Optional[int] = None,
+        **params: Unpack[QueryParameters],
+    ) -> AsyncIterator["pa.RecordBatch"]:
+        """Query the Semantic Layer, yielding the results page by page as record batches.
+
+        Unlike `query`, this never holds more than `prefetch + 1` pages in memory at once, so it can
+        be used to process results that don't fit in memory.
+
+        The query only gets created once iteration starts.
+
+        Args:
+            prefetch: How many pages to fetch ahead of the page currently being consumed. If `None`,
+                `page_concurrency` will be used. If 0, pages are only fetched when needed.
+            page_concurrency: The maximum number of result pages to fetch at the same time. If `None`,
+                the client's `page_concurrency` will be used.
+            **params: The query parameters.
+        """
+        if page_concurrency is None:
+            page_concurrency = self.page_concurrency
+        _validate_page_concurrency(page_concurrency)
+        if prefetch is None:
+            prefetch = page_concurrency
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative.")
+
+        first_page_results = await self._create_query_and_wait(params)
+        async for batch in self._fetch_batches(first_page_results, prefetch, page_concurrency):
+            yield batch
+
+    async def _fetch_batches(
+        self, first_page_results: QueryResult, prefetch: int, page_concurrency: Optional[int] = None
+    ) -> AsyncIterator["pa.RecordBatch"]:
+        """Fetch the pages of results of a successful query, yielding them as record batches."""
+        if page_concurrency is None:
+            page_concurrency = self.page_concurrency
+        pages = self._iter_pages(first_page_results, prefetch=prefetch, page_concurrency=page_concurrency)
+        async for page_results in pages:
+            for batch in page_results.result_table.to_batches():
+                yield batch
+
+    async def submit_query(self, **params: Unpack[QueryParameters]) -> AsyncQueryHandle:
+        """Create a query in the Semantic Layer, without waiting for it to complete.
+
+        This returns as soon as the query got created, with a handle to wait for it and fetch its
+        results later. Use `dbtsl.api.graphql.client.query_handle.async_wait_all` or
+        `async_as_completed` to wait for many of them.
+
+        Unlike `query`, queries submitted with equivalent parameters don't share their results.
+        """
+        query_id = await self.create_query(**params)
+        waiter = self._status_poller.submit(query_id, **self._status_poll_options(params))
+        # handles are typed against the client's stub
+        return AsyncQueryHandle(self, waiter)
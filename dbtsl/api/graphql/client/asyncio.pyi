@@ -1,23 +1,34 @@
 # mypy: disable-error-code="misc"
 
 from contextlib import AbstractAsyncContextManager
-from typing import List, Optional, Self, Union
+from typing import Any, ClassVar, List, Optional, Self, Sequence, Type, Union
 
 import pyarrow as pa
+from aiohttp import ClientResponse
 from typing_extensions import AsyncIterator, Unpack, overload
 
+from dbtsl.api.graphql.client.base import OperationRequest
+from dbtsl.api.graphql.client.query_handle import AsyncQueryHandle
+from dbtsl.api.graphql.protocol import GraphQLProtocol
 from dbtsl.api.shared.query_params import GroupByParam, OrderByGroupBy, OrderByMetric, QueryParameters
+from dbtsl.backoff import PollingStrategy
 from dbtsl.models import (
     AsyncMetric,
     Dimension,
     Entity,
     EnvironmentInfo,
     Measure,
+    Metric,
     SavedQuery,
 )
 from dbtsl.timeout import TimeoutOptions
 
+class FastJSONClientResponse(ClientResponse): ...
+
 class AsyncGraphQLClient:
+    PROTOCOL: ClassVar[Type[GraphQLProtocol]]
+    page_concurrency: int
+
     def __init__(
         self,
         server_host: str,
@@ -27,10 +38,38 @@ class AsyncGraphQLClient:
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
+        page_concurrency: int = ...,
     ) -> None: ...
     def session(self) -> AbstractAsyncContextManager[AsyncIterator[Self]]: ...
     @property
     def has_session(self) -> bool: ...
+    def invalidate_metadata_cache(self) -> None:
+        """Clear all cached metadata, so that the next metadata requests go to the server."""
+        ...
+
+    async def load_all(
+        self,
+        metrics: Sequence[Metric],
+        fields: Sequence[str] = ("dimensions", "measures", "entities"),
+    ) -> None:
+        """Lazy load `fields` of all `metrics`, in as few GraphQL requests as possible."""
+        ...
+
+    async def run_many(
+        self,
+        requests: Sequence[OperationRequest],
+        *,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Run many operations in as few GraphQL requests as possible."""
+        ...
+
     async def metrics(self) -> List[AsyncMetric]:
         """Get a list of all available metrics."""
         ...
@@ -50,6 +89,26 @@ class AsyncGraphQLClient:
     async def saved_queries(self) -> List[SavedQuery]:
         """Get a list of all available saved queries."""
         ...
+
+    async def metrics_table(self) -> "pa.Table":
+        """Get a table of all available metrics, with one row per metric."""
+        ...
+
+    async def dimensions_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available dimensions for a given set of metrics, with one row per dimension."""
+        ...
+
+    async def measures_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available measures for a given set of metrics, with one row per measure."""
+        ...
+
+    async def entities_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available entities for a given set of metrics, with one row per entity."""
+        ...
+
+    async def saved_queries_table(self) -> "pa.Table":
+        """Get a table of all available saved queries, with one row per saved query."""
+        ...
     async def environment_info(self) -> EnvironmentInfo:
         """Get information about the Semantic Layer environment."""
         ...
@@ -95,6 +154,7 @@ class AsyncGraphQLClient:
         order_by: Optional[List[Union[str, OrderByGroupBy, OrderByMetric]]] = None,
         where: Optional[List[str]] = None,
         read_cache: bool = True,
+        page_concurrency: Optional[int] = None,
     ) -> "pa.Table": ...
     @overload
     async def query(
@@ -104,6 +164,7 @@ class AsyncGraphQLClient:
         order_by: Optional[List[Union[str, OrderByGroupBy]]] = None,
         where: Optional[List[str]] = None,
         read_cache: bool = True,
+        page_concurrency: Optional[int] = None,
     ) -> "pa.Table": ...
     @overload
     async def query(
@@ -113,7 +174,84 @@ class AsyncGraphQLClient:
         order_by: Optional[List[Union[OrderByGroupBy, OrderByMetric]]] = None,
         where: Optional[List[str]] = None,
         read_cache: bool = True,
+        page_concurrency: Optional[int] = None,
     ) -> "pa.Table": ...
-    async def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
+    async def query(self, *, page_concurrency: Optional[int] = None, **params: Unpack[QueryParameters]) -> "pa.Table":
         """Query the Semantic Layer."""
         ...
+
+    @overload
+    def query_batches(
+        self,
+        metrics: List[str],
+        group_by: Optional[List[Union[GroupByParam, str]]] = None,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+        prefetch: Optional[int] = None,
+        page_concurrency: Optional[int] = None,
+    ) -> AsyncIterator["pa.RecordBatch"]: ...
+    @overload
+    def query_batches(
+        self,
+        group_by: List[Union[GroupByParam, str]],
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+        prefetch: Optional[int] = None,
+        page_concurrency: Optional[int] = None,
+    ) -> AsyncIterator["pa.RecordBatch"]: ...
+    @overload
+    def query_batches(
+        self,
+        saved_query: str,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+        prefetch: Optional[int] = None,
+        page_concurrency: Optional[int] = None,
+    ) -> AsyncIterator["pa.RecordBatch"]: ...
+    def query_batches(
+        self,
+        *,
+        prefetch: Optional[int] = None,
+        page_concurrency: Optional[int] = None,
+        **params: Unpack[QueryParameters],
+    ) -> AsyncIterator["pa.RecordBatch"]:
+        """Query the Semantic Layer, yielding the results page by page as record batches."""
+        ...
+
+    @overload
+    async def submit_query(
+        self,
+        metrics: List[str],
+        group_by: Optional[List[Union[GroupByParam, str]]] = None,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> AsyncQueryHandle: ...
+    @overload
+    async def submit_query(
+        self,
+        group_by: List[Union[GroupByParam, str]],
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> AsyncQueryHandle: ...
+    @overload
+    async def submit_query(
+        self,
+        saved_query: str,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> AsyncQueryHandle: ...
+    async def submit_query(self, **params: Unpack[QueryParameters]) -> AsyncQueryHandle:
+        """Create a query in the Semantic Layer, without waiting for it to complete."""
+        ...
@@ -1,24 +1,81 @@
+import hashlib
+import json
+import threading
+import time
 import warnings
 from abc import abstractmethod
-from typing import Any, Dict, Generic, Optional, Protocol, TypeVar, Union
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generic,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from gql import Client
+from gql import Client, gql
 from gql.client import AsyncClientSession, SyncClientSession
 from gql.transport import AsyncTransport, Transport
 from gql.transport.exceptions import TransportQueryError
+from graphql import DocumentNode
 
 import dbtsl.env as env
 from dbtsl.api.graphql.protocol import (
+    CompactGraphQLProtocol,
+    CompositeOperation,
+    CompositeVariables,
     GraphQLProtocol,
+    ProtocolOperation,
+    get_composite_operation,
+    prepare_operations,
 )
-from dbtsl.backoff import ExponentialBackoff
+from dbtsl.api.shared.query_params import QueryParameters, query_fingerprint, validate_query_parameters
+from dbtsl.backoff import ExponentialBackoff, PollingStrategy
 from dbtsl.error import AuthError
 from dbtsl.models.base import GraphQLFragmentMixin
+from dbtsl.models.metric import Metric
 from dbtsl.timeout import TimeoutOptions
 
+if TYPE_CHECKING:
+    from dbtsl.api.graphql.client.status_poller import StatusPollOptions
+
 TTransport = TypeVar("TTransport", Transport, AsyncTransport)
 TSession = TypeVar("TSession", SyncClientSession, AsyncClientSession)
 
+# (operation, serialized request variables, lazy)
+MetadataCacheKey = Tuple[ProtocolOperation[Any, Any], str, bool]
+
+# An operation to run as part of a batch, with its raw variables
+BatchRequest = Tuple[ProtocolOperation[Any, Any], Mapping[str, Any]]
+
+# What servers answer when they don't know the hash of a persisted query, or don't support
+# persisted queries at all
+PERSISTED_QUERY_MISS_CODES = ("PERSISTED_QUERY_NOT_FOUND", "PERSISTED_QUERY_NOT_SUPPORTED")
+PERSISTED_QUERY_MISS_MESSAGES = ("PersistedQueryNotFound", "PersistedQueryNotSupported")
+
+# A request for `run_many`: the name of a client method, optionally with its keyword arguments
+OperationRequest = Union[str, Tuple[str, Mapping[str, Any]]]
+
+
+@dataclass
+class PendingBatchRequest:
+    """A deduplicated request in a batch which still needs to be sent to the server."""
+
+    op: ProtocolOperation[Any, Any]
+    raw_variables: Mapping[str, Any]
+    cache_key: Optional[MetadataCacheKey]
+    # indices of all the requests in the batch which are the same as this one
+    indices: List[int]
+
 
 class BaseGraphQLClient(Generic[TTransport, TSession]):
     """Base class for the GraphQL API client.
@@ -39,6 +96,17 @@ class BaseGraphQLClient(Generic[TTransport, TSession]):
         tls_close_timeout=5,
     )
 
+    # The maximum number of operations to send in a single batched request
+    MAX_BATCH_SIZE = 50
+
+    # The maximum number of responses to keep in the metadata cache. Once it is full, the least
+    # recently used ones get evicted.
+    METADATA_CACHE_MAX_ENTRIES = 1024
+
+    # Compressed response encodings we can ask for, most preferred first. zstd and brotli
+    # compress better and decompress faster than gzip, but need extra libraries.
+    RESPONSE_ENCODINGS = ("zstd", "br", "gzip", "deflate")
+
     @classmethod
     def _default_backoff(cls) -> ExponentialBackoff:
         """Get the default backoff behavior when polling."""
@@ -62,9 +130,25 @@ class BaseGraphQLClient(Generic[TTransport, TSession]):
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
     ):
+        if metadata_cache_ttl is not None and metadata_cache_ttl <= 0:
+            raise ValueError("metadata_cache_ttl must be positive.")
+
         self.environment_id = environment_id
         self.lazy = lazy
+        self.metadata_cache_ttl = metadata_cache_ttl
+        self.compact_models = compact_models
+        self.precompile_decoders = precompile_decoders
+        self.persisted_queries = persisted_queries
+        self.polling_strategy = polling_strategy or self._default_backoff()
+        if compact_models:
+            self.PROTOCOL = CompactGraphQLProtocol  # pyright: ignore[reportConstantRedefinition]
 
         url_format = url_format or self.DEFAULT_URL_FORMAT
         server_url = url_format.format(server_host=server_host)
@@ -80,20 +164,317 @@ class BaseGraphQLClient(Generic[TTransport, TSession]):
 
         self.timeout = timeout or self.DEFAULT_TIMEOUT
 
-        headers = {
+        self._server_url = server_url
+        self._headers = {
             "authorization": f"bearer {auth_token}",
+            "accept-encoding": self._accept_encoding(response_compression),
             **self._extra_headers(),
         }
-        transport = self._create_transport(url=server_url, headers=headers)
-        self._gql = Client(transport=transport, execute_timeout=self.timeout.execute_timeout)
+        self._gql = self._create_gql_client()
 
         self._gql_session_unsafe: Union[TSession, None] = None
 
+        # Parsed GraphQL documents, keyed by (operation, lazy). The request text of an
+        # operation only depends on `lazy`, so we only need to parse it once.
+        self._documents: Dict[Tuple[ProtocolOperation[Any, Any], bool], DocumentNode] = {}
+
+        # Parsed responses of cacheable operations, with the time at which they expire, from least
+        # to most recently used
+        self._metadata_cache_lock = threading.Lock()
+        self._metadata_cache: "OrderedDict[MetadataCacheKey, Tuple[float, Any]]" = OrderedDict()
+
+        # The request text of operations and its SHA-256 hash, keyed by (operation, lazy), and the
+        # hashes the server is known to have persisted
+        self._persisted_queries: Dict[Tuple[ProtocolOperation[Any, Any], bool], Tuple[str, str]] = {}
+        self._known_query_hashes: Set[str] = set()
+
+    @classmethod
+    @abstractmethod
+    def _supported_encodings(cls) -> Set[str]:
+        """Get the response content encodings the transport can decode.
+
+        This depends on which compression libraries are installed.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def _accept_encoding(cls, response_compression: Union[bool, Sequence[str]]) -> str:
+        """Get the `Accept-Encoding` header which requests the given response compression."""
+        if response_compression is False:
+            return "identity"
+
+        supported_set = cls._supported_encodings()
+        supported = [encoding for encoding in cls.RESPONSE_ENCODINGS if encoding in supported_set]
+        if response_compression is True:
+            return ", ".join(supported)
+
+        if isinstance(response_compression, str) or len(response_compression) == 0:
+            raise ValueError("response_compression must be a bool or a non-empty sequence of encodings.")
+
+        for encoding in response_compression:
+            if encoding not in supported:
+                raise ValueError(
+                    f"Can't decode responses compressed with '{encoding}'. Supported encodings: {', '.join(supported)}."
+                )
+
+        return ", ".join(response_compression)
+
+    def _poll_timeout_s(self, backoff: PollingStrategy) -> float:
+        """Get how long to poll for a job before giving up."""
+        # support for deprecated ExponentialBackoff.timeout_ms
+        if isinstance(backoff, ExponentialBackoff) and backoff.timeout_ms is not None:
+            return backoff.timeout_ms / 1000.0
+        return self.timeout.total_timeout
+
+    def _status_poll_options(self, params: QueryParameters) -> "StatusPollOptions":
+        """Get how to poll for the status of a query created with `params`."""
+        return {
+            "strategy": self.polling_strategy,
+            # lets adaptive polling strategies learn how long this query usually takes
+            "key": query_fingerprint(validate_query_parameters(params)),
+            "timeout_s": self._poll_timeout_s(self.polling_strategy),
+        }
+
     @abstractmethod
     def _create_transport(self, url: str, headers: Dict[str, str]) -> TTransport:
         """Create the underlying transport to be used by the gql Client."""
         raise NotImplementedError()
 
+    def _create_gql_client(self) -> Client:
+        """Create a new gql Client with its own transport, and thus its own connection."""
+        transport = self._create_transport(url=self._server_url, headers=self._headers)
+        return Client(transport=transport, execute_timeout=self.timeout.execute_timeout)
+
+    def _get_document(self, op: ProtocolOperation[Any, Any]) -> DocumentNode:
+        """Get the parsed GraphQL document of an operation, parsing it only on first use."""
+        key = (op, self.lazy)
+        document = self._documents.get(key)
+        if document is None:
+            document = gql(op.get_request_text(lazy=self.lazy))
+            self._documents[key] = document
+
+        return document
+
+    def _get_persisted_query(self, op: ProtocolOperation[Any, Any]) -> Tuple[str, str]:
+        """Get the request text of an operation and its SHA-256 hash, hashing it only on first use."""
+        key = (op, self.lazy)
+        persisted = self._persisted_queries.get(key)
+        if persisted is None:
+            text = op.get_request_text(lazy=self.lazy)
+            persisted = (text, hashlib.sha256(text.encode("utf-8")).hexdigest())
+            self._persisted_queries[key] = persisted
+
+        return persisted
+
+    @staticmethod
+    def _persisted_query_payload(
+        query_hash: str, variables: Dict[str, Any], query: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get the extra arguments to send a persisted query to gql transports.
+
+        These replace the JSON body which the transports would build, so that the query text can
+        be left out.
+        """
+        payload: Dict[str, Any] = {
+            "extensions": {"persistedQuery": {"version": 1, "sha256Hash": query_hash}},
+        }
+        if query is not None:
+            payload["query"] = query
+        if variables:
+            payload["variables"] = variables
+        return {"json": payload}
+
+    @staticmethod
+    def _is_persisted_query_miss(err: TransportQueryError) -> bool:
+        """Whether the server rejected a persisted query because it doesn't know its hash."""
+        for error in err.errors or []:
+            extensions: Dict[str, Any] = error.get("extensions") or {}
+            code = extensions.get("code")
+            message = error.get("message")
+            if code in PERSISTED_QUERY_MISS_CODES or message in PERSISTED_QUERY_MISS_MESSAGES:
+                return True
+        return False
+
+    def _metadata_cache_key(
+        self, op: ProtocolOperation[Any, Any], variables: Dict[str, Any]
+    ) -> Optional[MetadataCacheKey]:
+        """Get the key of an operation's response in the metadata cache, or `None` if it shouldn't be cached."""
+        if self.metadata_cache_ttl is None or not op.cacheable:
+            return None
+
+        return (op, json.dumps(variables, sort_keys=True), self.lazy)
+
+    @staticmethod
+    def _copy_metadata(resp: Any) -> Any:
+        """Get a shallow copy of list responses, so that callers can't mutate cached ones."""
+        if isinstance(resp, list):
+            return list(resp)  # pyright: ignore[reportUnknownArgumentType,reportUnknownVariableType]
+        return resp
+
+    def _get_cached_metadata(self, key: MetadataCacheKey) -> Optional[Any]:
+        """Get a cached response, or `None` if it is not cached or has expired."""
+        with self._metadata_cache_lock:
+            entry = self._metadata_cache.get(key)
+            if entry is None:
+                return None
+
+            expires_at, resp = entry
+            if time.monotonic() >= expires_at:
+                self._metadata_cache.pop(key, None)
+                return None
+
+            self._metadata_cache.move_to_end(key)
+
+        return self._copy_metadata(resp)
+
+    def _cache_metadata(self, key: MetadataCacheKey, resp: Any) -> None:
+        """Store a response in the metadata cache, evicting the least recently used ones if it is full."""
+        assert self.metadata_cache_ttl is not None
+        entry = (time.monotonic() + self.metadata_cache_ttl, self._copy_metadata(resp))
+        with self._metadata_cache_lock:
+            self._metadata_cache[key] = entry
+            self._metadata_cache.move_to_end(key)
+            while len(self._metadata_cache) > self.METADATA_CACHE_MAX_ENTRIES:
+                self._metadata_cache.popitem(last=False)
+
+    def invalidate_metadata_cache(self) -> None:
+        """Clear all cached metadata, so that the next metadata requests go to the server.
+
+        Call this after changing your project's definitions, if you don't want to wait for the
+        cached metadata to expire.
+        """
+        with self._metadata_cache_lock:
+            self._metadata_cache.clear()
+
+    def _plan_batch(self, requests: Sequence[BatchRequest]) -> Tuple[List[Any], List[List[PendingBatchRequest]]]:
+        """Plan how to run a batch of requests.
+
+        Returns the results of the batch, pre-filled with hits from the metadata cache, and the
+        deduplicated requests that still need to be sent, in chunks of at most `MAX_BATCH_SIZE`.
+        """
+        results: List[Any] = [None] * len(requests)
+        pending: Dict[Tuple[ProtocolOperation[Any, Any], str], PendingBatchRequest] = {}
+        for i, (op, raw_variables) in enumerate(requests):
+            variables = op.get_request_variables(environment_id=self.environment_id, variables=raw_variables)
+
+            dedup_key = (op, json.dumps(variables, sort_keys=True, default=str))
+            duplicate = pending.get(dedup_key)
+            if duplicate is not None:
+                duplicate.indices.append(i)
+                continue
+
+            cache_key = self._metadata_cache_key(op, variables)
+            if cache_key is not None:
+                cached = self._get_cached_metadata(cache_key)
+                if cached is not None:
+                    results[i] = cached
+                    continue
+
+            pending[dedup_key] = PendingBatchRequest(op, raw_variables, cache_key, [i])
+
+        to_send = list(pending.values())
+        chunks = [to_send[i : i + self.MAX_BATCH_SIZE] for i in range(0, len(to_send), self.MAX_BATCH_SIZE)]
+        return results, chunks
+
+    @staticmethod
+    def _make_composite(chunk: Sequence[PendingBatchRequest]) -> Tuple[CompositeOperation, CompositeVariables]:
+        """Merge a chunk of a batch into a single composite operation."""
+        op = get_composite_operation(tuple(req.op for req in chunk))
+        return op, {"variables": [req.raw_variables for req in chunk]}
+
+    def _split_composite_error(self, op: CompositeOperation, err: TransportQueryError) -> List[Any]:
+        """Get the response of each operation in a composite request that failed, or the error it caused."""
+        if err.data is None:
+            return [err] * len(op.ops)
+
+        results: List[Any] = []
+        for child_op, (data, errors) in zip(op.ops, op.split_response(err.data, err.errors or [])):
+            if len(errors) > 0:
+                child_err = TransportQueryError(str(errors[0]), errors=errors, data=data)
+                results.append(self._refine_err(child_err))
+                continue
+
+            assert data is not None
+            try:
+                resp = child_op.parse_response(data)
+            except Exception as parse_err:
+                results.append(parse_err)
+                continue
+
+            self._attach_self_to_parsed_response(resp)
+            results.append(resp)
+
+        return results
+
+    def _finish_batch_chunk(
+        self,
+        chunk: Sequence[PendingBatchRequest],
+        chunk_results: Sequence[Any],
+        results: List[Any],
+    ) -> None:
+        """Store the results of a chunk of a batch, and cache them if possible."""
+        for req, result in zip(chunk, chunk_results):
+            if req.cache_key is not None and not isinstance(result, Exception):
+                self._cache_metadata(req.cache_key, result)
+
+            for i in req.indices:
+                results[i] = result
+
+    def _load_all_requests(
+        self, metrics: Sequence[Metric], fields: Sequence[str]
+    ) -> Tuple[List[Tuple[Metric, str]], List[BatchRequest]]:
+        """Get the batch requests to load `fields` of all `metrics`."""
+        for field in fields:
+            if field not in Metric._lazy_loadable_fields:  # pyright: ignore[reportPrivateUsage]
+                raise ValueError(f"`{field}` is not a lazy loadable field of Metric.")
+
+        targets = [(metric, field) for metric in metrics for field in fields]
+        requests: List[BatchRequest] = [
+            (getattr(self.PROTOCOL, field), {"metrics": [metric.name]}) for metric, field in targets
+        ]
+        return targets, requests
+
+    @classmethod
+    def _set_loaded_fields(cls, targets: Sequence[Tuple[Metric, str]], results: Sequence[Any]) -> None:
+        """Set the loaded fields of each metric, raising the first error after setting all the others."""
+        for (metric, field), result in zip(targets, results):
+            if not isinstance(result, Exception):
+                setattr(metric, field, result)
+
+        cls._raise_first_error(results)
+
+    @staticmethod
+    def _raise_first_error(results: Sequence[Any]) -> None:
+        """Raise the first exception in the results of a batch, if any."""
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    def _run_many_requests(self, requests: Sequence[OperationRequest]) -> List[BatchRequest]:
+        """Get the batch requests to run the operations behind each requested method."""
+        batch: List[BatchRequest] = []
+        for request in requests:
+            kwargs: Mapping[str, Any] = {}
+            if isinstance(request, str):
+                name = request
+            else:
+                name, kwargs = request
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                op = getattr(self.PROTOCOL, name, None)
+
+            if not isinstance(op, ProtocolOperation):
+                raise ValueError(f"`{name}` is not a GraphQL operation.")
+
+            batch.append((op, kwargs))  # pyright: ignore[reportUnknownArgumentType]
+
+        return batch
+
+    def _prepare_operations(self) -> None:
+        """Prepare all operations ahead of their first use, if `precompile_decoders`."""
+        if self.precompile_decoders:
+            prepare_operations(self.PROTOCOL)
+
     def _refine_err(self, err: Exception) -> Exception:
         """Refine a generic exception that might have happened during `_run`."""
         if (
@@ -163,6 +544,12 @@ class GraphQLClientFactory(Protocol, Generic[TClient]):  # noqa: D101
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
     ) -> TClient:
         """Initialize the Semantic Layer client.
 
@@ -173,5 +560,11 @@ class GraphQLClientFactory(Protocol, Generic[TClient]):  # noqa: D101
             url_format: the URL format string to construct the final URL with
             timeout: `TimeoutOptions` or total timeout
             lazy: lazy load large fields
+            metadata_cache_ttl: how long to cache metadata for, in seconds
+            compact_models: parse metadata into compact models
+            precompile_decoders: build response decoders when a session opens
+            response_compression: which compressed response encodings to accept
+            persisted_queries: send hashes of GraphQL documents instead of their text
+            polling_strategy: how long to wait between the polls of a query
         """
         pass
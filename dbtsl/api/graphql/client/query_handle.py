@@ -0,0 +1,313 @@
+"""Handles to queries which were submitted to the Semantic Layer, and might still be running.
+
+`submit_query` creates a query and returns right away with a handle to it, instead of blocking
+until it completes like `query` does. This lets a single thread (or task) keep many queries running
+in the warehouse at the same time, and collect their results later:
+
+```python
+handles = [client.submit_query(metrics=[m]) for m in metrics]
+for handle in as_completed(handles):
+    table = handle.result()
+```
+
+All handles of a client share its status poller, so polling for many running queries only takes a
+few requests. See `dbtsl.api.graphql.client.status_poller`.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import as_completed as futures_as_completed
+from concurrent.futures import wait as futures_wait
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+import pyarrow as pa
+
+from dbtsl.api.graphql.client.status_poller import StatusWaiter
+from dbtsl.error import TimeoutError
+from dbtsl.models.query import QueryId, QueryResult, QueryStatus, QueryStatusResult
+
+
+class _SyncQueryClient(Protocol):
+    """What sync handles need from the client which submitted their query."""
+
+    max_page_workers: int
+
+    def _first_page(self, status: QueryStatusResult) -> QueryResult: ...
+
+    def _fetch_table(self, first_page_results: QueryResult) -> "pa.Table": ...
+
+    def _fetch_batches(self, first_page_results: QueryResult, prefetch: int) -> Iterator["pa.RecordBatch"]: ...
+
+
+class _AsyncQueryClient(Protocol):
+    """What asyncio handles need from the client which submitted their query."""
+
+    page_concurrency: int
+
+    async def _first_page(self, status: QueryStatusResult) -> QueryResult: ...
+
+    async def _fetch_table(self, first_page_results: QueryResult, page_concurrency: Optional[int]) -> "pa.Table": ...
+
+    def _fetch_batches(self, first_page_results: QueryResult, prefetch: int) -> AsyncIterator["pa.RecordBatch"]: ...
+
+
+class SyncQueryHandle:
+    """A query submitted with `SyncGraphQLClient.submit_query`."""
+
+    def __init__(self, client: _SyncQueryClient, waiter: StatusWaiter["Future[QueryStatusResult]"]) -> None:
+        """Initialize the handle.
+
+        Args:
+            client: the client which submitted the query, used to fetch its results
+            waiter: the query in the client's status poller
+        """
+        self._client = client
+        self._waiter = waiter
+        self._first_page_results: Optional[QueryResult] = None
+        self._table: Optional["pa.Table"] = None
+
+    @property
+    def query_id(self) -> QueryId:
+        """The ID of the query."""
+        return self._waiter.query_id
+
+    def status(self) -> QueryStatus:
+        """Get the status of the query as of its last poll, without sending any requests."""
+        return self._waiter.status
+
+    def done(self) -> bool:
+        """Whether the query is done: it completed (SUCCESSFUL or FAILED), or polling for it failed or got cancelled."""
+        return self._waiter.future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the query to be done.
+
+        Args:
+            timeout: How long to wait for, in seconds. If `None`, wait until the query is done.
+
+        Returns:
+            Whether the query is done. If `False`, it is still running and can be waited for again.
+        """
+        done, _ = futures_wait([self._waiter.future], timeout=timeout)
+        return len(done) > 0
+
+    def cancel(self) -> None:
+        """Stop polling for the query, if it is still running.
+
+        This doesn't stop the query in the Semantic Layer, it only stops waiting for it. Getting
+        its results afterwards raises a `CancelledError`.
+        """
+        future = self._waiter.future
+        # concurrent futures only count as done for `wait` and `as_completed` once waiters got notified
+        if future.cancel():
+            future.set_running_or_notify_cancel()
+
+    def _first_page(self) -> QueryResult:
+        if self._first_page_results is None:
+            self._first_page_results = self._client._first_page(self._waiter.future.result())  # pyright: ignore[reportPrivateUsage]
+        return self._first_page_results
+
+    def result(self) -> "pa.Table":
+        """Wait for the query to complete, and get all pages of its results as a single table.
+
+        The table is kept, so calling this again doesn't fetch the results again.
+
+        Raises:
+            QueryFailedError: if the query failed
+            RetryTimeoutError: if the query didn't complete within the client's polling timeout
+        """
+        if self._table is None:
+            self._table = self._client._fetch_table(self._first_page())  # pyright: ignore[reportPrivateUsage]
+        return self._table
+
+    def batches(self, *, prefetch: Optional[int] = None) -> Iterator["pa.RecordBatch"]:
+        """Wait for the query to complete, and yield its results page by page as record batches.
+
+        See `SyncGraphQLClient.query_batches`.
+
+        Args:
+            prefetch: How many pages to fetch ahead of the page currently being consumed. If `None`,
+                the client's `max_page_workers` will be used. If 0, pages are only fetched when needed.
+        """
+        if prefetch is None:
+            prefetch = self._client.max_page_workers
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative.")
+
+        return self._client._fetch_batches(self._first_page(), prefetch)  # pyright: ignore[reportPrivateUsage]
+
+
+class AsyncQueryHandle:
+    """A query submitted with `AsyncGraphQLClient.submit_query`."""
+
+    def __init__(self, client: _AsyncQueryClient, waiter: StatusWaiter["asyncio.Future[QueryStatusResult]"]) -> None:
+        """Initialize the handle.
+
+        Args:
+            client: the client which submitted the query, used to fetch its results
+            waiter: the query in the client's status poller
+        """
+        self._client = client
+        self._waiter = waiter
+        self._first_page_results: Optional[QueryResult] = None
+        self._table: Optional["pa.Table"] = None
+
+    @property
+    def query_id(self) -> QueryId:
+        """The ID of the query."""
+        return self._waiter.query_id
+
+    def status(self) -> QueryStatus:
+        """Get the status of the query as of its last poll, without sending any requests."""
+        return self._waiter.status
+
+    def done(self) -> bool:
+        """Whether the query is done: it completed (SUCCESSFUL or FAILED), or polling for it failed or got cancelled."""
+        return self._waiter.future.done()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the query to be done.
+
+        Args:
+            timeout: How long to wait for, in seconds. If `None`, wait until the query is done.
+
+        Returns:
+            Whether the query is done. If `False`, it is still running and can be waited for again.
+        """
+        done, _ = await asyncio.wait([self._waiter.future], timeout=timeout)
+        return len(done) > 0
+
+    def cancel(self) -> None:
+        """Stop polling for the query, if it is still running.
+
+        This doesn't stop the query in the Semantic Layer, it only stops waiting for it. Getting
+        its results afterwards raises a `CancelledError`.
+        """
+        self._waiter.future.cancel()
+
+    async def _first_page(self) -> QueryResult:
+        if self._first_page_results is None:
+            self._first_page_results = await self._client._first_page(await self._waiter.future)  # pyright: ignore[reportPrivateUsage]
+        return self._first_page_results
+
+    async def result(self, *, page_concurrency: Optional[int] = None) -> "pa.Table":
+        """Wait for the query to complete, and get all pages of its results as a single table.
+
+        The table is kept, so calling this again doesn't fetch the results again.
+
+        Args:
+            page_concurrency: The maximum number of result pages to fetch at the same time. If `None`,
+                the client's `page_concurrency` will be used.
+
+        Raises:
+            QueryFailedError: if the query failed
+            RetryTimeoutError: if the query didn't complete within the client's polling timeout
+        """
+        if self._table is None:
+            self._table = await self._client._fetch_table(await self._first_page(), page_concurrency)  # pyright: ignore[reportPrivateUsage]
+        return self._table
+
+    async def batches(self, *, prefetch: Optional[int] = None) -> AsyncIterator["pa.RecordBatch"]:
+        """Wait for the query to complete, and yield its results page by page as record batches.
+
+        See `AsyncGraphQLClient.query_batches`.
+
+        Args:
+            prefetch: How many pages to fetch ahead of the page currently being consumed. If `None`,
+                the client's `page_concurrency` will be used. If 0, pages are only fetched when needed.
+        """
+        if prefetch is None:
+            prefetch = self._client.page_concurrency
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative.")
+
+        async for batch in self._client._fetch_batches(await self._first_page(), prefetch):  # pyright: ignore[reportPrivateUsage]
+            yield batch
+
+
+def wait_all(
+    handles: Iterable[SyncQueryHandle], timeout: Optional[float] = None
+) -> Tuple[List[SyncQueryHandle], List[SyncQueryHandle]]:
+    """Wait for all queries to be done.
+
+    Args:
+        handles: the queries to wait for.
+        timeout: How long to wait for, in seconds. If `None`, wait until all queries are done.
+
+    Returns:
+        The queries which are done, and the ones which are still running, in their original order.
+    """
+    handles = list(handles)
+    futures_wait([h._waiter.future for h in handles], timeout=timeout)  # pyright: ignore[reportPrivateUsage]
+    done = [h for h in handles if h.done()]
+    not_done = [h for h in handles if not h.done()]
+    return done, not_done
+
+
+def as_completed(handles: Iterable[SyncQueryHandle], timeout: Optional[float] = None) -> Iterator[SyncQueryHandle]:
+    """Yield queries as soon as they are done, in the order they complete.
+
+    Args:
+        handles: the queries to wait for.
+        timeout: How long to wait for all queries, in seconds. If `None`, wait until all queries are done.
+
+    Raises:
+        TimeoutError: if some queries are still running after `timeout`.
+    """
+    by_future = {h._waiter.future: h for h in handles}  # pyright: ignore[reportPrivateUsage]
+    try:
+        for future in futures_as_completed(by_future, timeout=timeout):
+            yield by_future[future]
+    except FuturesTimeoutError:
+        assert timeout is not None
+        raise TimeoutError(timeout_s=timeout) from None
+
+
+async def async_wait_all(
+    handles: Iterable[AsyncQueryHandle], timeout: Optional[float] = None
+) -> Tuple[List[AsyncQueryHandle], List[AsyncQueryHandle]]:
+    """Wait for all queries to be done.
+
+    Args:
+        handles: the queries to wait for.
+        timeout: How long to wait for, in seconds. If `None`, wait until all queries are done.
+
+    Returns:
+        The queries which are done, and the ones which are still running, in their original order.
+    """
+    handles = list(handles)
+    if len(handles) > 0:
+        await asyncio.wait([h._waiter.future for h in handles], timeout=timeout)  # pyright: ignore[reportPrivateUsage]
+    done = [h for h in handles if h.done()]
+    not_done = [h for h in handles if not h.done()]
+    return done, not_done
+
+
+async def async_as_completed(
+    handles: Iterable[AsyncQueryHandle], timeout: Optional[float] = None
+) -> AsyncIterator[AsyncQueryHandle]:
+    """Yield queries as soon as they are done, in the order they complete.
+
+    Args:
+        handles: the queries to wait for.
+        timeout: How long to wait for all queries, in seconds. If `None`, wait until all queries are done.
+
+    Raises:
+        TimeoutError: if some queries are still running after `timeout`.
+    """
+    by_future = {h._waiter.future: h for h in handles}  # pyright: ignore[reportPrivateUsage]
+    pending = set(by_future)
+    deadline_s = None if timeout is None else time.monotonic() + timeout
+    while len(pending) > 0:
+        remaining_s = None if deadline_s is None else max(deadline_s - time.monotonic(), 0)
+        done, pending = await asyncio.wait(pending, timeout=remaining_s, return_when=asyncio.FIRST_COMPLETED)
+        if len(done) == 0:
+            assert timeout is not None
+            raise TimeoutError(timeout_s=timeout)
+
+        # keep the original order of the queries which completed at the same time
+        for future in by_future:
+            if future in done:
+                yield by_future[future]
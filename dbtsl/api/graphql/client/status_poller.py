@@ -0,0 +1,340 @@
+"""Poll for the status of many queries at once.
+
+Instead of each query polling for its own status, queries wait on a poller which sends the status
+checks of all the queries that are due in a single batched GraphQL request, and wakes each waiter
+once its query completes. Each query still gets polled according to its own `PollingStrategy`, but
+polls which are due at about the same time share a request.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import InvalidStateError as FuturesInvalidStateError
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generic, Iterator, List, Optional, Sequence, TypeVar, Union
+
+from typing_extensions import TypedDict, Unpack
+
+from dbtsl.api.graphql.client.base import BatchRequest
+from dbtsl.api.graphql.protocol import GetQueryStatusVariables, ProtocolOperation
+from dbtsl.backoff import PollingStrategy
+from dbtsl.error import RetryTimeoutError
+from dbtsl.models.query import QueryId, QueryStatus, QueryStatusResult
+
+# Queries which are due for a poll within this many seconds get polled along with the ones which
+# are due now, so that they share the request
+COALESCE_WINDOW_S = 0.1
+
+StatusOperation = ProtocolOperation[GetQueryStatusVariables, QueryStatusResult]
+
+TStatusFuture = TypeVar("TStatusFuture", bound=Union["asyncio.Future[QueryStatusResult]", "Future[QueryStatusResult]"])
+
+
+class StatusPollOptions(TypedDict):
+    """How to poll for the status of a query.
+
+    Attributes:
+        strategy: how long to wait between the polls of the query
+        key: identifies similar queries, so that adaptive strategies can learn how long they take
+        timeout_s: how long to poll for before giving up, in seconds
+    """
+
+    strategy: PollingStrategy
+    key: Optional[str]
+    timeout_s: float
+
+
+@dataclass
+class StatusWaiter(Generic[TStatusFuture]):
+    """A query waiting to complete, and when to poll it next."""
+
+    query_id: QueryId
+    strategy: PollingStrategy
+    key: Optional[str]
+    timeout_s: float
+    future: TStatusFuture
+
+    start_s: float = field(default_factory=time.monotonic)
+    # the status of the query as of its last poll
+    status: QueryStatus = QueryStatus.PENDING
+    next_poll_s: float = field(init=False)
+    intervals: Iterator[int] = field(init=False)
+
+    # when the query was first and last seen running, so that the strategy can learn how long it takes
+    first_running_s: Optional[float] = None
+    last_running_s: float = 0.0
+
+    def __post_init__(self) -> None:  # noqa: D105
+        self.next_poll_s = self.start_s
+        self.intervals = self.strategy.iter_ms(self.key)
+
+    def handle(self, result: Union[QueryStatusResult, Exception], polled_s: float) -> None:
+        """Complete the waiter with the result of a poll, or schedule its next poll."""
+        if isinstance(result, Exception):
+            self.future.set_exception(result)
+            return
+
+        self.status = result.status
+        if result.status in (QueryStatus.SUCCESSFUL, QueryStatus.FAILED):
+            if self.first_running_s is not None:
+                duration_s = (self.last_running_s + polled_s) / 2 - self.first_running_s
+                self.strategy.record(self.key, int(duration_s * 1000))
+            self.future.set_result(result)
+            return
+
+        if self.first_running_s is None:
+            self.first_running_s = polled_s
+        self.last_running_s = polled_s
+
+        if polled_s - self.start_s > self.timeout_s:
+            self.future.set_exception(RetryTimeoutError(timeout_s=self.timeout_s, status=result.status.value))
+            return
+
+        sleep_ms = next(self.intervals, None)
+        if sleep_ms is None:
+            raise ValueError("The polling strategy ran out of intervals before the query completed.")
+        self.next_poll_s = polled_s + sleep_ms / 1000
+
+
+def _fail(future: Union["asyncio.Future[Any]", "Future[Any]"], err: BaseException) -> None:
+    """Fail a waiter's future, unless it is already done, like if it got cancelled from another thread."""
+    if future.done():
+        return
+
+    try:
+        if isinstance(err, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(err)
+    except (asyncio.InvalidStateError, FuturesInvalidStateError):
+        pass
+
+
+class BaseStatusPoller:
+    """Keep track of the queries waiting to complete, regardless of IO."""
+
+    def __init__(self, op: StatusOperation) -> None:
+        """Initialize the poller.
+
+        Args:
+            op: the operation which gets the status of a query
+        """
+        self._op = op
+        self._waiters: List[StatusWaiter[Any]] = []
+
+    def _take_due(self, now_s: float) -> List[StatusWaiter[Any]]:
+        """Forget the waiters which are done, and get the ones which should be polled now."""
+        self._waiters = [w for w in self._waiters if not w.future.done()]
+        if all(w.next_poll_s > now_s for w in self._waiters):
+            return []
+        return [w for w in self._waiters if w.next_poll_s <= now_s + COALESCE_WINDOW_S]
+
+    def _requests(self, waiters: Sequence[StatusWaiter[Any]]) -> List[BatchRequest]:
+        return [(self._op, {"query_id": w.query_id}) for w in waiters]
+
+    def _handle_results(self, waiters: Sequence[StatusWaiter[Any]], results: Sequence[Any]) -> None:
+        polled_s = time.monotonic()
+        for waiter, result in zip(waiters, results):
+            # the waiter might have been cancelled while polling
+            if waiter.future.done():
+                continue
+
+            # If handling the result fails, like if the strategy raises or the waiter gets cancelled
+            # from another thread meanwhile, only this waiter fails and polling goes on for the others
+            try:
+                waiter.handle(result, polled_s)
+            except Exception as err:
+                _fail(waiter.future, err)
+
+    def _fail_waiters(self, err: BaseException) -> None:
+        """Fail all the waiters, when polling stops unexpectedly."""
+        for waiter in self._waiters:
+            _fail(waiter.future, err)
+        self._waiters = []
+
+    def _next_poll_s(self) -> float:
+        return min(w.next_poll_s for w in self._waiters)
+
+
+class AsyncStatusPoller(BaseStatusPoller):
+    """Poll for the status of all the queries waiting in the same event loop, in a background task."""
+
+    def __init__(
+        self,
+        op: StatusOperation,
+        run_batch: Callable[[Sequence[BatchRequest]], Awaitable[List[Any]]],
+    ) -> None:
+        """Initialize the poller.
+
+        Args:
+            op: the operation which gets the status of a query
+            run_batch: runs many operations in as few requests as possible, returning their results
+                or the exceptions they raised
+        """
+        super().__init__(op)
+        self._run_batch = run_batch
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def submit(
+        self,
+        query_id: QueryId,
+        **options: Unpack[StatusPollOptions],
+    ) -> StatusWaiter["asyncio.Future[QueryStatusResult]"]:
+        """Start polling for the status of a query, without waiting for it to complete.
+
+        Its future resolves once the query completes (SUCCESSFUL or FAILED). Cancel it to stop polling.
+        """
+        future: "asyncio.Future[QueryStatusResult]" = asyncio.get_running_loop().create_future()
+        waiter = StatusWaiter(query_id, options["strategy"], options["key"], options["timeout_s"], future)
+        self._waiters.append(waiter)
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._poll())
+        else:
+            assert self._wakeup is not None
+            self._wakeup.set()
+
+        return waiter
+
+    async def wait(self, query_id: QueryId, **options: Unpack[StatusPollOptions]) -> QueryStatusResult:
+        """Wait for a query to complete (SUCCESSFUL or FAILED), and get its status."""
+        return await self.submit(query_id, **options).future
+
+    async def close(self) -> None:
+        """Stop polling, cancelling all the queries which are still waiting."""
+        task = self._task
+        if task is not None:
+            task.cancel()
+            # unlike awaiting the task, this doesn't raise its CancelledError
+            await asyncio.wait([task])
+        # the task might have been cancelled before it got to start
+        self._fail_waiters(asyncio.CancelledError())
+
+    async def _poll(self) -> None:
+        try:
+            await self._poll_until_idle()
+        except (Exception, asyncio.CancelledError) as err:
+            # don't leave waiters hanging if polling breaks, or if the task gets cancelled
+            self._fail_waiters(err)
+            raise
+        finally:
+            # this doesn't yield to the event loop, so no other task can have started meanwhile
+            self._task = None
+
+    async def _poll_until_idle(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            due = self._take_due(time.monotonic())
+            if len(self._waiters) == 0:
+                return
+
+            if len(due) == 0:
+                self._wakeup.clear()
+                try:
+                    timeout_s = max(self._next_poll_s() - time.monotonic(), 0)
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout_s)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            results: List[Any]
+            try:
+                results = await self._run_batch(self._requests(due))
+            except Exception as err:
+                results = [err] * len(due)
+            self._handle_results(due, results)
+
+
+class SyncStatusPoller(BaseStatusPoller):
+    """Poll for the status of all the queries waiting in any thread, in a background thread.
+
+    The thread only runs while there are queries waiting.
+    """
+
+    def __init__(
+        self,
+        op: StatusOperation,
+        run_batch: Callable[[Sequence[BatchRequest]], List[Any]],
+    ) -> None:
+        """Initialize the poller.
+
+        Args:
+            op: the operation which gets the status of a query
+            run_batch: runs many operations in as few requests as possible, returning their results
+                or the exceptions they raised
+        """
+        super().__init__(op)
+        self._run_batch = run_batch
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        query_id: QueryId,
+        **options: Unpack[StatusPollOptions],
+    ) -> StatusWaiter["Future[QueryStatusResult]"]:
+        """Start polling for the status of a query, without waiting for it to complete.
+
+        Its future resolves once the query completes (SUCCESSFUL or FAILED). Cancel it to stop polling.
+        """
+        future: "Future[QueryStatusResult]" = Future()
+        waiter = StatusWaiter(query_id, options["strategy"], options["key"], options["timeout_s"], future)
+        with self._cond:
+            self._waiters.append(waiter)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll, name="dbtsl-status-poller", daemon=True)
+                self._thread.start()
+            else:
+                self._cond.notify()
+
+        return waiter
+
+    def wait(self, query_id: QueryId, **options: Unpack[StatusPollOptions]) -> QueryStatusResult:
+        """Wait for a query to complete (SUCCESSFUL or FAILED), and get its status."""
+        future = self.submit(query_id, **options).future
+        try:
+            return future.result()
+        except BaseException:
+            # stop polling for this query if we got interrupted. This happens under the lock so that
+            # the poller doesn't try to complete the future at the same time.
+            with self._cond:
+                future.cancel()
+            raise
+
+    def _poll(self) -> None:
+        try:
+            self._poll_until_idle()
+        except BaseException as err:
+            # don't leave waiters hanging if polling breaks
+            with self._cond:
+                self._fail_waiters(err)
+            raise
+        finally:
+            with self._cond:
+                # a new thread might have started already if this one stopped because it was idle
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _poll_until_idle(self) -> None:
+        while True:
+            with self._cond:
+                due = self._take_due(time.monotonic())
+                if len(self._waiters) == 0:
+                    self._thread = None
+                    return
+
+                if len(due) == 0:
+                    self._cond.wait(timeout=max(self._next_poll_s() - time.monotonic(), 0))
+                    continue
+
+            results: List[Any]
+            try:
+                results = self._run_batch(self._requests(due))
+            except Exception as err:
+                results = [err] * len(due)
+
+            with self._cond:
+                self._handle_results(due, results)
@@ -1,36 +1,82 @@
-import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Dict, Iterator, Optional, Union
+from itertools import islice
+from typing import Any, Deque, Dict, Generator, Iterator, List, Optional, Sequence, Set, Union
 
 import pyarrow as pa
-from gql import gql
+from gql import Client
 from gql.client import SyncClientSession
+from gql.transport.exceptions import TransportQueryError
 from gql.transport.requests import RequestsHTTPTransport
+from graphql import DocumentNode
 from requests import (
     ConnectTimeout as RequestsConnectTimeout,
 )
 from requests import (
     ReadTimeout as RequestsReadTimeout,
 )
+from requests import (
+    Response as RequestsResponse,
+)
 from typing_extensions import Self, Unpack, override
+from urllib3.util.request import ACCEPT_ENCODING
 
-from dbtsl.api.graphql.client.base import BaseGraphQLClient, TimeoutOptions
+from dbtsl.api.graphql.client.base import (
+    BaseGraphQLClient,
+    BatchRequest,
+    OperationRequest,
+    PendingBatchRequest,
+    TimeoutOptions,
+)
+from dbtsl.api.graphql.client.query_handle import SyncQueryHandle
+from dbtsl.api.graphql.client.status_poller import SyncStatusPoller
 from dbtsl.api.graphql.protocol import (
+    GetQueryResultVariables,
     ProtocolOperation,
-    TJobStatusResult,
-    TJobStatusVariables,
     TResponse,
     TVariables,
 )
-from dbtsl.api.shared.query_params import QueryParameters
-from dbtsl.backoff import ExponentialBackoff
-from dbtsl.error import ConnectTimeoutError, ExecuteTimeoutError, QueryFailedError, RetryTimeoutError
-from dbtsl.models.query import QueryStatus
+from dbtsl.api.shared import fast_json
+from dbtsl.api.shared.query_params import QueryParameters, query_fingerprint, validate_query_parameters
+from dbtsl.api.shared.singleflight import SyncSingleFlight
+from dbtsl.backoff import PollingStrategy
+from dbtsl.error import ConnectTimeoutError, ExecuteTimeoutError, QueryFailedError
+from dbtsl.models.metric import Metric
+from dbtsl.models.query import QueryResult, QueryStatus, QueryStatusResult
+
+
+def _fast_json_hook(response: RequestsResponse, *_args: Any, **_kwargs: Any) -> RequestsResponse:
+    """Make `response.json()` decode the raw body with the fast JSON backend."""
+
+    def json(**_kwargs: Any) -> Any:
+        return fast_json.loads(response.content)
+
+    response.json = json  # type: ignore
+    return response
+
+
+class FastJSONRequestsHTTPTransport(RequestsHTTPTransport):
+    """A requests transport which decodes responses with the fast JSON backend.
+
+    gql decodes responses with `response.json()`, which decodes the body into a string before
+    parsing it. This installs a response hook on the transport's session which parses the raw body
+    instead. See `dbtsl.api.shared.fast_json`.
+    """
+
+    @override
+    def connect(self) -> None:
+        super().connect()
+        assert self.session is not None
+        self.session.hooks["response"].append(_fast_json_hook)
 
 
 class SyncGraphQLClient(BaseGraphQLClient[RequestsHTTPTransport, SyncClientSession]):
     """A sync client to access semantic layer via GraphQL, backed by requests."""
 
+    DEFAULT_MAX_PAGE_WORKERS = 4
+
     def __init__(
         self,
         server_host: str,
@@ -40,6 +86,13 @@ class SyncGraphQLClient(BaseGraphQLClient[RequestsHTTPTransport, SyncClientSessi
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
+        max_page_workers: int = DEFAULT_MAX_PAGE_WORKERS,
     ):
         """Initialize the metadata client.
 
@@ -52,15 +105,66 @@ class SyncGraphQLClient(BaseGraphQLClient[RequestsHTTPTransport, SyncClientSessi
                 will be assumed.
             timeout: TimeoutOptions or total timeout (in seconds) for all GraphQL requests.
             lazy: Whether to lazy load large subfields
+            metadata_cache_ttl: How long (in seconds) to cache the responses of metadata requests such
+                as `metrics` or `dimensions`. If `None`, metadata is not cached.
+            compact_models: Whether to return the compact (slotted) variant of metadata models,
+                which use less memory. See `dbtsl.models.compact`.
+            precompile_decoders: Whether to build the decoders of all responses when a session opens,
+                instead of when each kind of response is first received.
+            response_compression: Which compressed encodings to accept for responses. If `True`, accept
+                every encoding the transport can decode. If `False`, ask for uncompressed responses.
+            persisted_queries: Whether to send the SHA-256 hash of each GraphQL document instead of its
+                text, if the server already knows it (automatic persisted queries).
+            polling_strategy: How long to wait between the polls of a query until it completes. If `None`,
+                use an exponential backoff. See `dbtsl.backoff`.
+            max_page_workers: The maximum number of threads used to fetch result pages concurrently.
+                Each thread opens its own HTTP connection. Set to 1 to fetch pages sequentially.
 
         NOTE: If `timeout` is a `TimeoutOptions`, the `tls_close_timeout` will not be used, since
         `requests` does not support TLS termination timeouts.
         """
-        super().__init__(server_host, environment_id, auth_token, url_format, timeout, lazy=lazy)
+        if max_page_workers < 1:
+            raise ValueError("max_page_workers must be at least 1.")
+
+        self.max_page_workers = max_page_workers
+
+        # Worker threads store their own session here, so that `_run` uses their connection
+        # instead of the one from the main session
+        self._local = threading.local()
+        self._worker_lock = threading.Lock()
+        self._worker_executor: Optional[ThreadPoolExecutor] = None
+        self._worker_clients: List[Client] = []
+        self._idle_worker_sessions: List[SyncClientSession] = []
+
+        self._query_flights = SyncSingleFlight()
+
+        super().__init__(
+            server_host,
+            environment_id,
+            auth_token,
+            url_format,
+            timeout,
+            lazy=lazy,
+            metadata_cache_ttl=metadata_cache_ttl,
+            compact_models=compact_models,
+            precompile_decoders=precompile_decoders,
+            response_compression=response_compression,
+            persisted_queries=persisted_queries,
+            polling_strategy=polling_strategy,
+        )
+
+        self._status_poller = SyncStatusPoller(self.PROTOCOL.get_query_status, self._run_status_batch)
+
+    @classmethod
+    @override
+    def _supported_encodings(cls) -> Set[str]:
+        # urllib3 decodes brotli and zstd responses if the libraries for them are installed
+        return set(ACCEPT_ENCODING.split(","))
 
     @override
     def _create_transport(self, url: str, headers: Dict[str, str]) -> RequestsHTTPTransport:
-        return RequestsHTTPTransport(
+        transport_cls = RequestsHTTPTransport if fast_json.FAST_JSON_BACKEND is None else FastJSONRequestsHTTPTransport
+        return transport_cls(
             url=url,
             headers=headers,
             # The following type ignore is OK since gql annotated `timeout` as an `Optional[int]`,
@@ -76,24 +180,131 @@ class SyncGraphQLClient(BaseGraphQLClient[RequestsHTTPTransport, SyncClientSessi
 
         A "session" is a TCP connection with the server. All operations
         performed under the same session will reuse the same TCP connection.
+
+        Worker threads which fetch result pages get their own connections, which stay open
+        until the session closes, so that later queries can reuse them.
         """
         if self._gql_session_unsafe is not None:
             raise ValueError("A client session is already open.")
 
+        self._prepare_operations()
+
         with self._gql as session:
             assert isinstance(session, SyncClientSession)
             self._gql_session_unsafe = session
-            yield self
-            self._gql_session_unsafe = None
+            try:
+                yield self
+            finally:
+                self._gql_session_unsafe = None
+                self._close_worker_sessions()
+
+    @property
+    @override
+    def _gql_session(self) -> SyncClientSession:
+        """The session of the current worker thread, if any, or the client's main session."""
+        worker_session: Optional[SyncClientSession] = getattr(self._local, "session", None)
+        if worker_session is not None:
+            return worker_session
+
+        return super()._gql_session
+
+    @contextmanager
+    def _worker_session(self) -> Generator[None, None, None]:
+        """Run requests of the current thread in a worker session until the context exits.
+
+        Worker sessions each have their own HTTP connection, so that threads don't contend for the
+        same connection. They are borrowed from an idle pool, and stay open until the client's session
+        closes. If the thread already has a worker session, it is reused.
+        """
+        if getattr(self._local, "session", None) is not None:
+            yield
+            return
+
+        with self._worker_lock:
+            worker_session = self._idle_worker_sessions.pop() if len(self._idle_worker_sessions) > 0 else None
+
+        if worker_session is None:
+            gql_client = self._create_gql_client()
+            worker_session = gql_client.connect_sync()
+            assert isinstance(worker_session, SyncClientSession)
+            with self._worker_lock:
+                self._worker_clients.append(gql_client)
+
+        self._local.session = worker_session
+        try:
+            yield
+        finally:
+            self._local.session = None
+            with self._worker_lock:
+                self._idle_worker_sessions.append(worker_session)
+
+    def _worker_pool(self) -> ThreadPoolExecutor:
+        """Get the thread pool which fetches result pages, creating it if needed.
+
+        The pool lives until the client's session closes.
+        """
+        with self._worker_lock:
+            if self._worker_executor is None:
+                self._worker_executor = ThreadPoolExecutor(
+                    max_workers=self.max_page_workers,
+                    thread_name_prefix="dbtsl-gql",
+                )
+            return self._worker_executor
+
+    def _close_worker_sessions(self) -> None:
+        """Stop the page worker threads, and close all worker sessions."""
+        with self._worker_lock:
+            executor, self._worker_executor = self._worker_executor, None
+            worker_clients, self._worker_clients = self._worker_clients, []
+            self._idle_worker_sessions = []
+
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        for gql_client in worker_clients:
+            gql_client.close_sync()
+
+    def _execute(self, op: ProtocolOperation[Any, Any], gql_query: DocumentNode, variables: Dict[str, Any]) -> Any:
+        """Execute a GraphQL request, as a persisted query if `persisted_queries` is enabled.
+
+        Queries are only sent as a hash once the server is known to have them. Otherwise, or if the
+        server doesn't have them anymore, they are sent with their full text so that the server
+        persists them.
+        """
+        if not self.persisted_queries:
+            return self._gql_session.execute(gql_query, variable_values=variables)  # type: ignore
+
+        query, query_hash = self._get_persisted_query(op)
+        if query_hash in self._known_query_hashes:
+            try:
+                return self._gql_session.execute(  # type: ignore
+                    gql_query,
+                    variable_values=variables,
+                    extra_args=self._persisted_query_payload(query_hash, variables),
+                )
+            except TransportQueryError as err:
+                if not self._is_persisted_query_miss(err):
+                    raise
+                self._known_query_hashes.discard(query_hash)
+
+        res = self._gql_session.execute(  # type: ignore
+            gql_query, variable_values=variables, extra_args=self._persisted_query_payload(query_hash, variables, query)
+        )
+        self._known_query_hashes.add(query_hash)
+        return res
 
     def _run(self, op: ProtocolOperation[TVariables, TResponse], raw_variables: TVariables) -> TResponse:
         """Run a `ProtocolOperation`."""
-        raw_query = op.get_request_text(lazy=self.lazy)
+        gql_query = self._get_document(op)
         variables = op.get_request_variables(environment_id=self.environment_id, variables=raw_variables)
-        gql_query = gql(raw_query)
+
+        cache_key = self._metadata_cache_key(op, variables)
+        if cache_key is not None:
+            cached = self._get_cached_metadata(cache_key)
+            if cached is not None:
+                return cached
 
         try:
-            res = self._gql_session.execute(gql_query, variable_values=variables)  # type: ignore
+            res = self._execute(op, gql_query, variables)
         except RequestsReadTimeout as err:
             raise ExecuteTimeoutError(timeout_s=self.timeout.execute_timeout) from err
         except RequestsConnectTimeout as err:
@@ -103,63 +314,218 @@ class SyncGraphQLClient(BaseGraphQLClient[RequestsHTTPTransport, SyncClientSessi
 
         resp = op.parse_response(res)
         self._attach_self_to_parsed_response(resp)
+        if cache_key is not None:
+            self._cache_metadata(cache_key, resp)
         return resp
 
-    def _poll_until_complete(
+    def _run_batch(self, requests: Sequence[BatchRequest]) -> List[Any]:
+        """Run many operations in as few GraphQL requests as possible.
+
+        Returns the response of each operation in order, or the exception it raised.
+        """
+        results, chunks = self._plan_batch(requests)
+        for chunk in chunks:
+            self._finish_batch_chunk(chunk, self._run_batch_chunk(chunk), results)
+        return results
+
+    def _run_status_batch(self, requests: Sequence[BatchRequest]) -> List[Any]:
+        """Run a batch of status checks from the status poller thread, in a worker session.
+
+        This keeps the poller off the client's main session, which the caller threads use.
+        """
+        with self._worker_session():
+            return self._run_batch(requests)
+
+    def _run_batch_chunk(self, chunk: Sequence[PendingBatchRequest]) -> List[Any]:
+        """Run a chunk of a batch in a single GraphQL request."""
+        if len(chunk) == 1:
+            try:
+                return [self._run(op=chunk[0].op, raw_variables=chunk[0].raw_variables)]
+            except Exception as err:
+                return [err]
+
+        op, variables = self._make_composite(chunk)
+        try:
+            return self._run(op=op, raw_variables=variables)
+        except TransportQueryError as err:
+            return self._split_composite_error(op, err)
+        except Exception as err:
+            return [err] * len(chunk)
+
+    def _load(self, op: ProtocolOperation[TVariables, TResponse], raw_variables: TVariables) -> TResponse:
+        """Run an operation to lazy load a field.
+
+        Sync loads can't be batched implicitly, so this just runs the operation. Use `load_all` to
+        load many fields at once.
+        """
+        return self._run(op=op, raw_variables=raw_variables)
+
+    def load_all(
         self,
-        poll_op: ProtocolOperation[TJobStatusVariables, TJobStatusResult],
-        variables: TJobStatusVariables,
-        backoff: Optional[ExponentialBackoff] = None,
-    ) -> TJobStatusResult:
-        """Poll for a query's results until it is in a completed state (SUCCESSFUL or FAILED).
-
-        Note that this function does NOT fetch all pages in case the query is SUCCESSFUL. It only
-        returns once the query is done. Callers must implement this logic themselves.
+        metrics: Sequence[Metric],
+        fields: Sequence[str] = ("dimensions", "measures", "entities"),
+    ) -> None:
+        """Lazy load `fields` of all `metrics`, in as few GraphQL requests as possible.
+
+        Args:
+            metrics: the metrics to load fields for.
+            fields: which lazy loadable fields to load.
         """
-        if backoff is None:
-            backoff = self._default_backoff()
+        targets, requests = self._load_all_requests(metrics, fields)
+        self._set_loaded_fields(targets, self._run_batch(requests))
 
-        # support for deprecated ExponentialBackoff.timeout_ms
-        total_timeout_s = backoff.timeout_ms * 1000.0 if backoff.timeout_ms is not None else self.timeout.total_timeout
+    def run_many(self, requests: Sequence[OperationRequest], *, return_exceptions: bool = False) -> List[Any]:
+        """Run many operations in as few GraphQL requests as possible.
 
-        start_s = time.time()
-        for sleep_ms in backoff.iter_ms():
-            qr = self._run(op=poll_op, raw_variables=variables)
-            if qr.status in (QueryStatus.SUCCESSFUL, QueryStatus.FAILED):
-                return qr
+        Each request is the name of a method of this client, like `"metrics"`, optionally with the
+        keyword arguments to call it with, like `("dimensions", {"metrics": ["revenue"]})`. They all
+        get merged into a single GraphQL request (or a few, if there are a lot of them), and the
+        response gets split back into what each method would have returned.
 
-            elapsed_s = time.time() - start_s
-            if elapsed_s > total_timeout_s:
-                raise RetryTimeoutError(timeout_s=total_timeout_s, status=qr.status.value)
+        All operations must either be queries or mutations, they can't be mixed.
 
-            time.sleep(sleep_ms / 1000)
+        Args:
+            requests: the operations to run.
+            return_exceptions: if true, return the exception raised by an operation in place of its
+                result. Otherwise, raise the first exception after all operations are done.
 
-        # This should be unreachable
-        raise ValueError()
+        Returns:
+            The result of each operation, in order.
+        """
+        results = self._run_batch(self._run_many_requests(requests))
+        if not return_exceptions:
+            self._raise_first_error(results)
+        return results
 
-    def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
-        """Query the Semantic Layer."""
+    def _create_query_and_wait(self, params: QueryParameters) -> QueryResult:
+        """Create a query and wait for it to complete, returning its first page of results."""
         query_id = self.create_query(**params)
-        first_page_results = self._poll_until_complete(
-            poll_op=self.PROTOCOL.get_query_result,
-            variables={
-                "query_id": query_id,
-                "page_num": 1,
-            },
-        )
-        if first_page_results.status != QueryStatus.SUCCESSFUL:
-            raise QueryFailedError(first_page_results.error, first_page_results.status, query_id)
+        # only poll for the status, so that the SQL and results aren't sent over and over, and
+        # together with other queries of this client, so that they share requests
+        status = self._status_poller.wait(query_id, **self._status_poll_options(params))
+        return self._first_page(status)
 
+    def _first_page(self, status: QueryStatusResult) -> QueryResult:
+        """Fetch the first page of results of a completed query, raising if it failed."""
+        query_id = status.query_id
+        if status.status != QueryStatus.SUCCESSFUL:
+            raise QueryFailedError(status.error, status.status, query_id)
+
+        first_page_variables: GetQueryResultVariables = {"query_id": query_id, "page_num": 1}
+        first_page_results = self._run(op=self.PROTOCOL.get_query_result, raw_variables=first_page_variables)
         assert first_page_results.total_pages is not None
+        return first_page_results
+
+    def _iter_pages(self, first_page: QueryResult, prefetch: int) -> Iterator[QueryResult]:
+        """Iterate over all pages of a successful query, in order.
+
+        While a page is being consumed, up to `prefetch` of the following pages get fetched in
+        worker threads. If `prefetch` is 0, each page only gets fetched once it is needed.
+        """
+        assert first_page.total_pages is not None
+        query_id = first_page.query_id
+
+        def fetch_page(page: int) -> QueryResult:
+            return self.get_query_result(query_id=query_id, page_num=page)
+
+        pages = iter(range(2, first_page.total_pages + 1))
+        max_workers = min(self.max_page_workers, prefetch, first_page.total_pages - 1)
+        if max_workers < 1:
+            yield first_page
+            for page in pages:
+                yield fetch_page(page)
+            return
 
+        def fetch_page_in_worker(page: int) -> QueryResult:
+            with self._worker_session():
+                return fetch_page(page)
+
+        pool = self._worker_pool()
+        pending: Deque["Future[QueryResult]"] = deque(
+            pool.submit(fetch_page_in_worker, page) for page in islice(pages, prefetch)
+        )
+        try:
+            yield first_page
+
+            while len(pending) > 0:
+                result = pending.popleft().result()
+                # keep `prefetch` pages in flight while the caller consumes this one
+                pending.extend(pool.submit(fetch_page_in_worker, page) for page in islice(pages, 1))
+                yield result
+        finally:
+            # the pool outlives this query, so don't leave pages of an abandoned iteration queued in it
+            for future in pending:
+                future.cancel()
+
+    def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
+        """Query the Semantic Layer.
+
+        Concurrent calls with equivalent parameters share the same query and its results, unless
+        `read_cache=False` is passed.
+        """
+        if not params.get("read_cache", True):
+            return self._query(params)
+
+        key = query_fingerprint(validate_query_parameters(params))
+        return self._query_flights.do(key, lambda: self._query(params))
+
+    def _query(self, params: QueryParameters) -> "pa.Table":
+        """Query the Semantic Layer and fetch all pages of results."""
+        return self._fetch_table(self._create_query_and_wait(params))
+
+    def _fetch_table(self, first_page_results: QueryResult) -> "pa.Table":
+        """Fetch all pages of results of a successful query into a single table."""
+        assert first_page_results.total_pages is not None
         if first_page_results.total_pages == 1:
             return first_page_results.result_table
 
-        results = [
-            self.get_query_result(query_id=query_id, page_num=page)
-            for page in range(2, first_page_results.total_pages + 1)
-        ]
-        all_page_results = [first_page_results] + results
-        tables = [r.result_table for r in all_page_results]
+        # We need all pages anyways, so let all of them be fetched as fast as the workers allow
+        prefetch = first_page_results.total_pages - 1 if self.max_page_workers > 1 else 0
+        tables = [r.result_table for r in self._iter_pages(first_page_results, prefetch)]
         final_table = pa.concat_tables(tables)  # type: ignore
         return final_table
+
+    def query_batches(
+        self,
+        *,
+        prefetch: Optional[int] = None,
+        **params: Unpack[QueryParameters],
+    ) -> Iterator["pa.RecordBatch"]:
+        """Query the Semantic Layer, yielding the results page by page as record batches.
+
+        Unlike `query`, this never holds more than `prefetch + 1` pages in memory at once, so it can
+        be used to process results that don't fit in memory.
+
+        The query only gets created once iteration starts.
+
+        Args:
+            prefetch: How many pages to fetch ahead of the page currently being consumed. If `None`,
+                `max_page_workers` will be used. If 0, pages are only fetched when needed.
+            **params: The query parameters.
+        """
+        if prefetch is None:
+            prefetch = self.max_page_workers
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative.")
+
+        first_page_results = self._create_query_and_wait(params)
+        yield from self._fetch_batches(first_page_results, prefetch)
+
+    def _fetch_batches(self, first_page_results: QueryResult, prefetch: int) -> Iterator["pa.RecordBatch"]:
+        """Fetch the pages of results of a successful query, yielding them as record batches."""
+        for page_results in self._iter_pages(first_page_results, prefetch):
+            yield from page_results.result_table.to_batches()
+
+    def submit_query(self, **params: Unpack[QueryParameters]) -> SyncQueryHandle:
+        """Create a query in the Semantic Layer, without waiting for it to complete.
+
+        This returns as soon as the query got created, with a handle to wait for it and fetch its
+        results later. This way, a single thread can have many queries running at the same time.
+        Use `dbtsl.api.graphql.client.query_handle.wait_all` or `as_completed` to wait for many of them.
+
+        Unlike `query`, queries submitted with equivalent parameters don't share their results.
+        """
+        query_id = self.create_query(**params)
+        waiter = self._status_poller.submit(query_id, **self._status_poll_options(params))
+        # handles are typed against the client's stub
+        return SyncQueryHandle(self, waiter)
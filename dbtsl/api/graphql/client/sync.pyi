@@ -1,23 +1,34 @@
 # mypy: disable-error-code="misc"
 
 from contextlib import AbstractContextManager
-from typing import Iterator, List, Optional, Union
+from typing import Any, ClassVar, Iterator, List, Optional, Sequence, Type, Union
 
 import pyarrow as pa
+from gql.transport.requests import RequestsHTTPTransport
 from typing_extensions import Self, Unpack, overload
 
+from dbtsl.api.graphql.client.base import OperationRequest
+from dbtsl.api.graphql.client.query_handle import SyncQueryHandle
+from dbtsl.api.graphql.protocol import GraphQLProtocol
 from dbtsl.api.shared.query_params import GroupByParam, OrderByGroupBy, OrderByMetric, QueryParameters
+from dbtsl.backoff import PollingStrategy
 from dbtsl.models import (
     Dimension,
     Entity,
     EnvironmentInfo,
     Measure,
+    Metric,
     SavedQuery,
     SyncMetric,
 )
 from dbtsl.timeout import TimeoutOptions
 
+class FastJSONRequestsHTTPTransport(RequestsHTTPTransport): ...
+
 class SyncGraphQLClient:
+    PROTOCOL: ClassVar[Type[GraphQLProtocol]]
+    max_page_workers: int
+
     def __init__(
         self,
         server_host: str,
@@ -27,10 +38,38 @@ class SyncGraphQLClient:
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
+        max_page_workers: int = ...,
     ) -> None: ...
     def session(self) -> AbstractContextManager[Iterator[Self]]: ...
     @property
     def has_session(self) -> bool: ...
+    def invalidate_metadata_cache(self) -> None:
+        """Clear all cached metadata, so that the next metadata requests go to the server."""
+        ...
+
+    def load_all(
+        self,
+        metrics: Sequence[Metric],
+        fields: Sequence[str] = ("dimensions", "measures", "entities"),
+    ) -> None:
+        """Lazy load `fields` of all `metrics`, in as few GraphQL requests as possible."""
+        ...
+
+    def run_many(
+        self,
+        requests: Sequence[OperationRequest],
+        *,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Run many operations in as few GraphQL requests as possible."""
+        ...
+
     def metrics(self) -> List[SyncMetric]:
         """Get a list of all available metrics."""
         ...
@@ -51,6 +90,26 @@ class SyncGraphQLClient:
         """Get a list of all available saved queries."""
         ...
 
+    def metrics_table(self) -> "pa.Table":
+        """Get a table of all available metrics, with one row per metric."""
+        ...
+
+    def dimensions_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available dimensions for a given set of metrics, with one row per dimension."""
+        ...
+
+    def measures_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available measures for a given set of metrics, with one row per measure."""
+        ...
+
+    def entities_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available entities for a given set of metrics, with one row per entity."""
+        ...
+
+    def saved_queries_table(self) -> "pa.Table":
+        """Get a table of all available saved queries, with one row per saved query."""
+        ...
+
     @overload
     def compile_sql(
         self,
@@ -116,3 +175,72 @@ class SyncGraphQLClient:
     async def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
         """Query the Semantic Layer."""
         ...
+
+    @overload
+    def query_batches(
+        self,
+        metrics: List[str],
+        group_by: Optional[List[Union[GroupByParam, str]]] = None,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+        prefetch: Optional[int] = None,
+    ) -> Iterator["pa.RecordBatch"]: ...
+    @overload
+    def query_batches(
+        self,
+        group_by: List[Union[GroupByParam, str]],
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+        prefetch: Optional[int] = None,
+    ) -> Iterator["pa.RecordBatch"]: ...
+    @overload
+    def query_batches(
+        self,
+        saved_query: str,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+        prefetch: Optional[int] = None,
+    ) -> Iterator["pa.RecordBatch"]: ...
+    def query_batches(
+        self, *, prefetch: Optional[int] = None, **params: Unpack[QueryParameters]
+    ) -> Iterator["pa.RecordBatch"]:
+        """Query the Semantic Layer, yielding the results page by page as record batches."""
+        ...
+
+    @overload
+    def submit_query(
+        self,
+        metrics: List[str],
+        group_by: Optional[List[Union[GroupByParam, str]]] = None,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> SyncQueryHandle: ...
+    @overload
+    def submit_query(
+        self,
+        group_by: List[Union[GroupByParam, str]],
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> SyncQueryHandle: ...
+    @overload
+    def submit_query(
+        self,
+        saved_query: str,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> SyncQueryHandle: ...
+    def submit_query(self, **params: Unpack[QueryParameters]) -> SyncQueryHandle:
+        """Create a query in the Semantic Layer, without waiting for it to complete."""
+        ...
@@ -1,10 +1,44 @@
+import sys
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Generic, List, Mapping, Protocol, TypedDict, TypeVar, cast
+from functools import cache, lru_cache
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Type,
+    TypedDict,
+    TypeVar,
+    cast,
+)
 
-from mashumaro.codecs.basic import decode as decode_to_dataclass
+import pyarrow as pa
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    NameNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    VariableDefinitionNode,
+    VariableNode,
+    Visitor,
+    parse,
+    print_ast,
+    visit,
+)
+from mashumaro.codecs.basic import BasicDecoder
 from typing_extensions import NotRequired, override
 
-from dbtsl.api.graphql.util import render_query
+from dbtsl.api.graphql.util import normalize_query, render_query
 from dbtsl.api.shared.query_params import (
     AdhocQueryParametersStrict,
     OrderByMetric,
@@ -12,8 +46,10 @@ from dbtsl.api.shared.query_params import (
     validate_query_parameters,
 )
 from dbtsl.models import Dimension, Entity, Measure, Metric
+from dbtsl.models.arrow import decode_to_table, model_arrow_type
+from dbtsl.models.base import BaseModel, TModel, compact_model
 from dbtsl.models.environment import EnvironmentInfo
-from dbtsl.models.query import QueryId, QueryResult, QueryStatus
+from dbtsl.models.query import QueryId, QueryResult, QueryStatus, QueryStatusResult
 from dbtsl.models.saved_query import SavedQuery
 
 
@@ -42,15 +78,59 @@ TVariables = TypeVar("TVariables", bound=Mapping[str, Any])
 # def func(a: ProtocolOperation[JobStatusVariables, JobStatusResult]) -> JobStatusResult:
 TResponse = TypeVar("TResponse", covariant=True)
 
+T = TypeVar("T")
+
+
+@cache
+def get_decoder(shape_type: Any) -> BasicDecoder[Any]:
+    """Get the mashumaro decoder for `shape_type`.
+
+    Building a decoder generates and compiles its code, which is slow, so each decoder only gets
+    built once, the first time it is needed.
+    """
+    return BasicDecoder(shape_type)
+
+
+def decode_to_dataclass(data: Any, shape_type: Type[T]) -> T:
+    """Decode raw JSON into `shape_type`, reusing its decoder."""
+    # classes are hashable, but type checkers don't consider `Type[T]` to be `Hashable`
+    decoder: BasicDecoder[T] = get_decoder(cast(Hashable, shape_type))
+    return decoder.decode(data)
+
 
 class ProtocolOperation(Generic[TVariables, TResponse], ABC):
     """Base class for GraphQL API operations."""
 
+    # Whether responses of this operation only depend on its variables and on the project's
+    # definitions, and thus can be served from the client's metadata cache
+    cacheable: bool = False
+
+    def __init__(self) -> None:
+        """Initialize the operation."""
+        self._request_texts: Dict[bool, str] = {}
+
     @abstractmethod
-    def get_request_text(self, *, lazy: bool) -> str:
-        """Get the GraphQL request text."""
+    def render_request_text(self, *, lazy: bool) -> str:
+        """Render the GraphQL request text. Use `get_request_text`, which caches it, instead."""
         raise NotImplementedError()
 
+    def get_request_text(self, *, lazy: bool) -> str:
+        """Get the GraphQL request text.
+
+        The text only depends on `lazy`, so it only gets rendered once per `lazy` mode.
+        """
+        text = self._request_texts.get(lazy)
+        if text is None:
+            # interned so that equal operations of different protocols, like compact ones, share it
+            text = sys.intern(self.render_request_text(lazy=lazy))
+            self._request_texts[lazy] = text
+        return text
+
+    @property
+    def request_texts(self) -> Mapping[bool, str]:
+        """The request texts which were rendered so far, keyed by `lazy`."""
+        return MappingProxyType(self._request_texts)
+
     @abstractmethod
     def get_request_variables(self, environment_id: int, variables: TVariables) -> Dict[str, Any]:
         """Get the GraphQL variables dictionary."""
@@ -61,6 +141,38 @@ class ProtocolOperation(Generic[TVariables, TResponse], ABC):
         """Parse the raw response JSON into a pretty Python type."""
         raise NotImplementedError()
 
+    def prepare(self) -> None:
+        """Do any expensive one-time setup for parsing responses, such as building decoders.
+
+        This is optional, since anything that wasn't prepared gets set up on first use. Preparing
+        ahead of time just moves that cost out of the first request.
+        """
+        pass
+
+
+class ListModelsOperation(ProtocolOperation[TVariables, List[TModel]], ABC):
+    """Base class for operations which list models.
+
+    If `compact`, responses are parsed into the compact variant of the models.
+    """
+
+    # The model of each item in the list
+    model: Type[TModel]
+
+    def __init__(self, *, compact: bool = False) -> None:
+        """Initialize the operation."""
+        super().__init__()
+        self.compact = compact
+        item_type: Any = compact_model(self.model) if compact else self.model
+        self._response_type: Any = List[item_type]
+
+    def _decode(self, data: List[Dict[str, Any]]) -> List[TModel]:
+        return decode_to_dataclass(data, self._response_type)
+
+    @override
+    def prepare(self) -> None:
+        get_decoder(self._response_type)
+
 
 class EmptyVariables(TypedDict, total=False):
     """The parameter type for queries that don't need any variables."""
@@ -68,11 +180,14 @@ class EmptyVariables(TypedDict, total=False):
     pass
 
 
-class ListMetricsOperation(ProtocolOperation[EmptyVariables, List[Metric]]):
+class ListMetricsOperation(ListModelsOperation[EmptyVariables, Metric]):
     """List all available metrics in available in the Semantic Layer."""
 
+    cacheable = True
+    model = Metric
+
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         query getMetrics($environmentId: BigInt!) {
             metrics(environmentId: $environmentId) {
@@ -88,7 +203,7 @@ class ListMetricsOperation(ProtocolOperation[EmptyVariables, List[Metric]]):
 
     @override
     def parse_response(self, data: Dict[str, Any]) -> List[Metric]:
-        return decode_to_dataclass(data["metrics"], List[Metric])
+        return self._decode(data["metrics"])
 
 
 class ListEntitiesOperationVariables(TypedDict):
@@ -97,11 +212,14 @@ class ListEntitiesOperationVariables(TypedDict):
     metrics: List[str]
 
 
-class ListDimensionsOperation(ProtocolOperation[ListEntitiesOperationVariables, List[Dimension]]):
+class ListDimensionsOperation(ListModelsOperation[ListEntitiesOperationVariables, Dimension]):
     """List all dimensions for a given set of metrics."""
 
+    cacheable = True
+    model = Dimension
+
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         query getDimensions($environmentId: BigInt!, $metrics: [MetricInput!]!) {
             dimensions(environmentId: $environmentId, metrics: $metrics) {
@@ -120,14 +238,17 @@ class ListDimensionsOperation(ProtocolOperation[ListEntitiesOperationVariables,
 
     @override
     def parse_response(self, data: Dict[str, Any]) -> List[Dimension]:
-        return decode_to_dataclass(data["dimensions"], List[Dimension])
+        return self._decode(data["dimensions"])
 
 
-class ListMeasuresOperation(ProtocolOperation[ListEntitiesOperationVariables, List[Measure]]):
+class ListMeasuresOperation(ListModelsOperation[ListEntitiesOperationVariables, Measure]):
     """List all measures for a given set of metrics."""
 
+    cacheable = True
+    model = Measure
+
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         query getMeasures($environmentId: BigInt!, $metrics: [MetricInput!]!) {
             measures(environmentId: $environmentId, metrics: $metrics) {
@@ -146,14 +267,17 @@ class ListMeasuresOperation(ProtocolOperation[ListEntitiesOperationVariables, Li
 
     @override
     def parse_response(self, data: Dict[str, Any]) -> List[Measure]:
-        return decode_to_dataclass(data["measures"], List[Measure])
+        return self._decode(data["measures"])
 
 
-class ListEntitiesOperation(ProtocolOperation[ListEntitiesOperationVariables, List[Entity]]):
+class ListEntitiesOperation(ListModelsOperation[ListEntitiesOperationVariables, Entity]):
     """List all entities for a given set of metrics."""
 
+    cacheable = True
+    model = Entity
+
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         query getEntities($environmentId: BigInt!, $metrics: [MetricInput!]!) {
             entities(environmentId: $environmentId, metrics: $metrics) {
@@ -172,14 +296,17 @@ class ListEntitiesOperation(ProtocolOperation[ListEntitiesOperationVariables, Li
 
     @override
     def parse_response(self, data: Dict[str, Any]) -> List[Entity]:
-        return decode_to_dataclass(data["entities"], List[Entity])
+        return self._decode(data["entities"])
 
 
-class ListSavedQueriesOperation(ProtocolOperation[EmptyVariables, List[SavedQuery]]):
+class ListSavedQueriesOperation(ListModelsOperation[EmptyVariables, SavedQuery]):
     """List all saved queries."""
 
+    cacheable = True
+    model = SavedQuery
+
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         query getSavedQueries($environmentId: BigInt!) {
             savedQueries(environmentId: $environmentId) {
@@ -195,7 +322,46 @@ class ListSavedQueriesOperation(ProtocolOperation[EmptyVariables, List[SavedQuer
 
     @override
     def parse_response(self, data: Dict[str, Any]) -> List[SavedQuery]:
-        return decode_to_dataclass(data["savedQueries"], List[SavedQuery])
+        return self._decode(data["savedQueries"])
+
+
+class ListModelsTableOperation(ProtocolOperation[TVariables, "pa.Table"]):
+    """Run a `ListModelsOperation`, but parse its response straight into a table instead of into models.
+
+    This skips instantiating models, which is a lot cheaper for large projects.
+    """
+
+    cacheable = True
+
+    def __init__(self, op: ListModelsOperation[TVariables, Any], model: Type[BaseModel], response_key: str) -> None:
+        """Initialize the operation.
+
+        Arguments:
+            op: the operation whose request to send
+            model: the model which represents each row of the table
+            response_key: the key of the list of models in the response
+        """
+        super().__init__()
+        self.op = op
+        self.model = model
+        self.response_key = response_key
+
+    @override
+    def render_request_text(self, *, lazy: bool) -> str:
+        return self.op.get_request_text(lazy=lazy)
+
+    @override
+    def get_request_variables(self, environment_id: int, variables: TVariables) -> Dict[str, Any]:
+        return self.op.get_request_variables(environment_id, variables)
+
+    @override
+    def parse_response(self, data: Dict[str, Any]) -> "pa.Table":
+        return decode_to_table(data[self.response_key], self.model)
+
+    @override
+    def prepare(self) -> None:
+        model_arrow_type(self.model, camel_case=True)
+        model_arrow_type(self.model, camel_case=False)
 
 
 def get_query_request_variables(environment_id: int, params: QueryParameters) -> Dict[str, Any]:
@@ -243,7 +409,7 @@ class CreateQueryOperation(ProtocolOperation[QueryParameters, QueryId]):
     """Create a query that will be processed asynchronously."""
 
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         mutation createQuery(
             $environmentId: BigInt!,
@@ -291,7 +457,7 @@ class GetQueryResultOperation(ProtocolOperation[GetQueryResultVariables, QueryRe
     """Get the results of a query that was already created."""
 
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         query getQueryResults(
             $environmentId: BigInt!,
@@ -317,12 +483,61 @@ class GetQueryResultOperation(ProtocolOperation[GetQueryResultVariables, QueryRe
     def parse_response(self, data: Dict[str, Any]) -> QueryResult:
         return decode_to_dataclass(data["query"], QueryResult)
 
+    @override
+    def prepare(self) -> None:
+        get_decoder(QueryResult)
+
+
+class GetQueryStatusVariables(TypedDict):
+    """Variables for `GetQueryStatusOperation`."""
+
+    query_id: QueryId
+
+
+class GetQueryStatusOperation(ProtocolOperation[GetQueryStatusVariables, QueryStatusResult]):
+    """Get the status of a query that was already created, without its SQL or results.
+
+    This is a lot cheaper than `GetQueryResultOperation` to poll for queries until they complete.
+    """
+
+    @override
+    def render_request_text(self, *, lazy: bool) -> str:
+        query = """
+        query getQueryStatus(
+            $environmentId: BigInt!,
+            $queryId: String!,
+            $pageNum: Int!
+        ) {
+            query(environmentId: $environmentId, queryId: $queryId, pageNum: $pageNum) {
+                ...&fragment
+            }
+        }
+        """
+        return render_query(query, QueryStatusResult.gql_fragments(lazy=lazy))
+
+    @override
+    def get_request_variables(self, environment_id: int, variables: GetQueryStatusVariables) -> Dict[str, Any]:
+        return {
+            "environmentId": environment_id,
+            "queryId": variables["query_id"],
+            # the status doesn't depend on the page, but the API requires one
+            "pageNum": 1,
+        }
+
+    @override
+    def parse_response(self, data: Dict[str, Any]) -> QueryStatusResult:
+        return decode_to_dataclass(data["query"], QueryStatusResult)
+
+    @override
+    def prepare(self) -> None:
+        get_decoder(QueryStatusResult)
+
 
 class CompileSqlOperation(ProtocolOperation[QueryParameters, str]):
     """Get the compiled SQL that would be sent to the warehouse by a query."""
 
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         mutation compileSql(
             $environmentId: BigInt!,
@@ -363,7 +578,7 @@ class GetEnvironmentInfoOperation(ProtocolOperation[EmptyVariables, EnvironmentI
     """Get information about the Semantic Layer environment."""
 
     @override
-    def get_request_text(self, *, lazy: bool) -> str:
+    def render_request_text(self, *, lazy: bool) -> str:
         query = """
         query getEnvironmentInfo($environmentId: BigInt!) {
             environmentInfo(environmentId: $environmentId) {
@@ -381,6 +596,200 @@ class GetEnvironmentInfoOperation(ProtocolOperation[EmptyVariables, EnvironmentI
     def parse_response(self, data: Dict[str, Any]) -> EnvironmentInfo:
         return decode_to_dataclass(data["environmentInfo"], EnvironmentInfo)
 
+    @override
+    def prepare(self) -> None:
+        get_decoder(EnvironmentInfo)
+
+
+class CompositeVariables(TypedDict):
+    """Variables for `CompositeOperation`: the variables of each of its operations, in order."""
+
+    variables: Sequence[Mapping[str, Any]]
+
+
+# The data and errors of a single operation in a composite response
+OperationResponse = Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]
+
+
+class _PrefixVariables(Visitor):
+    """Prefix the names of all variables in a GraphQL document."""
+
+    def __init__(self, prefix: str) -> None:
+        super().__init__()
+        self.prefix = prefix
+
+    def enter_variable(self, node: VariableNode, *_args: Any) -> VariableNode:
+        return VariableNode(name=NameNode(value=self.prefix + node.name.value))
+
+
+class CompositeOperation(ProtocolOperation[CompositeVariables, List[Any]]):
+    """Run multiple operations in a single GraphQL request.
+
+    The root fields and variables of each operation get prefixed with `op{i}_` so that they don't
+    clash, and fragments shared between operations only get sent once. Responses get split back
+    into one response per operation, in order.
+
+    All operations must be of the same type, i.e all queries or all mutations.
+    """
+
+    def __init__(self, ops: Sequence[ProtocolOperation[Any, Any]]) -> None:
+        """Initialize the composite operation from the operations to run, in order."""
+        if len(ops) == 0:
+            raise ValueError("A CompositeOperation needs at least one operation.")
+
+        super().__init__()
+        self.ops: Tuple[ProtocolOperation[Any, Any], ...] = tuple(ops)
+
+        # For each operation, map its root fields' keys in the composite response to their keys in
+        # the operation's own response
+        self._response_keys: List[Dict[str, str]] = []
+        # Map the root fields' keys in the composite response to the index of their operation
+        self._key_to_op: Dict[str, int] = {}
+
+        # this validates the operations can be merged, and populates the response keys
+        self.get_request_text(lazy=False)
+
+    def __eq__(self, other: object) -> bool:  # noqa: D105
+        return isinstance(other, CompositeOperation) and self.ops == other.ops
+
+    def __hash__(self) -> int:  # noqa: D105
+        return hash(self.ops)
+
+    @staticmethod
+    def _prefix(index: int) -> str:
+        return f"op{index}_"
+
+    def _merge(self, *, lazy: bool) -> str:
+        """Merge the request text of all operations into a single GraphQL request."""
+        operation_type: Optional[OperationType] = None
+        variable_definitions: List[VariableDefinitionNode] = []
+        selections: List[FieldNode] = []
+        fragments: Dict[str, FragmentDefinitionNode] = {}
+        response_keys: List[Dict[str, str]] = []
+        key_to_op: Dict[str, int] = {}
+
+        for i, op in enumerate(self.ops):
+            prefix = self._prefix(i)
+            doc = cast(DocumentNode, visit(parse(op.get_request_text(lazy=lazy)), _PrefixVariables(prefix)))
+
+            op_defs = [d for d in doc.definitions if isinstance(d, OperationDefinitionNode)]
+            assert len(op_defs) == 1, "Operations must contain exactly one GraphQL operation."
+            op_def = op_defs[0]
+
+            if operation_type is None:
+                operation_type = op_def.operation
+            elif op_def.operation != operation_type:
+                raise ValueError("Cannot mix queries and mutations in the same CompositeOperation.")
+
+            variable_definitions.extend(op_def.variable_definitions)
+
+            keys: Dict[str, str] = {}
+            for selection in op_def.selection_set.selections:
+                assert isinstance(selection, FieldNode)
+                key = (selection.alias or selection.name).value
+                alias = prefix + key
+                keys[alias] = key
+                key_to_op[alias] = i
+                selections.append(
+                    FieldNode(
+                        alias=NameNode(value=alias),
+                        name=selection.name,
+                        arguments=selection.arguments,
+                        directives=selection.directives,
+                        selection_set=selection.selection_set,
+                    )
+                )
+            response_keys.append(keys)
+
+            for definition in doc.definitions:
+                if not isinstance(definition, FragmentDefinitionNode):
+                    continue
+
+                name = definition.name.value
+                existing = fragments.get(name)
+                if existing is None:
+                    fragments[name] = definition
+                elif print_ast(existing) != print_ast(definition):
+                    raise ValueError(f"Operations have conflicting definitions of fragment `{name}`.")
+
+        assert operation_type is not None
+        merged = DocumentNode(
+            definitions=(
+                OperationDefinitionNode(
+                    operation=operation_type,
+                    name=NameNode(value="composite"),
+                    variable_definitions=tuple(variable_definitions),
+                    directives=(),
+                    selection_set=SelectionSetNode(selections=tuple(selections)),
+                ),
+                *fragments.values(),
+            )
+        )
+
+        self._response_keys = response_keys
+        self._key_to_op = key_to_op
+        return normalize_query(print_ast(merged))
+
+    @override
+    def render_request_text(self, *, lazy: bool) -> str:
+        return self._merge(lazy=lazy)
+
+    @override
+    def get_request_variables(self, environment_id: int, variables: CompositeVariables) -> Dict[str, Any]:
+        op_variables = variables["variables"]
+        if len(op_variables) != len(self.ops):
+            raise ValueError(f"Expected variables for {len(self.ops)} operations, got {len(op_variables)}.")
+
+        merged: Dict[str, Any] = {}
+        for i, (op, raw_variables) in enumerate(zip(self.ops, op_variables)):
+            prefix = self._prefix(i)
+            for name, value in op.get_request_variables(environment_id, raw_variables).items():
+                merged[prefix + name] = value
+        return merged
+
+    def split_response(self, data: Optional[Dict[str, Any]], errors: List[Dict[str, Any]]) -> List[OperationResponse]:
+        """Split a (possibly partial) composite response into the data and errors of each operation.
+
+        Errors which can't be attributed to a single operation are attributed to all of them.
+        """
+        op_errors: List[List[Dict[str, Any]]] = [[] for _ in self.ops]
+        for error in errors:
+            path = error.get("path")
+            op_index = self._key_to_op.get(path[0]) if path else None
+            if op_index is None:
+                for errs in op_errors:
+                    errs.append(error)
+            else:
+                op_errors[op_index].append(error)
+
+        responses: List[OperationResponse] = []
+        for keys, errs in zip(self._response_keys, op_errors):
+            op_data = {key: data.get(alias) for alias, key in keys.items()} if data is not None else None
+            responses.append((op_data, errs))
+        return responses
+
+    @override
+    def parse_response(self, data: Dict[str, Any]) -> List[Any]:
+        return [
+            op.parse_response(cast(Dict[str, Any], op_data))
+            for op, (op_data, _) in zip(self.ops, self.split_response(data, []))
+        ]
+
+    @override
+    def prepare(self) -> None:
+        for op in self.ops:
+            op.prepare()
+
+
+@lru_cache(maxsize=256)
+def get_composite_operation(ops: Tuple[ProtocolOperation[Any, Any], ...]) -> CompositeOperation:
+    """Get the composite operation which runs `ops`, in order.
+
+    Merging operations parses, rewrites and prints their documents, so composite operations get
+    reused across batches of the same operations, like the status checks of as many queries.
+    """
+    return CompositeOperation(ops)
+
 
 class GraphQLProtocol:
     """Holds the GraphQL implementation for each of method in the API.
@@ -394,7 +803,37 @@ class GraphQLProtocol:
     measures = ListMeasuresOperation()
     entities = ListEntitiesOperation()
     saved_queries = ListSavedQueriesOperation()
+    metrics_table = ListModelsTableOperation(metrics, Metric, "metrics")
+    dimensions_table = ListModelsTableOperation(dimensions, Dimension, "dimensions")
+    measures_table = ListModelsTableOperation(measures, Measure, "measures")
+    entities_table = ListModelsTableOperation(entities, Entity, "entities")
+    saved_queries_table = ListModelsTableOperation(saved_queries, SavedQuery, "savedQueries")
     create_query = CreateQueryOperation()
     get_query_result = GetQueryResultOperation()
+    get_query_status = GetQueryStatusOperation()
     compile_sql = CompileSqlOperation()
     environment_info = GetEnvironmentInfoOperation()
+
+
+class CompactGraphQLProtocol(GraphQLProtocol):
+    """A `GraphQLProtocol` which parses metadata into the compact variant of the models."""
+
+    metrics = ListMetricsOperation(compact=True)
+    dimensions = ListDimensionsOperation(compact=True)
+    measures = ListMeasuresOperation(compact=True)
+    entities = ListEntitiesOperation(compact=True)
+    saved_queries = ListSavedQueriesOperation(compact=True)
+
+
+def prepare_operations(protocol: Type[GraphQLProtocol]) -> None:
+    """Prepare all operations of `protocol` ahead of their first use.
+
+    This renders their request text in both `lazy` modes, and does their one-time setup for parsing
+    responses (see `ProtocolOperation.prepare`).
+    """
+    for name in dir(protocol):
+        op = getattr(protocol, name)
+        if isinstance(op, ProtocolOperation):
+            op.get_request_text(lazy=False)
+            op.get_request_text(lazy=True)
+            op.prepare()
@@ -0,0 +1,29 @@
+"""Decode JSON with a fast backend if one is installed, falling back to the standard library.
+
+GraphQL responses can be tens of megabytes, like metadata with every nested list or pages of
+query results. [orjson](https://github.com/ijl/orjson) decodes those several times faster than
+`json`, and it reads UTF-8 bytes directly, so the response body doesn't have to be decoded into
+a string first. Install it with `pip install "dbt-sl-sdk[fast-json]"`.
+"""
+
+import json
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+
+    FAST_JSON_BACKEND: Optional[str] = "orjson"
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode a JSON document from UTF-8 bytes or a string."""
+        return orjson.loads(data)
+
+except ImportError:
+    FAST_JSON_BACKEND = None  # pyright: ignore[reportConstantRedefinition]
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode a JSON document from UTF-8 bytes or a string."""
+        return json.loads(data)
+
+
+__all__ = ["FAST_JSON_BACKEND", "loads"]
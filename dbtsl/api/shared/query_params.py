@@ -1,3 +1,6 @@
+import dataclasses
+import hashlib
+import json
 from dataclasses import dataclass
 from enum import Enum
 from typing import List, Optional, TypedDict, Union
@@ -159,6 +162,29 @@ def validate_query_parameters(
     )
 
 
+def _fingerprint_json_default(val: object) -> object:
+    if isinstance(val, Enum):
+        return val.value
+    raise TypeError(f"Cannot fingerprint value of type {type(val)}")
+
+
+def query_fingerprint(params: Union[AdhocQueryParametersStrict, SavedQueryQueryParametersStrict]) -> str:
+    """Get a canonical fingerprint of some validated query parameters.
+
+    Queries with the same fingerprint will return the same data. `read_cache` is not part
+    of the fingerprint since it doesn't change what the query returns.
+    """
+    fields = dataclasses.asdict(params)
+    del fields["read_cache"]
+    canonical = json.dumps(
+        [params.__class__.__name__, fields],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_fingerprint_json_default,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
 class DimensionValuesQueryParameters(TypedDict, total=False):
     """The parameters of `semantic_layer.dimension_values`."""
 
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar, cast
+
+T = TypeVar("T")
+
+
+class SyncSingleFlight:
+    """Coalesce concurrent calls with the same key into a single call, across threads.
+
+    While a call for a key is in flight, other threads calling with the same key wait for it
+    and get its result (or exception) instead of starting a new call.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group of calls."""
+        self._lock = threading.Lock()
+        self._calls: Dict[str, "Future[Any]"] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run `fn`, unless there's already a call for `key` in flight, in which case wait for it."""
+        with self._lock:
+            # all calls for the same key return the same type, since the key identifies what `fn` does
+            call: Optional["Future[T]"] = cast("Optional[Future[T]]", self._calls.get(key))
+            is_leader = call is None
+            if call is None:
+                call = Future()
+                self._calls[key] = call
+
+        if not is_leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as err:
+            self._forget(key)
+            call.set_exception(err)
+            raise
+
+        self._forget(key)
+        call.set_result(result)
+        return result
+
+    def _forget(self, key: str) -> None:
+        # Forget the call before resolving it, so that calls which start after the result is
+        # out don't get it
+        with self._lock:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        """The number of calls in flight."""
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent calls with the same key into a single call, across tasks.
+
+    While a call for a key is in flight, other tasks calling with the same key await it
+    and get its result (or exception) instead of starting a new call.
+
+    The call runs in its own task, so cancelling one of the waiters (even the one which
+    started it) doesn't cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group of calls."""
+        self._calls: Dict[str, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn`, unless there's already a call for `key` in flight, in which case await it."""
+        call = cast("Optional[asyncio.Future[T]]", self._calls.get(key))
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+
+        return await asyncio.shield(call)
+
+    def _forget(self, key: str, call: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+        # If every waiter got cancelled, nobody is left to retrieve the exception, so mark it
+        # as retrieved here to avoid asyncio logging it as unhandled
+        if not call.cancelled():
+            call.exception()
+
+    def __len__(self) -> int:
+        """The number of calls in flight."""
+        return len(self._calls)
@@ -1,7 +1,9 @@
 import itertools
+import random
 import warnings
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Iterator, Optional
+from typing import Dict, Iterator, Literal, Optional, Tuple
 
 TIMEOUT_MS_DEPRECATION = """
 Since the introduction of `TimeoutOptions`, the `timeout_ms` parameter on `ExponentialBackoff` has been deprecated.
@@ -9,15 +11,54 @@ While it will still work, it might be removed in the future. Please migrate to s
 global `TimeoutOptions` object.
 """.strip().replace("\n", " ")
 
+Jitter = Literal["none", "full", "decorrelated"]
+
+
+class PollingStrategy(ABC):
+    """Decide how long to wait between the polls of a job, like a query, until it completes.
+
+    The first poll happens right after the job is created, then the poller sleeps for each of
+    the times yielded by `iter_ms` in turn.
+    """
+
+    @abstractmethod
+    def iter_ms(self, key: Optional[str] = None) -> Iterator[int]:
+        """Iterate over sleep times in ms between the polls of a job.
+
+        Args:
+            key: identifies jobs which take about the same time to complete, like the
+                fingerprint of a query's parameters. `None` if unknown.
+        """
+        raise NotImplementedError()
+
+    def record(self, key: Optional[str], duration_ms: int) -> None:
+        """Record about how long a job took to complete, counting from its first poll.
+
+        Pollers only call this for jobs which were still running at their first poll. Since a job
+        completes somewhere between the last poll which saw it running and the one which saw it
+        completed, they record the middle of those two polls.
+
+        This does nothing by default. Strategies can use it to learn how long similar jobs take.
+        """
+        pass
+
 
 @dataclass(frozen=True)
-class ExponentialBackoff:
+class ExponentialBackoff(PollingStrategy):
     """Manage exponential backoff logic.
 
     Attributes:
         base_interval_ms: The interval to start with
         max_interval_ms: The maximum interval length
         exp_factor: The exponential factor to increase wait times
+        first_intervals_ms: Short intervals to wait before the exponential ones, so that
+            jobs which complete quickly don't wait for `base_interval_ms`
+        jitter: How to randomize the exponential intervals, so that many clients which started
+            polling at the same time don't keep polling in lockstep. "full" picks each interval
+            uniformly between `min_jitter_ms` and its exponential value. "decorrelated" picks it
+            between `base_interval_ms` and 3 times the previous interval, ignoring `exp_factor`.
+        min_jitter_ms: The shortest interval "full" jitter can pick, so that polls never happen
+            back to back
         [deprecated] timeout_ms: After how long should it raise a TimeoutError
     """
 
@@ -27,11 +68,98 @@ class ExponentialBackoff:
 
     timeout_ms: Optional[int] = None
 
+    first_intervals_ms: Tuple[int, ...] = ()
+    jitter: Jitter = "none"
+    min_jitter_ms: int = 50
+
     def __post_init__(self) -> None:  # noqa: D105
         if self.timeout_ms is not None:
             warnings.warn(TIMEOUT_MS_DEPRECATION, DeprecationWarning)
 
-    def iter_ms(self) -> Iterator[int]:
+        if self.jitter not in ("none", "full", "decorrelated"):
+            raise ValueError(f"Unknown jitter: '{self.jitter}'.")
+
+    def iter_ms(self, key: Optional[str] = None) -> Iterator[int]:
         """Iterate over sleep times in ms according to the backoff configuration."""
+        yield from self.first_intervals_ms
+
+        if self.jitter == "decorrelated":
+            sleep_ms = self.base_interval_ms
+            while True:
+                sleep_ms = min(int(random.uniform(self.base_interval_ms, sleep_ms * 3)), self.max_interval_ms)
+                yield sleep_ms
+
         for i in itertools.count(start=0):
-            yield min(int(self.base_interval_ms * self.exp_factor**i), self.max_interval_ms)
+            sleep_ms = min(int(self.base_interval_ms * self.exp_factor**i), self.max_interval_ms)
+            if self.jitter == "full":
+                sleep_ms = int(random.uniform(min(self.min_jitter_ms, sleep_ms), sleep_ms))
+            yield sleep_ms
+
+
+class AdaptivePolling(PollingStrategy):
+    """Poll jobs when similar jobs usually complete, learning how long they take.
+
+    The first poll after the initial one waits for the typical completion time of jobs with the
+    same key: an exponentially weighted moving average of their recorded durations. If the job is
+    still running by then, or if no job with that key completed yet, this falls back to another
+    strategy.
+
+    Attributes:
+        fallback: The strategy to use for jobs of unknown duration, and once the typical
+            completion time has passed
+        smoothing: The weight of the latest duration in the moving average, between 0 and 1
+        max_keys: How many keys to remember. The oldest ones get forgotten first.
+    """
+
+    def __init__(
+        self,
+        fallback: Optional[PollingStrategy] = None,
+        *,
+        smoothing: float = 0.3,
+        max_keys: int = 1024,
+    ) -> None:
+        """Initialize the adaptive polling strategy.
+
+        Args:
+            fallback: the strategy for jobs of unknown duration. If `None`, a short exponential
+                backoff with full jitter is used.
+            smoothing: the weight of the latest duration in the moving average
+            max_keys: how many keys to remember
+        """
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be between 0 (excluded) and 1.")
+        if max_keys < 1:
+            raise ValueError("max_keys must be at least 1.")
+
+        self.fallback = fallback or ExponentialBackoff(
+            base_interval_ms=100,
+            max_interval_ms=60000,
+            exp_factor=1.5,
+            jitter="full",
+        )
+        self.smoothing = smoothing
+        self.max_keys = max_keys
+        self._durations_ms: Dict[str, float] = {}
+
+    def expected_duration_ms(self, key: str) -> Optional[float]:
+        """Get the typical duration of jobs with `key`, or `None` if none was recorded."""
+        return self._durations_ms.get(key)
+
+    def iter_ms(self, key: Optional[str] = None) -> Iterator[int]:  # noqa: D102
+        expected_ms = self._durations_ms.get(key) if key is not None else None
+        if expected_ms is not None:
+            yield int(expected_ms)
+        yield from self.fallback.iter_ms(key)
+
+    def record(self, key: Optional[str], duration_ms: int) -> None:  # noqa: D102
+        if key is None:
+            return
+
+        previous_ms = self._durations_ms.pop(key, None)
+        if previous_ms is None:
+            self._durations_ms[key] = float(duration_ms)
+            if len(self._durations_ms) > self.max_keys:
+                del self._durations_ms[next(iter(self._durations_ms))]
+        else:
+            # re-inserting moves the key to the end, so the least recently completed are evicted first
+            self._durations_ms[key] = previous_ms + self.smoothing * (duration_ms - previous_ms)
@@ -0,0 +1,258 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import pyarrow as pa
+
+
+class ResultCache(ABC):
+    """Base class for caches of query results.
+
+    Implementations must be safe to use from multiple threads at once.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional["pa.Table"]:
+        """Get the cached table for `key`, or `None` if it is not cached or has expired."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def put(self, key: str, table: "pa.Table") -> None:
+        """Store `table` in the cache under `key`."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Remove `key` from the cache. If `key` is `None`, remove everything."""
+        raise NotImplementedError()
+
+
+@dataclass(frozen=True)
+class _InMemoryEntry:
+    table: "pa.Table"
+    nbytes: int
+    expires_at: Optional[float]
+
+
+class InMemoryResultCache(ResultCache):
+    """A result cache that keeps tables in memory.
+
+    Once the cache grows over `max_bytes`, the least recently used tables get evicted.
+    Tables which are larger than `max_bytes` by themselves are never cached.
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl_s: Optional[float] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes: the maximum total size of all cached tables, in bytes.
+            ttl_s: how long (in seconds) a table stays valid after being cached. If `None`,
+                tables only leave the cache when evicted.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative.")
+        if ttl_s is not None and ttl_s <= 0:
+            raise ValueError("ttl_s must be positive.")
+
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _InMemoryEntry]" = OrderedDict()
+        self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """The total size of all cached tables, in bytes."""
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        """The number of cached tables."""
+        return len(self._entries)
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.nbytes
+
+    def get(self, key: str) -> Optional["pa.Table"]:
+        """Get the cached table for `key`, or `None` if it is not cached or has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                self._pop(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry.table
+
+    def put(self, key: str, table: "pa.Table") -> None:
+        """Store `table` in the cache under `key`, evicting old tables if needed."""
+        nbytes = table.nbytes
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s is not None else None
+
+        with self._lock:
+            self._pop(key)
+            if nbytes > self.max_bytes:
+                return
+
+            self._entries[key] = _InMemoryEntry(table=table, nbytes=nbytes, expires_at=expires_at)
+            self._total_bytes += nbytes
+
+            while self._total_bytes > self.max_bytes:
+                lru_key = next(iter(self._entries))
+                self._pop(lru_key)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Remove `key` from the cache. If `key` is `None`, remove everything."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._total_bytes = 0
+                return
+
+            self._pop(key)
+
+
+class DiskResultCache(ResultCache):
+    """A result cache that stores tables as Arrow IPC files in a directory.
+
+    Cached tables are read back via memory mapping, so a hit doesn't copy the table into memory.
+    Writes are atomic, which means multiple processes on the same host can safely share the
+    same cache directory.
+
+    Once the directory grows over `max_bytes`, the least recently used files get evicted. The
+    last use of each file is tracked in its access time, while its modification time records
+    when it was written, for the TTL.
+    """
+
+    DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+    SUFFIX = ".arrow"
+
+    def __init__(
+        self,
+        directory: Union[str, "os.PathLike[str]"],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_s: Optional[float] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: where to store cached tables. It will be created if it doesn't exist.
+            max_bytes: the maximum total size of all cached files, in bytes.
+            ttl_s: how long (in seconds) a table stays valid after being cached. If `None`,
+                tables only leave the cache when evicted.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative.")
+        if ttl_s is not None and ttl_s <= 0:
+            raise ValueError("ttl_s must be positive.")
+
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        # keys can contain anything, so hash them into a safe file name
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{name}{self.SUFFIX}"
+
+    def _remove(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            # another process got to it first
+            pass
+
+    def get(self, key: str) -> Optional["pa.Table"]:
+        """Get the cached table for `key`, or `None` if it is not cached or has expired."""
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        if self.ttl_s is not None and now - stat.st_mtime >= self.ttl_s:
+            self._remove(path)
+            return None
+
+        try:
+            source = pa.memory_map(str(path))
+            table = pa.ipc.open_file(source).read_all()
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowException):
+            # the file is corrupted somehow, so just get rid of it
+            self._remove(path)
+            return None
+
+        # bump the access time for LRU eviction, keeping the write time for the TTL
+        try:
+            os.utime(path, (now, stat.st_mtime))
+        except OSError:
+            pass
+
+        return table
+
+    def put(self, key: str, table: "pa.Table") -> None:
+        """Store `table` in the cache under `key`, evicting old files if needed."""
+        path = self._path(key)
+        if table.nbytes > self.max_bytes:
+            self._remove(path)
+            return
+
+        # write to a temporary file and then move it into place, so that readers never
+        # see a partially written file
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                with pa.ipc.new_file(f, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_name, path)
+        except BaseException:
+            self._remove(Path(tmp_name))
+            raise
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used files until the cache fits in `max_bytes`."""
+        entries: List[Tuple[os.stat_result, Path]] = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                entries.append((path.stat(), path))
+            except FileNotFoundError:
+                pass
+
+        total_bytes = sum(stat.st_size for stat, _ in entries)
+        entries.sort(key=lambda entry: entry[0].st_atime)
+        for stat, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            total_bytes -= stat.st_size
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Remove `key` from the cache. If `key` is `None`, remove everything."""
+        if key is not None:
+            self._remove(self._path(key))
+            return
+
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            self._remove(path)
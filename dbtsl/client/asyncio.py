@@ -1,10 +1,17 @@
+import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Optional, Union
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, List, Optional, Sequence, Union
 
-from typing_extensions import Self
+import pyarrow as pa
+from typing_extensions import Self, Unpack
 
 from dbtsl.api.adbc.client.asyncio import AsyncADBCClient
 from dbtsl.api.graphql.client.asyncio import AsyncGraphQLClient
+from dbtsl.api.shared.query_params import QueryParameters
+from dbtsl.api.shared.singleflight import AsyncSingleFlight
+from dbtsl.backoff import PollingStrategy
+from dbtsl.cache import ResultCache
 from dbtsl.client.base import BaseSemanticLayerClient
 from dbtsl.timeout import TimeoutOptions
 
@@ -28,6 +35,13 @@ class AsyncSemanticLayerClient(BaseSemanticLayerClient[AsyncGraphQLClient, Async
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
     ) -> None:
         """Initialize the Semantic Layer client.
 
@@ -37,6 +51,20 @@ class AsyncSemanticLayerClient(BaseSemanticLayerClient[AsyncGraphQLClient, Async
             host: the Semantic Layer API host
             timeout: `TimeoutOptions` or total timeout for the underlying GraphQL client.
             lazy: if true, nested metadata queries will be need to be explicitly populated on-demand.
+            result_cache: where to cache `query` results. If `None`, results are not cached.
+            metadata_cache_ttl: how long (in seconds) to cache the responses of metadata requests such as
+                `metrics` or `dimensions`. If `None`, metadata is not cached.
+            compact_models: if true, metadata is returned as compact (slotted) models which use less
+                memory. See `dbtsl.models.compact`.
+            precompile_decoders: if true, response decoders are built when a session opens instead of
+                on first use, which makes the first requests faster.
+            response_compression: which compressed encodings to accept for GraphQL responses. If true,
+                accept every encoding that can be decoded with the installed libraries. If false, ask
+                for uncompressed responses.
+            persisted_queries: if true, GraphQL documents are sent as their SHA-256 hash instead of their
+                full text once the server knows them (automatic persisted queries).
+            polling_strategy: how long to wait between the polls of a query run via GraphQL. If `None`,
+                use an exponential backoff. See `dbtsl.backoff`.
         """
         super().__init__(
             environment_id=environment_id,
@@ -46,8 +74,19 @@ class AsyncSemanticLayerClient(BaseSemanticLayerClient[AsyncGraphQLClient, Async
             adbc_factory=AsyncADBCClient,
             timeout=timeout,
             lazy=lazy,
+            result_cache=result_cache,
+            metadata_cache_ttl=metadata_cache_ttl,
+            compact_models=compact_models,
+            precompile_decoders=precompile_decoders,
+            response_compression=response_compression,
+            persisted_queries=persisted_queries,
+            polling_strategy=polling_strategy,
         )
 
+        self._query_flights = AsyncSingleFlight()
+        # Whether queries of the current task should borrow a pooled ADBC connection, see `query_many`
+        self._use_pooled_connection: ContextVar[bool] = ContextVar("dbtsl_use_pooled_connection", default=False)
+
     @asynccontextmanager
     async def session(self) -> AsyncIterator[Self]:
         """Establish a connection with the dbt Semantic Layer's servers."""
@@ -58,3 +97,96 @@ class AsyncSemanticLayerClient(BaseSemanticLayerClient[AsyncGraphQLClient, Async
             self._has_session = True
             yield self
             self._has_session = False
+
+    async def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
+        """Query the Semantic Layer.
+
+        Concurrent calls with equivalent parameters share the same query and its results.
+
+        If the client has a `result_cache`, results are returned from it when possible and stored
+        in it after being fetched. Setting `read_cache=False` skips the lookup and doesn't share the
+        query with other calls, but still stores the fresh results.
+
+        Cache lookups and writes run in the default executor, so that caches which perform I/O don't
+        block the event loop.
+        """
+        api_query = self._get_api_method("query")
+        key = self._query_key(params)
+        cache = self.result_cache
+        loop = asyncio.get_running_loop()
+
+        async def fetch() -> "pa.Table":
+            if not self._use_pooled_connection.get():
+                return await api_query(**params)
+
+            # This runs in the shared call of equivalent queries, so the connection only gets released
+            # once that call is done, even if the caller which started it got cancelled
+            async with self._adbc._pooled_connection():  # pyright: ignore[reportPrivateUsage]
+                return await api_query(**params)
+
+        if not params.get("read_cache", True):
+            table = await fetch()
+            if cache is not None:
+                await loop.run_in_executor(None, cache.put, key, table)
+            return table
+
+        async def run() -> "pa.Table":
+            if cache is not None:
+                cached = await loop.run_in_executor(None, cache.get, key)
+                if cached is not None:
+                    return cached
+
+            table = await fetch()
+            if cache is not None:
+                await loop.run_in_executor(None, cache.put, key, table)
+            return table
+
+        return await self._query_flights.do(key, run)
+
+    async def query_many(
+        self,
+        params: Sequence[QueryParameters],
+        *,
+        max_concurrency: int = BaseSemanticLayerClient.DEFAULT_MAX_QUERY_CONCURRENCY,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """Run many queries concurrently, each in its own task.
+
+        If queries go through ADBC, each running task borrows a pooled connection of its own. The
+        pooled connections stay open until the session closes, so that later calls reuse them.
+
+        Results are returned in the same order as `params`. A query which fails doesn't stop the
+        others, its exception is returned in place of its results instead, unless
+        `return_exceptions` is false.
+
+        Each query goes through `query`, so it uses `result_cache` if there is one, and equivalent
+        queries share their results.
+
+        Args:
+            params: the parameters of each query.
+            max_concurrency: the maximum number of queries to run at the same time.
+            return_exceptions: if true, return the exception raised by a query in place of its
+                results. Otherwise, raise the first exception after all queries are done.
+
+        Returns:
+            The results of each query, in order.
+        """
+        self._query_many_preflight(max_concurrency)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(query_params: QueryParameters) -> "pa.Table":
+            async with semaphore:
+                return await self.query(**query_params)
+
+        # the tasks of `gather` get a copy of the current context, so this only affects them
+        token = self._use_pooled_connection.set(self._query_uses_adbc())
+        try:
+            tasks = [asyncio.ensure_future(run(p)) for p in params]
+        finally:
+            self._use_pooled_connection.reset(token)
+
+        results: List[Any] = await asyncio.gather(*tasks, return_exceptions=True)
+        if not return_exceptions:
+            self._raise_first_error(results)
+        return results
@@ -1,16 +1,21 @@
 # mypy: disable-error-code="misc"
 
 from contextlib import AbstractAsyncContextManager
-from typing import AsyncIterator, List, Optional, Union
+from typing import Any, AsyncIterator, List, Optional, Sequence, Union
 
 import pyarrow as pa
-from typing_extensions import Self, Unpack, overload
+from typing_extensions import Literal, Self, Unpack, overload
 
+from dbtsl.api.graphql.client.base import OperationRequest
 from dbtsl.api.shared.query_params import GroupByParam, OrderByGroupBy, OrderByMetric, QueryParameters
-from dbtsl.models import AsyncMetric, Dimension, Entity, EnvironmentInfo, Measure, SavedQuery
+from dbtsl.backoff import PollingStrategy
+from dbtsl.cache import ResultCache
+from dbtsl.models import AsyncMetric, Dimension, Entity, EnvironmentInfo, Measure, Metric, SavedQuery
 from dbtsl.timeout import TimeoutOptions
 
 class AsyncSemanticLayerClient:
+    result_cache: Optional[ResultCache]
+
     def __init__(
         self,
         environment_id: int,
@@ -19,6 +24,13 @@ class AsyncSemanticLayerClient:
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
     ) -> None: ...
     @property
     def lazy(self) -> bool:
@@ -28,6 +40,24 @@ class AsyncSemanticLayerClient:
     def lazy(self, v: bool) -> None:
         """Set whether metadata queries will be lazy."""
         ...
+    def invalidate_metadata_cache(self) -> None:
+        """Clear all cached metadata, so that the next metadata requests go to the server."""
+        ...
+    async def load_all(
+        self,
+        metrics: Sequence[Metric],
+        fields: Sequence[str] = ("dimensions", "measures", "entities"),
+    ) -> None:
+        """Lazy load `fields` of all `metrics`, in as few requests as possible."""
+        ...
+    async def run_many(
+        self,
+        requests: Sequence[OperationRequest],
+        *,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Run many operations in as few GraphQL requests as possible."""
+        ...
     @overload
     async def compile_sql(
         self,
@@ -89,7 +119,39 @@ class AsyncSemanticLayerClient:
         read_cache: bool = True,
     ) -> "pa.Table": ...
     async def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
-        """Query the Semantic Layer."""
+        """Query the Semantic Layer, going through `result_cache` if there is one."""
+        ...
+
+    @overload
+    def query_batches(
+        self,
+        metrics: List[str],
+        group_by: Optional[List[Union[GroupByParam, str]]] = None,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> AsyncIterator["pa.RecordBatch"]: ...
+    @overload
+    def query_batches(
+        self,
+        group_by: List[Union[GroupByParam, str]],
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> AsyncIterator["pa.RecordBatch"]: ...
+    @overload
+    def query_batches(
+        self,
+        saved_query: str,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> AsyncIterator["pa.RecordBatch"]: ...
+    def query_batches(self, **params: Unpack[QueryParameters]) -> AsyncIterator["pa.RecordBatch"]:
+        """Query the Semantic Layer, yielding the results as record batches while they are streamed."""
         ...
 
     async def metrics(self) -> List[AsyncMetric]:
@@ -116,6 +178,26 @@ class AsyncSemanticLayerClient:
         """Get a list of all available saved queries."""
         ...
 
+    async def metrics_table(self) -> "pa.Table":
+        """Get a table of all available metrics, with one row per metric."""
+        ...
+
+    async def dimensions_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available dimensions for a given set of metrics, with one row per dimension."""
+        ...
+
+    async def measures_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available measures for a given set of metrics, with one row per measure."""
+        ...
+
+    async def entities_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available entities for a given set of metrics, with one row per entity."""
+        ...
+
+    async def saved_queries_table(self) -> "pa.Table":
+        """Get a table of all available saved queries, with one row per saved query."""
+        ...
+
     async def environment_info(self) -> EnvironmentInfo:
         """Get information about the Semantic Layer environment."""
         ...
@@ -123,3 +205,29 @@ class AsyncSemanticLayerClient:
     def session(self) -> AbstractAsyncContextManager[AsyncIterator[Self]]:
         """Establish a connection with the dbt Semantic Layer's servers."""
         ...
+
+    @overload
+    async def query_many(
+        self,
+        params: Sequence[QueryParameters],
+        *,
+        max_concurrency: int = ...,
+        return_exceptions: Literal[True] = True,
+    ) -> List[Union["pa.Table", Exception]]: ...
+    @overload
+    async def query_many(
+        self,
+        params: Sequence[QueryParameters],
+        *,
+        max_concurrency: int = ...,
+        return_exceptions: Literal[False],
+    ) -> List["pa.Table"]: ...
+    async def query_many(
+        self,
+        params: Sequence[QueryParameters],
+        *,
+        max_concurrency: int = ...,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """Run many queries concurrently, returning their results (or exceptions) in order."""
+        ...
@@ -1,9 +1,12 @@
 from abc import ABC
-from typing import Any, Generic, Optional, TypeVar, Union
+from typing import Any, Generic, List, Optional, Sequence, TypeVar, Union
 
 import dbtsl.env as env
 from dbtsl.api.adbc.client.base import ADBCClientFactory, BaseADBCClient
 from dbtsl.api.graphql.client.base import BaseGraphQLClient, GraphQLClientFactory
+from dbtsl.api.shared.query_params import QueryParameters, query_fingerprint, validate_query_parameters
+from dbtsl.backoff import PollingStrategy
+from dbtsl.cache import ResultCache
 from dbtsl.timeout import TimeoutOptions
 
 # TODO: have to type ignore, see: https://github.com/microsoft/pyright/issues/3497
@@ -27,13 +30,24 @@ class BaseSemanticLayerClient(ABC, Generic[TGQLClient, TADBCClient]):
         "environment_info": GRAPHQL,
         "dimension_values": ADBC,
         "dimensions": GRAPHQL,
+        "dimensions_table": GRAPHQL,
         "entities": GRAPHQL,
+        "entities_table": GRAPHQL,
+        "load_all": GRAPHQL,
         "measures": GRAPHQL,
+        "measures_table": GRAPHQL,
         "metrics": GRAPHQL,
+        "metrics_table": GRAPHQL,
         "query": ADBC,
+        "query_batches": ADBC,
+        "query_reader": ADBC,
+        "run_many": GRAPHQL,
         "saved_queries": GRAPHQL,
+        "saved_queries_table": GRAPHQL,
     }
 
+    DEFAULT_MAX_QUERY_CONCURRENCY = 8
+
     def __init__(
         self,
         environment_id: int,
@@ -44,6 +58,13 @@ class BaseSemanticLayerClient(ABC, Generic[TGQLClient, TADBCClient]):
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool,
+        result_cache: Optional[ResultCache] = None,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
     ) -> None:
         """Initialize the Semantic Layer client.
 
@@ -55,8 +76,16 @@ class BaseSemanticLayerClient(ABC, Generic[TGQLClient, TADBCClient]):
             adbc_factory: class of the underlying ADBC client
             timeout: `TimeoutOptions` or total timeout for the underlying GraphQL client.
             lazy: `lazy` for the underlying GraphQL client
+            result_cache: where to cache `query` results. If `None`, results are not cached.
+            metadata_cache_ttl: `metadata_cache_ttl` for the underlying GraphQL client
+            compact_models: `compact_models` for the underlying GraphQL client
+            precompile_decoders: `precompile_decoders` for the underlying GraphQL client
+            response_compression: `response_compression` for the underlying GraphQL client
+            persisted_queries: `persisted_queries` for the underlying GraphQL client
+            polling_strategy: `polling_strategy` for the underlying GraphQL client
         """
         self._has_session = False
+        self.result_cache = result_cache
 
         self._method_map = dict(self.__class__._METHOD_MAP)
 
@@ -67,6 +96,12 @@ class BaseSemanticLayerClient(ABC, Generic[TGQLClient, TADBCClient]):
             url_format=env.GRAPHQL_URL_FORMAT,
             timeout=timeout,
             lazy=lazy,
+            metadata_cache_ttl=metadata_cache_ttl,
+            compact_models=compact_models,
+            precompile_decoders=precompile_decoders,
+            response_compression=response_compression,
+            persisted_queries=persisted_queries,
+            polling_strategy=polling_strategy,
         )
         self._adbc = adbc_factory(
             server_host=host,
@@ -85,6 +120,37 @@ class BaseSemanticLayerClient(ABC, Generic[TGQLClient, TADBCClient]):
         """Set whether metadata queries will be lazy."""
         self._gql.lazy = v
 
+    def invalidate_metadata_cache(self) -> None:
+        """Clear all cached metadata, so that the next metadata requests go to the server."""
+        self._gql.invalidate_metadata_cache()
+
+    def _query_key(self, params: QueryParameters) -> str:
+        """Get the key which identifies a query's results, in `result_cache` and among in-flight queries.
+
+        The key includes the environment ID so that multiple clients can share a cache.
+        """
+        strict_params = validate_query_parameters(params)
+        return f"{self._gql.environment_id}:{query_fingerprint(strict_params)}"
+
+    def _query_uses_adbc(self) -> bool:
+        """Whether `query` goes through ADBC, so that concurrent queries need pooled connections."""
+        return self._method_map.get("query") == ADBC
+
+    def _query_many_preflight(self, max_concurrency: int) -> None:
+        """Check that `query_many` can run, before running any query."""
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        # raises if there is no session
+        self._get_api_method("query")
+
+    @staticmethod
+    def _raise_first_error(results: List[Any]) -> None:
+        """Raise the first exception in a list of results, if any."""
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
     def __getattr__(self, attr: str) -> Any:
         """Get methods from the underlying APIs.
 
@@ -92,6 +158,10 @@ class BaseSemanticLayerClient(ABC, Generic[TGQLClient, TADBCClient]):
 
         If the requested attribute is not a function, raise AttributeError.
         """
+        return self._get_api_method(attr)
+
+    def _get_api_method(self, attr: str) -> Any:
+        """Get a method from the API it is mapped to in `_method_map`."""
         if not self._has_session:
             raise ValueError(f"Cannot perform `{attr}`operation without opening a session first.")
 
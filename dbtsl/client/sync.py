@@ -1,14 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Iterator, Optional, Union
+from typing import Any, ContextManager, Generator, Iterator, List, Optional, Protocol, Sequence, Union, cast
 
-from typing_extensions import Self
+import pyarrow as pa
+from typing_extensions import Self, Unpack
 
 from dbtsl.api.adbc.client.sync import SyncADBCClient
 from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+from dbtsl.api.shared.query_params import QueryParameters
+from dbtsl.api.shared.singleflight import SyncSingleFlight
+from dbtsl.backoff import PollingStrategy
+from dbtsl.cache import ResultCache
 from dbtsl.client.base import BaseSemanticLayerClient
 from dbtsl.timeout import TimeoutOptions
 
 
+class _WorkerSessions(Protocol):
+    """Lets threads of the sync GraphQL client run requests on a session of their own."""
+
+    def _worker_session(self) -> ContextManager[None]: ...
+
+
 class SyncSemanticLayerClient(BaseSemanticLayerClient[SyncGraphQLClient, SyncADBCClient]):  # type: ignore
     """A sync semantic layer client, backed by requests.
 
@@ -28,6 +40,13 @@ class SyncSemanticLayerClient(BaseSemanticLayerClient[SyncGraphQLClient, SyncADB
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         *,
         lazy: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
     ) -> None:
         """Initialize the Semantic Layer client.
 
@@ -37,6 +56,20 @@ class SyncSemanticLayerClient(BaseSemanticLayerClient[SyncGraphQLClient, SyncADB
             host: the Semantic Layer API host
             timeout: `TimeoutOptions` or total timeout for the underlying GraphQL client.
             lazy: if true, nested metadata queries will be need to be explicitly populated on-demand.
+            result_cache: where to cache `query` results. If `None`, results are not cached.
+            metadata_cache_ttl: how long (in seconds) to cache the responses of metadata requests such as
+                `metrics` or `dimensions`. If `None`, metadata is not cached.
+            compact_models: if true, metadata is returned as compact (slotted) models which use less
+                memory. See `dbtsl.models.compact`.
+            precompile_decoders: if true, response decoders are built when a session opens instead of
+                on first use, which makes the first requests faster.
+            response_compression: which compressed encodings to accept for GraphQL responses. If true,
+                accept every encoding that can be decoded with the installed libraries. If false, ask
+                for uncompressed responses.
+            persisted_queries: if true, GraphQL documents are sent as their SHA-256 hash instead of their
+                full text once the server knows them (automatic persisted queries).
+            polling_strategy: how long to wait between the polls of a query run via GraphQL. If `None`,
+                use an exponential backoff. See `dbtsl.backoff`.
         """
         super().__init__(
             environment_id=environment_id,
@@ -46,8 +79,17 @@ class SyncSemanticLayerClient(BaseSemanticLayerClient[SyncGraphQLClient, SyncADB
             adbc_factory=SyncADBCClient,
             timeout=timeout,
             lazy=lazy,
+            result_cache=result_cache,
+            metadata_cache_ttl=metadata_cache_ttl,
+            compact_models=compact_models,
+            precompile_decoders=precompile_decoders,
+            response_compression=response_compression,
+            persisted_queries=persisted_queries,
+            polling_strategy=polling_strategy,
         )
 
+        self._query_flights = SyncSingleFlight()
+
     @contextmanager
     def session(self) -> Iterator[Self]:
         """Establish a connection with the dbt Semantic Layer's servers."""
@@ -58,3 +100,101 @@ class SyncSemanticLayerClient(BaseSemanticLayerClient[SyncGraphQLClient, SyncADB
             self._has_session = True
             yield self
             self._has_session = False
+
+    def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
+        """Query the Semantic Layer.
+
+        Concurrent calls with equivalent parameters share the same query and its results.
+
+        If the client has a `result_cache`, results are returned from it when possible and stored
+        in it after being fetched. Setting `read_cache=False` skips the lookup and doesn't share the
+        query with other calls, but still stores the fresh results.
+        """
+        api_query = self._get_api_method("query")
+        key = self._query_key(params)
+        cache = self.result_cache
+
+        if not params.get("read_cache", True):
+            table = api_query(**params)
+            if cache is not None:
+                cache.put(key, table)
+            return table
+
+        def run() -> "pa.Table":
+            if cache is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
+
+            table = api_query(**params)
+            if cache is not None:
+                cache.put(key, table)
+            return table
+
+        return self._query_flights.do(key, run)
+
+    @contextmanager
+    def _query_many_connection(self, uses_adbc: bool) -> Generator[None, None, None]:
+        """Run the queries of the current thread on a pooled connection of its own, until the context exits.
+
+        Threads which share a connection would take turns using it, so each `query_many` thread
+        borrows one, from the ADBC client or the GraphQL client depending on where queries go.
+        """
+        if uses_adbc:
+            with self._adbc._pooled_connection():  # pyright: ignore[reportPrivateUsage]
+                yield
+        else:
+            # the GraphQL client stubs don't expose its worker sessions
+            gql = cast(_WorkerSessions, self._gql)
+            with gql._worker_session():  # pyright: ignore[reportPrivateUsage]
+                yield
+
+    def query_many(
+        self,
+        params: Sequence[QueryParameters],
+        *,
+        max_concurrency: int = BaseSemanticLayerClient.DEFAULT_MAX_QUERY_CONCURRENCY,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """Run many queries concurrently, in a pool of threads.
+
+        If queries go through ADBC, each thread runs them on a pooled connection of its own. The
+        pooled connections stay open until the session closes, so that later calls reuse them.
+
+        Results are returned in the same order as `params`. A query which fails doesn't stop the
+        others, its exception is returned in place of its results instead, unless
+        `return_exceptions` is false.
+
+        Each query goes through `query`, so it uses `result_cache` if there is one, and equivalent
+        queries share their results.
+
+        Args:
+            params: the parameters of each query.
+            max_concurrency: the maximum number of queries to run at the same time.
+            return_exceptions: if true, return the exception raised by a query in place of its
+                results. Otherwise, raise the first exception after all queries are done.
+
+        Returns:
+            The results of each query, in order.
+        """
+        self._query_many_preflight(max_concurrency)
+        if len(params) == 0:
+            return []
+
+        uses_adbc = self._query_uses_adbc()
+
+        def run(query_params: QueryParameters) -> Any:
+            try:
+                with self._query_many_connection(uses_adbc):
+                    return self.query(**query_params)
+            except Exception as err:
+                return err
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(params)), thread_name_prefix="dbtsl-query"
+        ) as pool:
+            results = list(pool.map(run, params))
+
+        if not return_exceptions:
+            self._raise_first_error(results)
+        return results
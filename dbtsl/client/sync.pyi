@@ -1,16 +1,21 @@
 # mypy: disable-error-code="misc"
 
 from contextlib import AbstractContextManager
-from typing import Iterator, List, Optional, Union
+from typing import Any, Iterator, List, Optional, Sequence, Union
 
 import pyarrow as pa
-from typing_extensions import Self, Unpack, overload
+from typing_extensions import Literal, Self, Unpack, overload
 
+from dbtsl.api.graphql.client.base import OperationRequest
 from dbtsl.api.shared.query_params import GroupByParam, OrderByGroupBy, OrderByMetric, QueryParameters
-from dbtsl.models import Dimension, Entity, EnvironmentInfo, Measure, SavedQuery, SyncMetric
+from dbtsl.backoff import PollingStrategy
+from dbtsl.cache import ResultCache
+from dbtsl.models import Dimension, Entity, EnvironmentInfo, Measure, Metric, SavedQuery, SyncMetric
 from dbtsl.timeout import TimeoutOptions
 
 class SyncSemanticLayerClient:
+    result_cache: Optional[ResultCache]
+
     def __init__(
         self,
         environment_id: int,
@@ -18,6 +23,13 @@ class SyncSemanticLayerClient:
         host: str,
         timeout: Optional[Union[TimeoutOptions, float, int]] = None,
         lazy: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        metadata_cache_ttl: Optional[float] = None,
+        compact_models: bool = False,
+        precompile_decoders: bool = False,
+        response_compression: Union[bool, Sequence[str]] = True,
+        persisted_queries: bool = False,
+        polling_strategy: Optional[PollingStrategy] = None,
     ) -> None: ...
     @property
     def lazy(self) -> bool:
@@ -27,6 +39,24 @@ class SyncSemanticLayerClient:
     def lazy(self, v: bool) -> None:
         """Set whether metadata queries will be lazy."""
         ...
+    def invalidate_metadata_cache(self) -> None:
+        """Clear all cached metadata, so that the next metadata requests go to the server."""
+        ...
+    def load_all(
+        self,
+        metrics: Sequence[Metric],
+        fields: Sequence[str] = ("dimensions", "measures", "entities"),
+    ) -> None:
+        """Lazy load `fields` of all `metrics`, in as few requests as possible."""
+        ...
+    def run_many(
+        self,
+        requests: Sequence[OperationRequest],
+        *,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Run many operations in as few GraphQL requests as possible."""
+        ...
     @overload
     def compile_sql(
         self,
@@ -88,7 +118,71 @@ class SyncSemanticLayerClient:
         read_cache: bool = True,
     ) -> "pa.Table": ...
     async def query(self, **params: Unpack[QueryParameters]) -> "pa.Table":
-        """Query the Semantic Layer."""
+        """Query the Semantic Layer, going through `result_cache` if there is one."""
+        ...
+
+    @overload
+    def query_batches(
+        self,
+        metrics: List[str],
+        group_by: Optional[List[Union[GroupByParam, str]]] = None,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> Iterator["pa.RecordBatch"]: ...
+    @overload
+    def query_batches(
+        self,
+        group_by: List[Union[GroupByParam, str]],
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> Iterator["pa.RecordBatch"]: ...
+    @overload
+    def query_batches(
+        self,
+        saved_query: str,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> Iterator["pa.RecordBatch"]: ...
+    def query_batches(self, **params: Unpack[QueryParameters]) -> Iterator["pa.RecordBatch"]:
+        """Query the Semantic Layer, yielding the results as record batches while they are streamed."""
+        ...
+
+    @overload
+    def query_reader(
+        self,
+        metrics: List[str],
+        group_by: Optional[List[Union[GroupByParam, str]]] = None,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> "pa.RecordBatchReader": ...
+    @overload
+    def query_reader(
+        self,
+        group_by: List[Union[GroupByParam, str]],
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[str, OrderByGroupBy]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> "pa.RecordBatchReader": ...
+    @overload
+    def query_reader(
+        self,
+        saved_query: str,
+        limit: Optional[int] = None,
+        order_by: Optional[List[Union[OrderByGroupBy, OrderByMetric]]] = None,
+        where: Optional[List[str]] = None,
+        read_cache: bool = True,
+    ) -> "pa.RecordBatchReader": ...
+    def query_reader(self, **params: Unpack[QueryParameters]) -> "pa.RecordBatchReader":
+        """Query the Semantic Layer, returning a reader that streams the results as record batches."""
         ...
 
     def metrics(self) -> List[SyncMetric]:
@@ -115,6 +209,26 @@ class SyncSemanticLayerClient:
         """Get a list of all available saved queries."""
         ...
 
+    def metrics_table(self) -> "pa.Table":
+        """Get a table of all available metrics, with one row per metric."""
+        ...
+
+    def dimensions_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available dimensions for a given set of metrics, with one row per dimension."""
+        ...
+
+    def measures_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available measures for a given set of metrics, with one row per measure."""
+        ...
+
+    def entities_table(self, metrics: List[str]) -> "pa.Table":
+        """Get a table of all available entities for a given set of metrics, with one row per entity."""
+        ...
+
+    def saved_queries_table(self) -> "pa.Table":
+        """Get a table of all available saved queries, with one row per saved query."""
+        ...
+
     def environment_info(self) -> EnvironmentInfo:
         """Get information about the Semantic Layer environment."""
         ...
@@ -122,3 +236,29 @@ class SyncSemanticLayerClient:
     def session(self) -> AbstractContextManager[Iterator[Self]]:
         """Establish a connection with the dbt Semantic Layer's servers."""
         ...
+
+    @overload
+    def query_many(
+        self,
+        params: Sequence[QueryParameters],
+        *,
+        max_concurrency: int = ...,
+        return_exceptions: Literal[True] = True,
+    ) -> List[Union["pa.Table", Exception]]: ...
+    @overload
+    def query_many(
+        self,
+        params: Sequence[QueryParameters],
+        *,
+        max_concurrency: int = ...,
+        return_exceptions: Literal[False],
+    ) -> List["pa.Table"]: ...
+    def query_many(
+        self,
+        params: Sequence[QueryParameters],
+        *,
+        max_concurrency: int = ...,
+        return_exceptions: bool = True,
+    ) -> List[Any]:
+        """Run many queries concurrently, returning their results (or exceptions) in order."""
+        ...
@@ -10,7 +10,7 @@ from .entity import Entity, EntityType
 from .environment import EnvironmentInfo, SqlDialect, SqlEngine
 from .measure import AggregationType, Measure
 from .metric import AsyncMetric, Metric, MetricType, SyncMetric
-from .query import QueryResult
+from .query import QueryResult, QueryStatusResult
 from .saved_query import (
     Export,
     ExportConfig,
@@ -44,6 +44,7 @@ __all__ = [
     "Measure",
     "Metric",
     "MetricType",
+    "QueryStatusResult",
     "SavedQuery",
     "SavedQuery",
     "SavedQueryGroupByParam",
@@ -0,0 +1,91 @@
+"""Decode raw GraphQL responses into Arrow tables, without instantiating models.
+
+The schema of each table is derived from the model's fields. Nested models become struct
+columns, lists become list columns and enums become string columns.
+"""
+
+import inspect
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, cast
+from typing import get_args as get_type_args
+from typing import get_origin as get_type_origin
+
+import pyarrow as pa
+
+from dbtsl.models.base import BaseModel, snake_case_to_camel_case
+
+_PRIMITIVE_TYPES: Dict[Type[Any], pa.DataType] = {
+    str: pa.string(),
+    bool: pa.bool_(),
+    int: pa.int64(),
+    float: pa.float64(),
+}
+
+
+def _arrow_type(field_type: Any, *, camel_case: bool) -> pa.DataType:
+    """Get the Arrow type of a model field type."""
+    if inspect.isclass(field_type):
+        if issubclass(field_type, BaseModel):
+            return model_arrow_type(field_type, camel_case=camel_case)
+        if issubclass(field_type, Enum):
+            return pa.string()
+        for primitive, arrow_type in _PRIMITIVE_TYPES.items():
+            if issubclass(field_type, primitive):
+                return arrow_type
+
+    type_origin = get_type_origin(field_type)
+    if type_origin is list:
+        return pa.list_(_arrow_type(get_type_args(field_type)[0], camel_case=camel_case))
+    if type_origin is Union:
+        # Optional[X] is just a nullable X
+        args = [arg for arg in get_type_args(field_type) if arg is not type(None)]
+        if len(args) == 1:
+            return _arrow_type(args[0], camel_case=camel_case)
+
+    raise TypeError(f"Can't represent type {field_type} in Arrow.")
+
+
+# Mapping of (model, camel_case) to the Arrow type which represents the model
+_model_arrow_types: Dict[Tuple[Type[BaseModel], bool], pa.StructType] = {}
+
+
+def model_arrow_type(model: Type[BaseModel], *, camel_case: bool = False) -> pa.StructType:
+    """Get the Arrow struct type which represents a model.
+
+    Arguments:
+        model: the model class
+        camel_case: whether to name fields in camelCase like in GraphQL responses, instead of
+            in snake_case like the model fields.
+    """
+    arrow_type: Optional[pa.StructType] = _model_arrow_types.get((model, camel_case))
+    if arrow_type is None:
+        arrow_type = _make_model_arrow_type(model, camel_case=camel_case)
+        _model_arrow_types[(model, camel_case)] = arrow_type
+    return arrow_type
+
+
+def _make_model_arrow_type(model: Type[BaseModel], *, camel_case: bool) -> pa.StructType:
+    assert is_dataclass(model), "Only dataclass models can be represented in Arrow"
+
+    return pa.struct(
+        [
+            pa.field(
+                snake_case_to_camel_case(field.name) if camel_case else field.name,
+                _arrow_type(field.type, camel_case=camel_case),
+            )
+            for field in fields(model)
+        ]
+    )
+
+
+def decode_to_table(data: List[Dict[str, Any]], model: Type[BaseModel]) -> "pa.Table":
+    """Decode a raw GraphQL list of models into a table, with one row per model.
+
+    Fields which are missing from the response, like lazy fields that were not requested,
+    are null.
+    """
+    rows = cast(pa.StructArray, pa.array(data, type=model_arrow_type(model, camel_case=True)))  # pyright: ignore[reportUnknownMemberType]
+    # The camelCase and snake_case types only differ in field names, so this is zero-copy
+    rows = cast(pa.StructArray, rows.view(model_arrow_type(model, camel_case=False)))
+    return pa.Table.from_batches([pa.RecordBatch.from_struct_array(rows)])
@@ -7,8 +7,8 @@ from dataclasses import dataclass, fields, is_dataclass
 from dataclasses import field as dc_field
 from enum import EnumMeta
 from functools import cache
-from types import MappingProxyType
-from typing import Any, ClassVar, Dict, List, Optional, Set, Tuple, Type, Union
+from types import MappingProxyType, MemberDescriptorType
+from typing import Any, ClassVar, Dict, List, Optional, Set, Tuple, Type, TypeVar, Union
 from typing import get_args as get_type_args
 from typing import get_origin as get_type_origin
 
@@ -63,12 +63,59 @@ class FlexibleEnumMeta(EnumMeta):
         return cls.UNKNOWN
 
 
+class _DeprecatedField:
+    """A data descriptor that warns whenever a deprecated dataclass field gets read.
+
+    The value is still stored in the instance `__dict__` under the field's own name, but
+    since this is a data descriptor, it takes precedence over the instance attribute.
+    For slotted classes, the value is stored in the field's slot instead.
+    """
+
+    def __init__(self, name: str, reason: str, slot: Optional[MemberDescriptorType] = None) -> None:
+        self.name = name
+        self.reason = reason
+        self.slot = slot
+
+    def __get__(self, instance: Optional[object], owner: Optional[Type[object]] = None) -> Any:
+        if instance is None:
+            return self
+
+        warnings.warn(self.reason, DeprecationWarning, stacklevel=2)
+        if self.slot is not None:
+            return self.slot.__get__(instance, owner)
+
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, instance: object, value: Any) -> None:
+        if self.slot is not None:
+            self.slot.__set__(instance, value)
+            return
+
+        instance.__dict__[self.name] = value
+
+    def __delete__(self, instance: object) -> None:
+        if self.slot is not None:
+            self.slot.__delete__(instance)
+            return
+
+        try:
+            del instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+
 class BaseModel(DataClassDictMixin):
     """Base class for all serializable models.
 
     Adds some functionality like automatically creating camelCase aliases.
     """
 
+    # Allow subclasses to be slotted, see `compact_model`
+    __slots__ = ()
+
     DEPRECATED: ClassVar[str] = "dbtsl_deprecated"
 
     # Mapping of "subclass.field" to "deprecation reason"
@@ -78,13 +125,6 @@ class BaseModel(DataClassDictMixin):
     def _get_deprecation_key(class_name: str, field_name: str) -> str:
         return f"{class_name}.{field_name}"
 
-    @classmethod
-    def _warn_if_deprecated(cls, field_name: str) -> None:
-        key = BaseModel._get_deprecation_key(cls.__name__, field_name)
-        reason = BaseModel._deprecated_fields.get(key)
-        if reason is not None:
-            warnings.warn(reason, DeprecationWarning)
-
     class Config(BaseConfig):  # noqa: D106
         lazy_compilation = True
 
@@ -95,27 +135,35 @@ class BaseModel(DataClassDictMixin):
         This will:
         - Apply camelCase aliases
         - Pre-populate the _deprecated_fields dict with the deprecated fields
+        - Install a descriptor on each deprecated field which warns when it gets read
+
+        Only deprecated fields pay for the warning, so reading any other field is as fast
+        as reading a plain dataclass attribute.
         """
         for subclass in cls.__subclasses__():
-            assert is_dataclass(subclass), "Subclass of BaseModel must be dataclass"
-
-            for field in fields(subclass):
-                camel_name = snake_case_to_camel_case(field.name)
-                if field.name != camel_name:
-                    opts = {**field_options(alias=camel_name), **field.metadata}
-                    field.metadata = MappingProxyType(opts)
-
-                if cls.DEPRECATED in field.metadata:
-                    reason = field.metadata[cls.DEPRECATED]
-                    key = BaseModel._get_deprecation_key(subclass.__name__, field.name)
-                    cls._deprecated_fields[key] = reason
+            BaseModel._register_model(subclass)
 
-    def __getattribute__(self, name: str) -> Any:  # noqa: D105
-        v = object.__getattribute__(self, name)
-        if not name.startswith("__") and not callable(v):
-            self._warn_if_deprecated(name)
-
-        return v
+    @staticmethod
+    def _register_model(subclass: Type["BaseModel"]) -> None:
+        """Process the fields of a single subclass. See `_register_subclasses`."""
+        assert is_dataclass(subclass), "Subclass of BaseModel must be dataclass"
+
+        for field in fields(subclass):
+            camel_name = snake_case_to_camel_case(field.name)
+            if field.name != camel_name:
+                opts = {**field_options(alias=camel_name), **field.metadata}
+                field.metadata = MappingProxyType(opts)
+
+            if BaseModel.DEPRECATED in field.metadata:
+                reason = field.metadata[BaseModel.DEPRECATED]
+                key = BaseModel._get_deprecation_key(subclass.__name__, field.name)
+                BaseModel._deprecated_fields[key] = reason
+
+                current = subclass.__dict__.get(field.name)
+                if isinstance(current, _DeprecatedField):
+                    continue
+                slot = current if isinstance(current, MemberDescriptorType) else None
+                setattr(subclass, field.name, _DeprecatedField(field.name, reason, slot))
 
 
 class DeprecatedMixin:
@@ -143,6 +191,9 @@ class GraphQLFragment:
 class GraphQLFragmentMixin:
     """Add this to any model that needs to be fetched from GraphQL."""
 
+    # Allow subclasses to be slotted, see `compact_model`
+    __slots__ = ("_client_unchecked",)
+
     # mark fields that should not be lazy with this
     NOT_LAZY: ClassVar[str] = "dbtsl_notlazy"
 
@@ -196,26 +247,31 @@ class GraphQLFragmentMixin:
         This will populate the _lazy_loadable_fields set for each subclass
         """
         for subclass in cls.__subclasses__():
-            subclass._lazy_loadable_fields = set()
-            assert is_dataclass(subclass)
-            for field in fields(subclass):
-                if GraphQLFragmentMixin.NOT_LAZY in field.metadata:
-                    continue
-
-                type_origin = get_type_origin(field.type)
-                if type_origin is None:
-                    continue
-                # We know it's a List[...], Union[...] or Optional[...]
-
-                inner_type = get_type_args(field.type)[0]
-                if inspect.isclass(inner_type) and issubclass(inner_type, GraphQLFragmentMixin):
-                    # We know it's either:
-                    # - List[GraphQLFragmentMixin]
-                    # - Union[GraphQLFragmentMixin]
-                    # - Optional[GraphQLFragmentMixin]
-                    subclass._lazy_loadable_fields.add(field.name)
+            GraphQLFragmentMixin._register_fragment(subclass)
 
-                setattr(subclass, f"load_{field.name}", GraphQLFragmentMixin._make_field_loader(field.name))
+    @staticmethod
+    def _register_fragment(subclass: Type["GraphQLFragmentMixin"]) -> None:
+        """Process the fields of a single subclass. See `_register_subclasses`."""
+        subclass._lazy_loadable_fields = set()
+        assert is_dataclass(subclass)
+        for field in fields(subclass):
+            if GraphQLFragmentMixin.NOT_LAZY in field.metadata:
+                continue
+
+            type_origin = get_type_origin(field.type)
+            if type_origin is None:
+                continue
+            # We know it's a List[...], Union[...] or Optional[...]
+
+            inner_type = get_type_args(field.type)[0]
+            if inspect.isclass(inner_type) and issubclass(inner_type, GraphQLFragmentMixin):
+                # We know it's either:
+                # - List[GraphQLFragmentMixin]
+                # - Union[GraphQLFragmentMixin]
+                # - Optional[GraphQLFragmentMixin]
+                subclass._lazy_loadable_fields.add(field.name)
+
+            setattr(subclass, f"load_{field.name}", GraphQLFragmentMixin._make_field_loader(field.name))
 
     @classmethod
     def gql_model_name(cls) -> str:
@@ -308,3 +364,116 @@ class GraphQLFragmentMixin:
 
 
 NOT_LAZY_META = {GraphQLFragmentMixin.NOT_LAZY: True}
+
+
+TModel = TypeVar("TModel", bound=BaseModel)
+
+# Attributes which can't be copied over from a class to its compact variant, since `dataclass`
+# and mashumaro need to generate them again for the new class
+_UNSLOTTED_ATTRS = {"__dict__", "__weakref__"}
+_MASHUMARO_ATTRS = {"from_dict", "to_dict"}
+_DATACLASS_ATTRS = {
+    "__dataclass_params__",
+    "__dataclass_fields__",
+    "__init__",
+    "__repr__",
+    "__eq__",
+    "__hash__",
+    "__match_args__",
+}
+
+
+# Mapping of model to its compact variant
+_compact_models: Dict[Type[Any], Type[Any]] = {}
+
+
+def _copy_namespace(cls: Type[Any], exclude: Set[str]) -> Dict[str, Any]:
+    """Copy the namespace of a class, except for the `exclude` names and mashumaro internals."""
+    return {
+        name: value
+        for name, value in cls.__dict__.items()
+        if name not in exclude and name not in _MASHUMARO_ATTRS and not name.startswith("__mashumaro")
+    }
+
+
+def _compact_type(type: Any) -> Any:
+    """Replace every model in a field type by its compact variant."""
+    if inspect.isclass(type) and issubclass(type, BaseModel):
+        return compact_model(type)
+
+    type_origin = get_type_origin(type)
+    if type_origin is list:
+        item_type: Any = _compact_type(get_type_args(type)[0])
+        return List[item_type]
+    if type_origin is Union:
+        return Union[tuple(_compact_type(arg) for arg in get_type_args(type))]
+
+    return type
+
+
+def compact_model(model: Type[TModel]) -> Type[TModel]:
+    """Get the compact variant of a model.
+
+    The compact variant is a slotted copy of the model, with the same fields and methods. It doesn't
+    carry a `__dict__`, which makes each object smaller and attribute access faster. Nested models
+    are compact as well.
+
+    Since it is a copy and not a subclass, `isinstance` checks against the original model don't hold
+    for compact objects, and compact objects don't support setting attributes which are not fields.
+    """
+    compact: Optional[Type[TModel]] = _compact_models.get(model)
+    if compact is None:
+        compact = _make_compact_model(model)
+        _compact_models[model] = compact
+    return compact
+
+
+def _make_compact_model(model: Type[TModel]) -> Type[TModel]:
+    assert is_dataclass(model), "Only dataclass models can be made compact"
+    assert "__slots__" not in model.__dict__, "Model is already slotted"
+
+    name = f"Compact{model.__name__}"
+    model_fields = fields(model)
+    field_names = {field.name for field in model_fields}
+
+    namespace = _copy_namespace(model, _UNSLOTTED_ATTRS | _DATACLASS_ATTRS | field_names)
+    namespace["__qualname__"] = name
+    namespace["__module__"] = "dbtsl.models.compact"
+    namespace["__annotations__"] = {field.name: _compact_type(field.type) for field in model_fields}
+    for field in model_fields:
+        namespace[field.name] = dc_field(
+            default=field.default,
+            default_factory=field.default_factory,
+            init=field.init,
+            repr=field.repr,
+            hash=field.hash,
+            compare=field.compare,
+            metadata=field.metadata,
+        )
+
+    slots = tuple(field.name for field in model_fields)
+    if issubclass(model, GraphQLFragmentMixin):
+        # compact models represent the same GraphQL type as the original
+        gql_model_name = model.gql_model_name()
+        namespace["gql_model_name"] = classmethod(lambda _cls: gql_model_name)
+
+    params: Any = getattr(model, "__dataclass_params__")
+    metaclass: Any = type(model)
+    unslotted = dataclass(
+        eq=params.eq,
+        order=params.order,
+        frozen=params.frozen,
+        unsafe_hash=params.unsafe_hash,
+    )(metaclass(name, model.__bases__, namespace))
+
+    # This is what `dataclass(slots=True)` does, but that is not available in Python 3.9. The class
+    # needs to be recreated with `__slots__`, otherwise field defaults would conflict with them.
+    slotted_namespace = _copy_namespace(unslotted, _UNSLOTTED_ATTRS | field_names)
+    slotted_namespace["__slots__"] = slots
+    compact: Type[TModel] = metaclass(name, model.__bases__, slotted_namespace)
+
+    BaseModel._register_model(compact)  # pyright: ignore[reportPrivateUsage]
+    if issubclass(model, GraphQLFragmentMixin):
+        GraphQLFragmentMixin._register_fragment(compact)  # pyright: ignore[reportPrivateUsage, reportArgumentType]
+
+    return compact
@@ -0,0 +1,50 @@
+"""Compact variants of the metadata models.
+
+These have the same fields and methods as the regular models, but they are slotted, which means
+they use less memory and have faster attribute access. This makes a difference for large
+projects with tens of thousands of dimensions.
+
+They are returned by clients initialized with `compact_models=True`. See `compact_model` for
+how they differ from the regular models.
+"""
+
+from dbtsl.models.base import compact_model
+from dbtsl.models.dimension import Dimension
+from dbtsl.models.entity import Entity
+from dbtsl.models.measure import Measure
+from dbtsl.models.metric import Metric
+from dbtsl.models.saved_query import (
+    Export,
+    ExportConfig,
+    SavedQuery,
+    SavedQueryGroupByParam,
+    SavedQueryMetricParam,
+    SavedQueryQueryParams,
+    SavedQueryWhereParam,
+)
+
+CompactDimension = compact_model(Dimension)
+CompactEntity = compact_model(Entity)
+CompactMeasure = compact_model(Measure)
+CompactMetric = compact_model(Metric)
+CompactExportConfig = compact_model(ExportConfig)
+CompactExport = compact_model(Export)
+CompactSavedQueryMetricParam = compact_model(SavedQueryMetricParam)
+CompactSavedQueryGroupByParam = compact_model(SavedQueryGroupByParam)
+CompactSavedQueryWhereParam = compact_model(SavedQueryWhereParam)
+CompactSavedQueryQueryParams = compact_model(SavedQueryQueryParams)
+CompactSavedQuery = compact_model(SavedQuery)
+
+__all__ = [
+    "CompactDimension",
+    "CompactEntity",
+    "CompactExport",
+    "CompactExportConfig",
+    "CompactMeasure",
+    "CompactMetric",
+    "CompactSavedQuery",
+    "CompactSavedQueryGroupByParam",
+    "CompactSavedQueryMetricParam",
+    "CompactSavedQueryQueryParams",
+    "CompactSavedQueryWhereParam",
+]
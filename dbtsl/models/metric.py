@@ -1,7 +1,7 @@
 from abc import ABC
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Awaitable, List, Optional, Union
+from typing import TYPE_CHECKING, Awaitable, List, Optional, Protocol, Type, TypeVar, Union, cast
 
 from dbtsl.models.base import NOT_LAZY_META as NOT_LAZY
 from dbtsl.models.base import BaseModel, FlexibleEnumMeta, GraphQLFragmentMixin
@@ -10,6 +10,23 @@ from dbtsl.models.entity import Entity
 from dbtsl.models.measure import Measure
 from dbtsl.models.time import TimeGranularity
 
+if TYPE_CHECKING:
+    from dbtsl.api.graphql.protocol import GraphQLProtocol, ListEntitiesOperationVariables, ProtocolOperation
+
+TLoadResponse = TypeVar("TLoadResponse")
+
+
+class _FieldLoader(Protocol):
+    """What metrics need from their client to lazy load their fields."""
+
+    PROTOCOL: Type["GraphQLProtocol"]
+
+    def _load(
+        self,
+        op: "ProtocolOperation[ListEntitiesOperationVariables, TLoadResponse]",
+        raw_variables: "ListEntitiesOperationVariables",
+    ) -> Union[TLoadResponse, Awaitable[TLoadResponse]]: ...
+
 
 class MetricType(Enum, metaclass=FlexibleEnumMeta):
     """The type of a Metric."""
@@ -48,14 +65,22 @@ class Metric(BaseModel, GraphQLFragmentMixin):
     measures: List[Measure] = field(default_factory=list)
     entities: List[Entity] = field(default_factory=list)
 
+    def _load_variables(self) -> "ListEntitiesOperationVariables":
+        return {"metrics": [self.name]}
+
+    @property
+    def _loader(self) -> _FieldLoader:
+        # the client stubs don't expose `_load`, since it's an implementation detail of lazy loading
+        return cast(_FieldLoader, self._client)
+
     def _load_dimensions(self) -> Union[List[Dimension], Awaitable[List[Dimension]]]:
-        return self._client.dimensions(metrics=[self.name])
+        return self._loader._load(op=self._loader.PROTOCOL.dimensions, raw_variables=self._load_variables())  # pyright: ignore[reportPrivateUsage]
 
     def _load_measures(self) -> Union[List[Measure], Awaitable[List[Measure]]]:
-        return self._client.measures(metrics=[self.name])
+        return self._loader._load(op=self._loader.PROTOCOL.measures, raw_variables=self._load_variables())  # pyright: ignore[reportPrivateUsage]
 
     def _load_entities(self) -> Union[List[Entity], Awaitable[List[Entity]]]:
-        return self._client.entities(metrics=[self.name])
+        return self._loader._load(op=self._loader.PROTOCOL.entities, raw_variables=self._load_variables())  # pyright: ignore[reportPrivateUsage]
 
 
 class SyncMetric(Metric, ABC):
@@ -1,4 +1,5 @@
 import base64
+import binascii
 from dataclasses import dataclass
 from enum import Enum
 from functools import cached_property
@@ -10,6 +11,36 @@ from dbtsl.models.base import BaseModel, FlexibleEnumMeta, GraphQLFragmentMixin
 
 QueryId = NewType("QueryId", str)
 
+# How many base64 characters to decode at a time. Must be a multiple of 4.
+_BASE64_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _decode_base64(encoded: str) -> bytearray:
+    """Decode a base64 string into a single buffer, without intermediate copies of the whole payload.
+
+    `base64.b64decode` would first copy the whole string into ASCII bytes and then decode that into yet
+    another bytes object. Instead, we allocate the output buffer upfront and decode into it one chunk
+    at a time, so the only extra memory needed is a single chunk.
+    """
+    padding = encoded[-2:].count("=")
+    decoded = bytearray(len(encoded) // 4 * 3 - padding)
+    view = memoryview(decoded)
+
+    pos = 0
+    try:
+        for start in range(0, len(encoded), _BASE64_CHUNK_SIZE):
+            chunk = binascii.a2b_base64(encoded[start : start + _BASE64_CHUNK_SIZE])
+            view[pos : pos + len(chunk)] = chunk
+            pos += len(chunk)
+    except (binascii.Error, ValueError):
+        pos = -1
+
+    if pos != len(decoded):
+        # not canonical base64 (i.e it has line breaks), let the stdlib deal with it
+        return bytearray(base64.b64decode(encoded))
+
+    return decoded
+
 
 class QueryStatus(Enum, metaclass=FlexibleEnumMeta):
     """All the possible states of a query."""
@@ -22,6 +53,21 @@ class QueryStatus(Enum, metaclass=FlexibleEnumMeta):
     FAILED = "FAILED"
 
 
+@dataclass
+class QueryStatusResult(BaseModel, GraphQLFragmentMixin):
+    """The status of a query, without its SQL or results."""
+
+    @classmethod
+    def gql_model_name(cls) -> str:  # noqa: D102
+        # only some of the fields of `QueryResult` in the schema
+        return "QueryResult"
+
+    query_id: QueryId
+    status: QueryStatus
+    error: Optional[str]
+    total_pages: Optional[int]
+
+
 @dataclass
 class QueryResult(BaseModel, GraphQLFragmentMixin):
     """A query result containing its status, SQL and error/results."""
@@ -35,12 +81,19 @@ class QueryResult(BaseModel, GraphQLFragmentMixin):
 
     @cached_property
     def result_table(self) -> pa.Table:
-        """Get the resulting pyarrow Table parsed from arrow_result."""
+        """Get the resulting pyarrow Table parsed from arrow_result.
+
+        The table's memory is the decoded buffer itself, so no copies are made after base64
+        decoding. Once decoded, `arrow_result` is set to `None` so that the base64 payload
+        doesn't stay in memory alongside the table.
+        """
         if self.status != QueryStatus.SUCCESSFUL or self.arrow_result is None:
             raise ValueError("Cannot get dataframe from query if it's not SUCCESSFUL.")
 
-        decoded = base64.b64decode(self.arrow_result)
-        with pa.ipc.open_stream(decoded) as stream:
+        buffer = pa.py_buffer(_decode_base64(self.arrow_result))
+        self.arrow_result = None
+
+        with pa.ipc.open_stream(buffer) as stream:
             table = pa.Table.from_batches(stream, stream.schema)
 
         return table
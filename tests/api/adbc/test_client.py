@@ -0,0 +1,161 @@
+import asyncio
+import gc
+import threading
+from typing import Any, List
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+from pytest_mock import MockerFixture
+
+from dbtsl.api.adbc.client.asyncio import AsyncADBCClient
+from dbtsl.api.adbc.client.sync import SyncADBCClient
+
+TABLE = pa.Table.from_batches(
+    [
+        pa.RecordBatch.from_arrays([pa.array([1, 2])], names=["a"]),
+        pa.RecordBatch.from_arrays([pa.array([3])], names=["a"]),
+        pa.RecordBatch.from_arrays([pa.array([4, 5, 6])], names=["a"]),
+    ]
+)
+
+
+def mock_connection(mocker: MockerFixture) -> MagicMock:
+    """Get a mocked ADBC connection whose cursors return TABLE."""
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.fetch_record_batch.side_effect = lambda: pa.RecordBatchReader.from_batches(TABLE.schema, TABLE.to_batches())
+    cursor.fetch_arrow_table.return_value = TABLE
+
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    return conn
+
+
+def test_sync_query_reader(mocker: MockerFixture) -> None:
+    client = SyncADBCClient(server_host="test", environment_id=0, auth_token="test")
+    conn = mock_connection(mocker)
+    client._conn_unsafe = conn
+
+    reader = client.query_reader(metrics=["m"])
+    assert isinstance(reader, pa.RecordBatchReader)
+    assert reader.schema.equals(TABLE.schema)
+
+    cursor = conn.cursor.return_value
+    cursor.execute.assert_called_once()
+    cursor.fetch_arrow_table.assert_not_called()
+    cursor.close.assert_not_called()
+
+    assert reader.read_all().equals(TABLE)
+    cursor.close.assert_called_once()
+
+
+def test_sync_query_reader_closes_cursor_when_dropped(mocker: MockerFixture) -> None:
+    """Test that the cursor of a reader which never got read is closed when the reader is garbage collected."""
+    client = SyncADBCClient(server_host="test", environment_id=0, auth_token="test")
+    conn = mock_connection(mocker)
+    client._conn_unsafe = conn
+
+    reader = client.query_reader(metrics=["m"])
+    cursor = conn.cursor.return_value
+    cursor.close.assert_not_called()
+
+    del reader
+    gc.collect()
+    cursor.close.assert_called_once()
+
+
+def test_sync_query_batches(mocker: MockerFixture) -> None:
+    client = SyncADBCClient(server_host="test", environment_id=0, auth_token="test")
+    client._conn_unsafe = mock_connection(mocker)
+
+    batches = list(client.query_batches(metrics=["m"]))
+    assert [len(b) for b in batches] == [2, 1, 3]
+    assert pa.Table.from_batches(batches).equals(TABLE)
+
+
+async def test_async_query_batches(mocker: MockerFixture) -> None:
+    client = AsyncADBCClient(server_host="test", environment_id=0, auth_token="test")
+    conn = mock_connection(mocker)
+    client._conn_unsafe = conn
+
+    batches: List[pa.RecordBatch] = [batch async for batch in client.query_batches(metrics=["m"])]
+    assert [len(b) for b in batches] == [2, 1, 3]
+    assert pa.Table.from_batches(batches).equals(TABLE)
+
+    cursor = conn.cursor.return_value
+    cursor.fetch_arrow_table.assert_not_called()
+    cursor.__exit__.assert_called_once()
+
+
+def mock_pool(mocker: MockerFixture, client: Any) -> List[MagicMock]:
+    """Make the client open mocked connections, returning the context managers it opened them with."""
+    ctxs: List[MagicMock] = []
+
+    def open_connection() -> MagicMock:
+        ctx = MagicMock()
+        ctx.__enter__.return_value = mock_connection(mocker)
+        ctxs.append(ctx)
+        return ctx
+
+    mocker.patch.object(client, "_get_connection_context_manager", side_effect=open_connection)
+    return ctxs
+
+
+def test_sync_pooled_connection(mocker: MockerFixture) -> None:
+    client: Any = SyncADBCClient(server_host="test", environment_id=0, auth_token="test")
+    main_conn = mock_connection(mocker)
+    client._conn_unsafe = main_conn
+    ctxs = mock_pool(mocker, client)
+
+    # sequential borrows reuse the same connection
+    for _ in range(2):
+        with client._pooled_connection():
+            assert client._conn is ctxs[0].__enter__.return_value
+            client.query(metrics=["m"])
+        assert client._conn is main_conn
+    assert len(ctxs) == 1
+    main_conn.cursor.assert_not_called()
+
+    # concurrent borrows each get their own connection
+    barrier = threading.Barrier(3)
+    conns: List[Any] = []
+
+    def borrow() -> None:
+        with client._pooled_connection():
+            conns.append(client._conn)
+            barrier.wait()
+
+    threads = [threading.Thread(target=borrow) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(ctxs) == 3
+    assert len({id(c) for c in conns}) == 3
+
+    client._close_pooled_connections()
+    for ctx in ctxs:
+        ctx.__exit__.assert_called_once()
+
+
+async def test_async_pooled_connection(mocker: MockerFixture) -> None:
+    client: Any = AsyncADBCClient(server_host="test", environment_id=0, auth_token="test")
+    main_conn = mock_connection(mocker)
+    client._conn_unsafe = main_conn
+    ctxs = mock_pool(mocker, client)
+
+    async def query() -> Any:
+        async with client._pooled_connection():
+            await client.query(metrics=["m"])
+            await asyncio.sleep(0.01)
+            return client._conn
+
+    conns = await asyncio.gather(query(), query())
+    assert len(ctxs) == 2
+    assert conns[0] is not conns[1]
+    assert client._conn is main_conn
+    main_conn.cursor.assert_not_called()
+
+    await query()
+    assert len(ctxs) == 2
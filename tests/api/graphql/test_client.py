@@ -1,17 +1,39 @@
+import asyncio
 import base64
+import dataclasses
+import functools
+import hashlib
 import io
-from typing import Any
+import itertools
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type, cast
 from unittest.mock import AsyncMock, MagicMock, call
 
 import pyarrow as pa
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from gql.transport.aiohttp import AIOHTTPTransport
+from gql.transport.exceptions import TransportQueryError
+from gql.transport.requests import RequestsHTTPTransport
+from graphql import DocumentNode, FieldNode, OperationDefinitionNode
 from pytest_mock import MockerFixture
+from requests import Response as RequestsResponse
+from requests.hooks import dispatch_hook
+from typing_extensions import override
 
-from dbtsl.api.graphql.client.asyncio import AsyncGraphQLClient
-from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+import dbtsl.api.graphql.client.base as base_client_module
+from dbtsl.api.graphql.client.asyncio import AsyncGraphQLClient, FastJSONClientResponse
+from dbtsl.api.graphql.client.sync import FastJSONRequestsHTTPTransport, SyncGraphQLClient
 from dbtsl.api.graphql.protocol import GetQueryResultVariables, GraphQLProtocol, ProtocolOperation
-from dbtsl.error import RetryTimeoutError
-from dbtsl.models.query import QueryId, QueryResult, QueryStatus
+from dbtsl.api.shared import fast_json
+from dbtsl.api.shared.query_params import QueryParameters
+from dbtsl.backoff import ExponentialBackoff, PollingStrategy
+from dbtsl.error import QueryFailedError, RetryTimeoutError
+from dbtsl.models.compact import CompactDimension, CompactMetric
+from dbtsl.models.dimension import Dimension
+from dbtsl.models.metric import AsyncMetric, Metric, MetricType
+from dbtsl.models.query import QueryId, QueryResult, QueryStatus, QueryStatusResult
 
 # The following 2 tests are copies of each other since testing the same sync/async functionality is
 # a pain. I should probably find how to fix this later
@@ -46,7 +68,7 @@ async def test_async_query_multiple_pages(mocker: MockerFixture) -> None:
         )
 
     async def run_behavior(op: ProtocolOperation[Any, Any], raw_variables: GetQueryResultVariables) -> QueryResult:
-        return await gqr_behavior(raw_variables["query_id"], raw_variables.get("page_num"))
+        return await gqr_behavior(raw_variables["query_id"], raw_variables.get("page_num", 1))
 
     cq_mock = mocker.patch.object(client, "create_query", return_value=query_id, new_callable=AsyncMock)
 
@@ -67,6 +89,7 @@ async def test_async_query_multiple_pages(mocker: MockerFixture) -> None:
 
     run_mock.assert_has_awaits(
         [
+            call(op=GraphQLProtocol.get_query_status, raw_variables={"query_id": query_id}),
             call(op=GraphQLProtocol.get_query_result, raw_variables={"query_id": query_id, "page_num": 1}),
         ]
     )
@@ -111,7 +134,7 @@ def test_sync_query_multiple_pages(mocker: MockerFixture) -> None:
         )
 
     def run_behavior(op: ProtocolOperation[Any, Any], raw_variables: GetQueryResultVariables) -> QueryResult:
-        return gqr_behavior(raw_variables["query_id"], raw_variables.get("page_num"))
+        return gqr_behavior(raw_variables["query_id"], raw_variables.get("page_num", 1))
 
     cq_mock = mocker.patch.object(client, "create_query", return_value=query_id)
 
@@ -133,6 +156,7 @@ def test_sync_query_multiple_pages(mocker: MockerFixture) -> None:
 
     run_mock.assert_has_calls(
         [
+            call(op=GraphQLProtocol.get_query_status, raw_variables={"query_id": query_id}),
             call(op=GraphQLProtocol.get_query_result, raw_variables={"query_id": query_id, "page_num": 1}),
         ]
     )
@@ -206,3 +230,1136 @@ async def test_async_poll_timeout_includes_status(mocker: MockerFixture) -> None
             await client.query(metrics=["m1"])
 
     assert exc_info.value.status == "COMPILED"
+
+
+class RecordingPolling(PollingStrategy):
+    """A polling strategy which doesn't sleep and remembers what it was told."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self.keys: List[Optional[str]] = []
+        self.durations_ms: List[Tuple[Optional[str], int]] = []
+
+    @override
+    def iter_ms(self, key: Optional[str] = None) -> Iterator[int]:
+        self.keys.append(key)
+        return itertools.repeat(0)
+
+    @override
+    def record(self, key: Optional[str], duration_ms: int) -> None:
+        self.durations_ms.append((key, duration_ms))
+
+
+def _query_result(status: QueryStatus) -> QueryResult:
+    return QueryResult(
+        query_id=QueryId("test-query-id"),
+        status=status,
+        sql=None,
+        error=None,
+        total_pages=1 if status == QueryStatus.SUCCESSFUL else None,
+        arrow_result=None,
+    )
+
+
+def _status_result(status: QueryStatus) -> QueryStatusResult:
+    return QueryStatusResult(query_id=QueryId("test-query-id"), status=status, error=None, total_pages=1)
+
+
+@pytest.mark.parametrize("running_polls", [0, 2])
+def test_sync_poll_records_duration(running_polls: int) -> None:
+    """Test that polling uses the client's strategy, and records how long jobs which weren't done right away took."""
+    strategy = RecordingPolling()
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, polling_strategy=strategy
+    )
+    statuses = [_status_result(QueryStatus.RUNNING)] * running_polls + [_status_result(QueryStatus.SUCCESSFUL)]
+    run_batch = MagicMock(side_effect=[[status] for status in statuses])
+    client._status_poller._run_batch = run_batch
+
+    params: QueryParameters = {"metrics": ["m"]}
+    options = client._status_poll_options(params)
+    status = client._status_poller.wait(QueryId("test-query-id"), **options)
+
+    assert status.status == QueryStatus.SUCCESSFUL
+    assert run_batch.call_count == running_polls + 1
+    assert strategy.keys == [options["key"]]
+    if running_polls == 0:
+        assert strategy.durations_ms == []
+    else:
+        assert len(strategy.durations_ms) == 1
+        key, duration_ms = strategy.durations_ms[0]
+        assert key == options["key"]
+        assert duration_ms >= 0
+
+
+@pytest.mark.filterwarnings("ignore::pytest_mock.PytestMockWarning")
+def test_sync_status_poller_uses_worker_session(mocker: MockerFixture) -> None:
+    """Test that the status poller thread doesn't share the client's main session."""
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    worker_session = MagicMock()
+    gql_client = MagicMock()
+    gql_client.connect_sync.return_value = worker_session
+    mocker.patch.object(client, "_create_gql_client", return_value=gql_client)
+    main_session = MagicMock()
+    mocker.patch.object(client, "_gql").__enter__.return_value = main_session
+    mocker.patch("dbtsl.api.graphql.client.sync.isinstance", return_value=True)
+
+    used_sessions: List[int] = []
+
+    def run_batch(requests: Any) -> List[Any]:
+        used_sessions.append(id(client._gql_session))
+        return [_status_result(QueryStatus.SUCCESSFUL)]
+
+    mocker.patch.object(client, "_run_batch", side_effect=run_batch)
+
+    with client.session():
+        options = client._status_poll_options({"metrics": ["m"]})
+        status = client._status_poller.wait(QueryId("test-query-id"), **options)
+
+    assert status.status == QueryStatus.SUCCESSFUL
+    assert used_sessions == [id(worker_session)]
+    assert id(main_session) not in used_sessions
+    main_session.execute.assert_not_called()
+    gql_client.close_sync.assert_called_once()
+
+
+async def test_async_poll_records_duration() -> None:
+    """Test that polling uses the client's strategy, and records how long jobs took (async)."""
+    strategy = RecordingPolling()
+    client: Any = AsyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, polling_strategy=strategy
+    )
+    client._status_poller._run_batch = AsyncMock(
+        side_effect=[[_status_result(QueryStatus.RUNNING)], [_status_result(QueryStatus.SUCCESSFUL)]],
+    )
+
+    params: QueryParameters = {"metrics": ["m"]}
+    options = client._status_poll_options(params)
+    status = await client._status_poller.wait(QueryId("test-query-id"), **options)
+
+    assert status.status == QueryStatus.SUCCESSFUL
+    assert strategy.keys == [options["key"]]
+    assert [key for key, _ in strategy.durations_ms] == [options["key"]]
+
+
+def test_sync_query_polls_with_query_fingerprint(mocker: MockerFixture) -> None:
+    """Test that queries are polled with their fingerprint as key, so that equivalent queries share it."""
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    mocker.patch.object(client, "create_query", return_value=QueryId("test-query-id"))
+    poll_mock = mocker.patch.object(client._status_poller, "wait", return_value=_query_result(QueryStatus.SUCCESSFUL))
+    mocker.patch.object(client, "_run", return_value=_query_result(QueryStatus.SUCCESSFUL))
+
+    client._create_query_and_wait({"metrics": ["m1"], "group_by": ["gb"]})
+    client._create_query_and_wait({"group_by": ["gb"], "metrics": ["m1"], "read_cache": False})
+
+    keys = [c.kwargs["key"] for c in poll_mock.call_args_list]
+    assert keys[0] is not None
+    assert keys[0] == keys[1]
+
+
+def test_sync_failed_query_does_not_fetch_results() -> None:
+    """Test that a query which failed while being polled for its status raises without fetching any results."""
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, polling_strategy=RecordingPolling()
+    )
+    client.create_query = MagicMock(return_value=QueryId("test-query-id"))
+    failed = QueryStatusResult(
+        query_id=QueryId("test-query-id"), status=QueryStatus.FAILED, error="oops", total_pages=None
+    )
+    client._run = MagicMock(side_effect=[_query_result(QueryStatus.RUNNING), failed])
+
+    with pytest.raises(QueryFailedError):
+        client._create_query_and_wait({"metrics": ["m1"]})
+
+    assert [c.kwargs["op"] for c in client._run.call_args_list] == [GraphQLProtocol.get_query_status] * 2
+
+
+def test_deprecated_backoff_timeout_ms() -> None:
+    """Test that the deprecated `timeout_ms` of `ExponentialBackoff` is converted to seconds."""
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", timeout=60, lazy=False)
+    with pytest.warns(DeprecationWarning):
+        backoff = ExponentialBackoff(base_interval_ms=1, max_interval_ms=1, timeout_ms=1500)
+
+    assert client._poll_timeout_s(backoff) == 1.5
+    assert client._poll_timeout_s(client.polling_strategy) == 60
+
+
+def test_get_document_parses_once_per_lazy_mode(mocker: MockerFixture) -> None:
+    """Test that the parsed GraphQL document is cached per (operation, lazy)."""
+    # `Any` since the client's internals are hidden by its `.pyi` stub
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    gql_spy = mocker.spy(base_client_module, "gql")
+
+    op = GraphQLProtocol.metrics
+    doc = client._get_document(op)
+    assert client._get_document(op) is doc
+    assert gql_spy.call_count == 1
+
+    client.lazy = True
+    lazy_doc = client._get_document(op)
+    assert lazy_doc is not doc
+    assert client._get_document(op) is lazy_doc
+    assert gql_spy.call_count == 2
+
+    client.lazy = False
+    assert client._get_document(op) is doc
+    assert gql_spy.call_count == 2
+
+
+def _page_result(table: pa.Table, query_id: QueryId, page_num: int) -> QueryResult:
+    """Get a `QueryResult` which contains the `page_num`-th row of `table` as its only row."""
+    call_table = table.slice(offset=page_num - 1, length=1)
+
+    byte_stream = io.BytesIO()
+    with pa.ipc.new_stream(byte_stream, call_table.schema) as writer:
+        writer.write_table(call_table)
+
+    return QueryResult(
+        query_id=query_id,
+        status=QueryStatus.SUCCESSFUL,
+        sql=None,
+        error=None,
+        total_pages=len(table),
+        arrow_result=base64.b64encode(byte_stream.getvalue()).decode("utf-8"),
+    )
+
+
+PAGES_TABLE = pa.Table.from_arrays([pa.array(list(range(8)))], names=["page"])
+
+
+@pytest.mark.filterwarnings("ignore::pytest_mock.PytestMockWarning")
+def test_sync_query_fetches_pages_in_worker_threads(mocker: MockerFixture) -> None:
+    """Test that pages get fetched concurrently and in order, by workers whose sessions last for the client session."""
+    client = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False, max_page_workers=3)
+    query_id = QueryId("test-query-id")
+
+    worker_sessions: List[MagicMock] = []
+    worker_clients: List[MagicMock] = []
+
+    def create_gql_client() -> MagicMock:
+        session = MagicMock()
+        worker_sessions.append(session)
+        gql_client = MagicMock()
+        gql_client.connect_sync.return_value = session
+        worker_clients.append(gql_client)
+        return gql_client
+
+    mocker.patch.object(client, "_create_gql_client", side_effect=create_gql_client)
+
+    used_sessions: Set[int] = set()
+
+    def gqr_behavior(query_id: QueryId, page_num: int) -> QueryResult:
+        # make later pages finish first
+        time.sleep((len(PAGES_TABLE) - page_num) * 0.005)
+        used_sessions.add(id(cast(Any, client)._gql_session))
+        return _page_result(PAGES_TABLE, query_id, page_num)
+
+    mocker.patch.object(client, "create_query", return_value=query_id)
+    mocker.patch.object(client, "_run", return_value=_page_result(PAGES_TABLE, query_id, 1))
+    gqr_mock = mocker.patch.object(client, "get_query_result", side_effect=gqr_behavior)
+
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__")
+    mocker.patch("dbtsl.api.graphql.client.sync.isinstance", return_value=True)
+
+    with client.session():
+        result_table = client.query(metrics=["m"])
+        # worker sessions stay open for the next queries of the session
+        for gql_client in worker_clients:
+            gql_client.close_sync.assert_not_called()
+
+        second_table = client.query(metrics=["m"])
+
+    assert result_table.equals(PAGES_TABLE)
+    assert second_table.equals(PAGES_TABLE)
+    assert gqr_mock.call_count == 2 * (len(PAGES_TABLE) - 1)
+
+    assert len(worker_sessions) == 3
+    assert used_sessions == {id(s) for s in worker_sessions}
+    for gql_client in worker_clients:
+        gql_client.close_sync.assert_called_once()
+
+
+@pytest.mark.filterwarnings("ignore::pytest_mock.PytestMockWarning")
+def test_sync_query_single_worker_fetches_sequentially(mocker: MockerFixture) -> None:
+    """Test that no worker pool gets created if `max_page_workers=1`."""
+    client = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False, max_page_workers=1)
+    query_id = QueryId("test-query-id")
+
+    pool_mock = mocker.patch.object(client, "_worker_pool")
+    mocker.patch.object(client, "create_query", return_value=query_id)
+    mocker.patch.object(client, "_run", return_value=_page_result(PAGES_TABLE, query_id, 1))
+    mocker.patch.object(client, "get_query_result", side_effect=functools.partial(_page_result, PAGES_TABLE))
+
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__")
+    mocker.patch("dbtsl.api.graphql.client.sync.isinstance", return_value=True)
+
+    with client.session():
+        result_table = client.query(metrics=["m"])
+
+    assert result_table.equals(PAGES_TABLE)
+    pool_mock.assert_not_called()
+
+
+def test_sync_client_invalid_max_page_workers() -> None:
+    with pytest.raises(ValueError):
+        SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False, max_page_workers=0)
+
+
+@pytest.mark.parametrize("client_concurrency,query_concurrency,expected", [(2, None, 2), (2, 3, 3), (16, None, 7)])
+async def test_async_query_bounds_page_concurrency(
+    mocker: MockerFixture, client_concurrency: int, query_concurrency: Optional[int], expected: int
+) -> None:
+    """Test that at most `page_concurrency` pages are fetched at the same time, and that they're in order."""
+    client = AsyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, page_concurrency=client_concurrency
+    )
+    query_id = QueryId("test-query-id")
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def gqr_behavior(query_id: QueryId, page_num: int) -> QueryResult:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # make later pages finish first
+        await asyncio.sleep((len(PAGES_TABLE) - page_num) * 0.002)
+        in_flight -= 1
+        return _page_result(PAGES_TABLE, query_id, page_num)
+
+    mocker.patch.object(client, "create_query", return_value=query_id, new_callable=AsyncMock)
+    mocker.patch.object(client, "_run", return_value=_page_result(PAGES_TABLE, query_id, 1), new_callable=AsyncMock)
+    mocker.patch.object(client, "get_query_result", new=AsyncMock(side_effect=gqr_behavior))
+
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__", new_callable=AsyncMock)
+    mocker.patch("dbtsl.api.graphql.client.asyncio.isinstance", return_value=True)
+
+    async with client.session():
+        result_table = await client.query(metrics=["m"], page_concurrency=query_concurrency)
+
+    assert result_table.equals(PAGES_TABLE)
+    assert max_in_flight == expected
+
+
+async def test_async_client_invalid_page_concurrency() -> None:
+    with pytest.raises(ValueError):
+        AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False, page_concurrency=0)
+
+
+@pytest.mark.filterwarnings("ignore::pytest_mock.PytestMockWarning")
+@pytest.mark.parametrize("prefetch", [0, 1, 3, 20])
+def test_sync_query_batches(mocker: MockerFixture, prefetch: int) -> None:
+    """Test that `query_batches` yields all pages in order, never fetching more than `prefetch` pages ahead."""
+    client = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    query_id = QueryId("test-query-id")
+
+    mocker.patch.object(client, "_create_gql_client")
+    mocker.patch.object(client, "create_query", return_value=query_id)
+    mocker.patch.object(client, "_run", return_value=_page_result(PAGES_TABLE, query_id, 1))
+    gqr_mock = mocker.patch.object(client, "get_query_result", side_effect=functools.partial(_page_result, PAGES_TABLE))
+
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__")
+    mocker.patch("dbtsl.api.graphql.client.sync.isinstance", return_value=True)
+
+    batches: List[pa.RecordBatch] = []
+    with client.session():
+        for i, batch in enumerate(client.query_batches(metrics=["m"], prefetch=prefetch)):
+            # give workers some time to run ahead, if they were going to
+            time.sleep(0.01)
+            fetched_pages = gqr_mock.call_count + 1
+            assert fetched_pages <= i + 1 + prefetch
+            batches.append(batch)
+
+    assert pa.Table.from_batches(batches).equals(PAGES_TABLE)
+    assert gqr_mock.call_count == len(PAGES_TABLE) - 1
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3, 20])
+async def test_async_query_batches(mocker: MockerFixture, prefetch: int) -> None:
+    """Test that `query_batches` yields all pages in order, never fetching more than `prefetch` pages ahead."""
+    client = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    query_id = QueryId("test-query-id")
+
+    async def gqr_behavior(query_id: QueryId, page_num: int) -> QueryResult:
+        return _page_result(PAGES_TABLE, query_id, page_num)
+
+    mocker.patch.object(client, "create_query", return_value=query_id, new_callable=AsyncMock)
+    mocker.patch.object(client, "_run", return_value=_page_result(PAGES_TABLE, query_id, 1), new_callable=AsyncMock)
+    gqr_mock = mocker.patch.object(client, "get_query_result", new=AsyncMock(side_effect=gqr_behavior))
+
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__", new_callable=AsyncMock)
+    mocker.patch("dbtsl.api.graphql.client.asyncio.isinstance", return_value=True)
+
+    batches: List[pa.RecordBatch] = []
+    async with client.session():
+        i = 0
+        async for batch in client.query_batches(metrics=["m"], prefetch=prefetch):
+            # give background fetches some time to run ahead, if they were going to
+            await asyncio.sleep(0.01)
+            fetched_pages = gqr_mock.await_count + 1
+            assert fetched_pages <= i + 1 + prefetch
+            batches.append(batch)
+            i += 1
+
+    assert pa.Table.from_batches(batches).equals(PAGES_TABLE)
+    assert gqr_mock.await_count == len(PAGES_TABLE) - 1
+
+
+@pytest.mark.parametrize("query_concurrency,expected", [(None, 4), (2, 2)])
+async def test_async_query_batches_bounds_page_concurrency(
+    mocker: MockerFixture, query_concurrency: Optional[int], expected: int
+) -> None:
+    """Test that `query_batches` fetches at most `page_concurrency` pages at the same time, even with more prefetch."""
+    client = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False, page_concurrency=4)
+    query_id = QueryId("test-query-id")
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def gqr_behavior(query_id: QueryId, page_num: int) -> QueryResult:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.002)
+        in_flight -= 1
+        return _page_result(PAGES_TABLE, query_id, page_num)
+
+    mocker.patch.object(client, "create_query", return_value=query_id, new_callable=AsyncMock)
+    mocker.patch.object(client, "_run", return_value=_page_result(PAGES_TABLE, query_id, 1), new_callable=AsyncMock)
+    mocker.patch.object(client, "get_query_result", new=AsyncMock(side_effect=gqr_behavior))
+
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__", new_callable=AsyncMock)
+    mocker.patch("dbtsl.api.graphql.client.asyncio.isinstance", return_value=True)
+
+    async with client.session():
+        batches = [b async for b in client.query_batches(metrics=["m"], prefetch=7, page_concurrency=query_concurrency)]
+        with pytest.raises(ValueError):
+            async for _ in client.query_batches(metrics=["m"], page_concurrency=0):
+                pass
+
+    assert pa.Table.from_batches(batches).equals(PAGES_TABLE)
+    assert max_in_flight == expected
+
+
+async def test_async_query_coalesces_concurrent_queries(mocker: MockerFixture) -> None:
+    """Test that concurrent equivalent queries share a single server-side query."""
+    client = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    query_id = QueryId("test-query-id")
+
+    async def cq_behavior(**_: Any) -> QueryId:
+        await asyncio.sleep(0.01)
+        return query_id
+
+    async def gqr_behavior(query_id: QueryId, page_num: int) -> QueryResult:
+        return _page_result(PAGES_TABLE, query_id, page_num)
+
+    cq_mock = mocker.patch.object(client, "create_query", new=AsyncMock(side_effect=cq_behavior))
+    mocker.patch.object(client, "_run", return_value=_page_result(PAGES_TABLE, query_id, 1), new_callable=AsyncMock)
+    mocker.patch.object(client, "get_query_result", new=AsyncMock(side_effect=gqr_behavior))
+
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__", new_callable=AsyncMock)
+    mocker.patch("dbtsl.api.graphql.client.asyncio.isinstance", return_value=True)
+
+    async with client.session():
+        results = await asyncio.gather(
+            client.query(metrics=["m"], group_by=["a"]),
+            client.query(metrics=["m"], group_by=["a"], page_concurrency=1),
+            client.query(metrics=["m"], group_by=["b"]),
+            client.query(metrics=["m"], group_by=["a"], read_cache=False),
+        )
+
+    assert all(r.equals(PAGES_TABLE) for r in results)
+    assert results[0] is results[1]
+    assert cq_mock.await_count == 3
+
+
+class _ListNamesOperation(ProtocolOperation[Dict[str, Any], List[str]]):
+    """A cacheable operation that doesn't depend on any model."""
+
+    cacheable = True
+
+    @override
+    def render_request_text(self, *, lazy: bool) -> str:
+        return "query listNames($environmentId: BigInt!) { names(environmentId: $environmentId) }"
+
+    @override
+    def get_request_variables(self, environment_id: int, variables: Dict[str, Any]) -> Dict[str, Any]:
+        return {"environmentId": environment_id, **variables}
+
+    @override
+    def parse_response(self, data: Dict[str, Any]) -> List[str]:
+        return list(data["names"])
+
+
+def test_sync_metadata_cache(mocker: MockerFixture) -> None:
+    """Test that responses of cacheable operations are cached per (op, variables, lazy) until they expire."""
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, metadata_cache_ttl=10
+    )
+    session = MagicMock()
+    session.execute.return_value = {"names": ["a", "b"]}
+    client._gql_session_unsafe = session
+
+    now = time.monotonic()
+    mocker.patch.object(base_client_module.time, "monotonic", side_effect=lambda: now)
+
+    op = _ListNamesOperation()
+    assert client._run(op=op, raw_variables={}) == ["a", "b"]
+    assert client._run(op=op, raw_variables={}) == ["a", "b"]
+    assert session.execute.call_count == 1
+
+    client._run(op=op, raw_variables={"x": 1})
+    assert session.execute.call_count == 2
+
+    client.lazy = True
+    client._run(op=op, raw_variables={})
+    assert session.execute.call_count == 3
+    client.lazy = False
+
+    now += 10
+    client._run(op=op, raw_variables={})
+    assert session.execute.call_count == 4
+    client._run(op=op, raw_variables={})
+    assert session.execute.call_count == 4
+
+    client.invalidate_metadata_cache()
+    client._run(op=op, raw_variables={})
+    assert session.execute.call_count == 5
+
+
+def test_sync_metadata_cache_evicts_least_recently_used(mocker: MockerFixture) -> None:
+    """Test that the metadata cache never holds more than `METADATA_CACHE_MAX_ENTRIES` responses."""
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, metadata_cache_ttl=10
+    )
+    mocker.patch.object(client, "METADATA_CACHE_MAX_ENTRIES", 2)
+    session = MagicMock()
+    session.execute.return_value = {"names": ["a"]}
+    client._gql_session_unsafe = session
+
+    op = _ListNamesOperation()
+    client._run(op=op, raw_variables={"x": 1})
+    client._run(op=op, raw_variables={"x": 2})
+    # use x=1 again, so that x=2 is the least recently used
+    client._run(op=op, raw_variables={"x": 1})
+    assert session.execute.call_count == 2
+
+    client._run(op=op, raw_variables={"x": 3})
+    assert len(client._metadata_cache) == 2
+    assert session.execute.call_count == 3
+
+    client._run(op=op, raw_variables={"x": 1})
+    assert session.execute.call_count == 3
+    client._run(op=op, raw_variables={"x": 2})
+    assert session.execute.call_count == 4
+
+
+def test_sync_metadata_cache_returns_copies() -> None:
+    """Test that mutating a list returned by a cacheable operation doesn't change the cached one."""
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, metadata_cache_ttl=10
+    )
+    session = MagicMock()
+    session.execute.return_value = {"names": ["b", "a"]}
+    client._gql_session_unsafe = session
+
+    op = _ListNamesOperation()
+    first = client._run(op=op, raw_variables={})
+    first.append("c")
+    second = client._run(op=op, raw_variables={})
+    second.sort()
+
+    assert client._run(op=op, raw_variables={}) == ["b", "a"]
+    assert session.execute.call_count == 1
+
+
+def test_sync_metadata_cache_skips_non_cacheable_operations() -> None:
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, metadata_cache_ttl=10
+    )
+    session = MagicMock()
+    session.execute.return_value = {"names": []}
+    client._gql_session_unsafe = session
+
+    op = _ListNamesOperation()
+    op.cacheable = False
+    client._run(op=op, raw_variables={})
+    client._run(op=op, raw_variables={})
+    assert session.execute.call_count == 2
+
+
+def test_sync_metadata_cache_disabled_by_default() -> None:
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    session = MagicMock()
+    session.execute.return_value = {"names": []}
+    client._gql_session_unsafe = session
+
+    op = _ListNamesOperation()
+    client._run(op=op, raw_variables={})
+    client._run(op=op, raw_variables={})
+    assert session.execute.call_count == 2
+
+
+async def test_async_metadata_cache() -> None:
+    client: Any = AsyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, metadata_cache_ttl=10
+    )
+    session = MagicMock()
+    session.execute = AsyncMock(return_value={"names": ["a"]})
+    client._gql_session_unsafe = session
+
+    op = _ListNamesOperation()
+    assert await client._run(op=op, raw_variables={}) == ["a"]
+    assert await client._run(op=op, raw_variables={}) == ["a"]
+    assert session.execute.await_count == 1
+
+
+def test_invalid_metadata_cache_ttl() -> None:
+    with pytest.raises(ValueError):
+        SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False, metadata_cache_ttl=0)
+
+
+def _metric(name: str, model: Type[Metric] = Metric) -> Metric:
+    return model(
+        name=name,
+        description=None,
+        type=MetricType.SIMPLE,
+        queryable_granularities=[],
+        queryable_time_granularities=[],
+        label=name,
+        requires_metric_time=False,
+    )
+
+
+def _metadata_response(field: str, metric: str) -> List[Dict[str, Any]]:
+    """Get a fake response for `field` of `metric`."""
+    if field == "dimensions":
+        return [
+            {
+                "name": f"{metric}_dim",
+                "qualifiedName": f"{metric}_dim",
+                "description": None,
+                "type": "CATEGORICAL",
+                "label": None,
+                "isPartition": False,
+                "expr": None,
+                "queryableGranularities": [],
+                "queryableTimeGranularities": [],
+            }
+        ]
+
+    assert field == "measures"
+    return [{"name": f"{metric}_measure", "aggTimeDimension": None, "agg": "SUM", "expr": "1"}]
+
+
+def _fake_metadata_execute(document: DocumentNode, variable_values: Dict[str, Any], **_kwargs: Any) -> Dict[str, Any]:
+    """Behaves like the server for (possibly composite) dimensions and measures requests."""
+    op_def = document.definitions[0]
+    assert isinstance(op_def, OperationDefinitionNode)
+
+    data: Dict[str, Any] = {}
+    for selection in op_def.selection_set.selections:
+        assert isinstance(selection, FieldNode)
+        key = selection.alias.value if selection.alias is not None else selection.name.value
+        prefix = key[: -len(selection.name.value)]
+        (metric,) = variable_values[f"{prefix}metrics"]
+        data[key] = _metadata_response(selection.name.value, metric["name"])
+    return data
+
+
+def test_sync_load_all_batches_requests(mocker: MockerFixture) -> None:
+    """Test that `load_all` loads all fields of all metrics in a single request."""
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    session = MagicMock()
+    session.execute.side_effect = _fake_metadata_execute
+    client._gql_session_unsafe = session
+
+    metrics = [_metric("a"), _metric("b"), _metric("c")]
+    client.load_all(metrics, fields=["dimensions", "measures"])
+
+    assert session.execute.call_count == 1
+    for m in metrics:
+        assert [d.name for d in m.dimensions] == [f"{m.name}_dim"]
+        assert [ms.name for ms in m.measures] == [f"{m.name}_measure"]
+        assert m.dimensions[0]._client_unchecked is client
+
+
+def test_sync_load_all_chunks_and_deduplicates(mocker: MockerFixture) -> None:
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    client.MAX_BATCH_SIZE = 2
+    session = MagicMock()
+    session.execute.side_effect = _fake_metadata_execute
+    client._gql_session_unsafe = session
+
+    # "a" is repeated, so only 5 distinct requests need to be sent, in 3 chunks
+    metrics = [_metric("a"), _metric("b"), _metric("a"), _metric("c"), _metric("d"), _metric("e")]
+    client.load_all(metrics, fields=["dimensions"])
+
+    assert session.execute.call_count == 3
+    assert [[d.name for d in m.dimensions] for m in metrics] == [[f"{m.name}_dim"] for m in metrics]
+
+
+def test_sync_load_all_uses_metadata_cache() -> None:
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=True, metadata_cache_ttl=10
+    )
+    session = MagicMock()
+    session.execute.side_effect = _fake_metadata_execute
+    client._gql_session_unsafe = session
+
+    client.load_all([_metric("a"), _metric("b")], fields=["dimensions"])
+    assert session.execute.call_count == 1
+
+    # a single dimensions request for "a" is served from the cache
+    assert [d.name for d in client.dimensions(metrics=["a"])] == ["a_dim"]
+    client.load_all([_metric("a"), _metric("b")], fields=["dimensions"])
+    assert session.execute.call_count == 1
+
+
+def test_sync_load_all_partial_errors() -> None:
+    """Test that an error in one of the batched operations doesn't prevent the others from loading."""
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+
+    def execute(document: DocumentNode, variable_values: Dict[str, Any]) -> Dict[str, Any]:
+        data = _fake_metadata_execute(document, variable_values)
+        data["op1_dimensions"] = None
+        raise TransportQueryError(
+            "metric not found",
+            errors=[{"message": "metric not found", "path": ["op1_dimensions"]}],
+            data=data,
+        )
+
+    session = MagicMock()
+    session.execute.side_effect = execute
+    client._gql_session_unsafe = session
+
+    metrics = [_metric("a"), _metric("b"), _metric("c")]
+    with pytest.raises(TransportQueryError) as exc_info:
+        client.load_all(metrics, fields=["dimensions"])
+
+    assert exc_info.value.errors == [{"message": "metric not found", "path": ["op1_dimensions"]}]
+    assert [d.name for d in metrics[0].dimensions] == ["a_dim"]
+    assert metrics[1].dimensions == []
+    assert [d.name for d in metrics[2].dimensions] == ["c_dim"]
+
+
+def test_sync_load_all_invalid_field() -> None:
+    client = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    with pytest.raises(ValueError):
+        client.load_all([_metric("a")], fields=["name"])
+
+
+async def test_async_concurrent_loads_are_batched() -> None:
+    """Test that lazy loads started together get sent in a single request."""
+    client: Any = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=_fake_metadata_execute)
+    client._gql_session_unsafe = session
+
+    metrics = [cast(AsyncMetric, _metric(name)) for name in ("a", "b", "c")]
+    for m in metrics:
+        m._client_unchecked = client
+
+    loaded = await asyncio.gather(*(m.load_dimensions() for m in metrics), metrics[0].load_measures())
+
+    assert session.execute.await_count == 1
+    assert [[d.name for d in dims] for dims in loaded[:3]] == [["a_dim"], ["b_dim"], ["c_dim"]]
+    assert [d.name for d in metrics[1].dimensions] == ["b_dim"]
+    assert [ms.name for ms in metrics[0].measures] == ["a_measure"]
+
+    # loads that are awaited one after the other can't be batched
+    await metrics[0].load_dimensions()
+    await metrics[1].load_dimensions()
+    assert session.execute.await_count == 3
+
+
+async def test_async_session_closes_after_errors(mocker: MockerFixture) -> None:
+    """Test that the session can be reopened after its body raised."""
+    client = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__", new_callable=AsyncMock)
+    mocker.patch("dbtsl.api.graphql.client.asyncio.isinstance", return_value=True)
+
+    with pytest.raises(RuntimeError):
+        async with client.session():
+            raise RuntimeError("boom")
+
+    assert not client.has_session
+    async with client.session():
+        assert client.has_session
+
+
+async def test_async_session_stops_background_tasks(mocker: MockerFixture) -> None:
+    """Test that closing the session cancels status polling and lazy loads, instead of leaving them running."""
+    client: Any = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    gql_mock = mocker.patch.object(client, "_gql")
+    mocker.patch.object(gql_mock, "__aenter__", new_callable=AsyncMock)
+    mocker.patch("dbtsl.api.graphql.client.asyncio.isinstance", return_value=True)
+
+    async def hang(_requests: Any) -> List[Any]:
+        await asyncio.Event().wait()
+        return []
+
+    client._status_poller._run_batch = AsyncMock(side_effect=hang)
+    mocker.patch.object(client, "_run_batch", side_effect=hang)
+    metric = cast(AsyncMetric, _metric("a"))
+    metric._client_unchecked = client
+
+    async with client.session():
+        options = client._status_poll_options({"metrics": ["m"]})
+        status = asyncio.ensure_future(client._status_poller.wait(QueryId("test-query-id"), **options))
+        load = asyncio.ensure_future(metric.load_dimensions())
+        await asyncio.sleep(0.01)
+        assert len(client._load_tasks) == 1
+
+    assert client._status_poller._task is None
+    assert len(client._load_tasks) == 0
+    with pytest.raises(asyncio.CancelledError):
+        await status
+    with pytest.raises(asyncio.CancelledError):
+        await load
+
+
+async def test_async_load_all() -> None:
+    client: Any = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=_fake_metadata_execute)
+    client._gql_session_unsafe = session
+
+    metrics = [_metric("a"), _metric("b")]
+    await client.load_all(metrics, fields=["dimensions", "measures"])
+
+    assert session.execute.await_count == 1
+    assert [ms.name for ms in metrics[1].measures] == ["b_measure"]
+
+
+def test_compact_models() -> None:
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=True, compact_models=True
+    )
+    session = MagicMock()
+    session.execute.side_effect = _fake_metadata_execute
+    client._gql_session_unsafe = session
+
+    dimensions = client.dimensions(metrics=["a"])
+    assert type(dimensions[0]) is CompactDimension
+
+    metrics = [_metric(name, CompactMetric) for name in ("a", "b")]
+    client.load_all(metrics, fields=["dimensions", "measures"])
+    assert type(metrics[1].dimensions[0]) is CompactDimension
+    assert [ms.name for ms in metrics[1].measures] == ["b_measure"]
+
+
+def test_metadata_tables() -> None:
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    session = MagicMock()
+    session.execute.side_effect = _fake_metadata_execute
+    client._gql_session_unsafe = session
+
+    table = client.dimensions_table(metrics=["a"])
+    assert table.column_names == [f.name for f in dataclasses.fields(Dimension)]
+    assert table.to_pylist() == [d.to_dict() for d in client.dimensions(metrics=["a"])]
+
+
+@pytest.mark.parametrize("precompile_decoders", [True, False])
+def test_precompile_decoders_on_session_start(mocker: MockerFixture, precompile_decoders: bool) -> None:
+    client = SyncGraphQLClient(
+        server_host="test",
+        environment_id=0,
+        auth_token="test",
+        lazy=False,
+        precompile_decoders=precompile_decoders,
+    )
+    prepare_mock = mocker.patch.object(base_client_module, "prepare_operations")
+    mocker.patch.object(client, "_gql")
+    mocker.patch("dbtsl.api.graphql.client.sync.isinstance", return_value=True)
+
+    with client.session():
+        pass
+
+    if precompile_decoders:
+        prepare_mock.assert_called_once_with(GraphQLProtocol)
+    else:
+        prepare_mock.assert_not_called()
+
+
+def test_sync_transport_decodes_with_fast_json(mocker: MockerFixture) -> None:
+    pytest.importorskip("orjson")
+    loads_spy = mocker.spy(fast_json, "loads")
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    transport: RequestsHTTPTransport = client._create_transport(url="http://test/api/graphql", headers={})
+    assert isinstance(transport, FastJSONRequestsHTTPTransport)
+
+    transport.connect()
+    assert transport.session is not None
+    response = RequestsResponse()
+    response._content = b'{"data": {"metrics": []}}'
+    response = dispatch_hook("response", transport.session.hooks, response)
+
+    assert response.json() == {"data": {"metrics": []}}
+    loads_spy.assert_called_once_with(b'{"data": {"metrics": []}}')
+    transport.close()
+
+
+def test_sync_transport_without_fast_json(mocker: MockerFixture) -> None:
+    mocker.patch.object(fast_json, "FAST_JSON_BACKEND", None)
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    transport: RequestsHTTPTransport = client._create_transport(url="http://test/api/graphql", headers={})
+    assert type(transport) is RequestsHTTPTransport
+
+
+async def test_async_transport_decodes_with_fast_json(mocker: MockerFixture) -> None:
+    pytest.importorskip("orjson")
+    loads_spy = mocker.spy(fast_json, "loads")
+    client: Any = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    transport: AIOHTTPTransport = client._create_transport(url="http://test/api/graphql", headers={})
+    assert transport.client_session_args == {"response_class": FastJSONClientResponse}
+
+    async def handler(_request: web.Request) -> web.Response:
+        return web.Response(body=b' {"data": {"metrics": []}}\n', content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_post("/api/graphql", handler)
+    async with TestServer(app) as server:
+        transport.url = str(server.make_url("/api/graphql"))
+        await transport.connect()
+        try:
+            assert transport.session is not None
+            async with transport.session.post(transport.url) as resp:
+                assert isinstance(resp, FastJSONClientResponse)
+                # this is how gql decodes responses
+                assert await resp.json(content_type=None) == {"data": {"metrics": []}}
+        finally:
+            await transport.close()
+
+    loads_spy.assert_called_once_with(b'{"data": {"metrics": []}}')
+
+
+async def test_async_transport_without_fast_json(mocker: MockerFixture) -> None:
+    mocker.patch.object(fast_json, "FAST_JSON_BACKEND", None)
+    client: Any = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    transport: AIOHTTPTransport = client._create_transport(url="http://test/api/graphql", headers={})
+    assert isinstance(transport, AIOHTTPTransport)
+    assert transport.client_session_args is None
+
+
+@pytest.mark.parametrize("client_cls", [SyncGraphQLClient, AsyncGraphQLClient])
+def test_response_compression_accepts_all_supported_encodings(mocker: MockerFixture, client_cls: Type[Any]) -> None:
+    mocker.patch.object(client_cls, "_supported_encodings", return_value={"deflate", "gzip", "zstd"})
+    client: Any = client_cls(server_host="test", environment_id=0, auth_token="test", lazy=False)
+    assert client._headers["accept-encoding"] == "zstd, gzip, deflate"
+
+
+@pytest.mark.parametrize("client_cls", [SyncGraphQLClient, AsyncGraphQLClient])
+def test_response_compression_disabled(client_cls: Type[Any]) -> None:
+    client: Any = client_cls(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, response_compression=False
+    )
+    assert client._headers["accept-encoding"] == "identity"
+
+
+@pytest.mark.parametrize("client_cls", [SyncGraphQLClient, AsyncGraphQLClient])
+def test_response_compression_specific_encodings(mocker: MockerFixture, client_cls: Type[Any]) -> None:
+    mocker.patch.object(client_cls, "_supported_encodings", return_value={"deflate", "gzip", "br"})
+    client: Any = client_cls(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, response_compression=["gzip", "br"]
+    )
+    assert client._headers["accept-encoding"] == "gzip, br"
+
+
+@pytest.mark.parametrize("client_cls", [SyncGraphQLClient, AsyncGraphQLClient])
+@pytest.mark.parametrize("response_compression", [["zstd"], [], "gzip"])
+def test_response_compression_invalid(mocker: MockerFixture, client_cls: Type[Any], response_compression: Any) -> None:
+    mocker.patch.object(client_cls, "_supported_encodings", return_value={"deflate", "gzip"})
+    with pytest.raises(ValueError):
+        client_cls(
+            server_host="test",
+            environment_id=0,
+            auth_token="test",
+            lazy=False,
+            response_compression=response_compression,
+        )
+
+
+@pytest.mark.parametrize("client_cls", [SyncGraphQLClient, AsyncGraphQLClient])
+def test_supported_encodings_include_stdlib_ones(client_cls: Type[Any]) -> None:
+    assert {"gzip", "deflate"} <= client_cls._supported_encodings()
+
+
+def test_sync_run_many() -> None:
+    """Test that `run_many` runs all operations in a single request, and returns their results in order."""
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    session = MagicMock()
+    session.execute.side_effect = _fake_metadata_execute
+    client._gql_session_unsafe = session
+
+    dimensions, measures = client.run_many([("dimensions", {"metrics": ["a"]}), ("measures", {"metrics": ["b"]})])
+
+    assert session.execute.call_count == 1
+    assert [d.name for d in dimensions] == ["a_dim"]
+    assert [m.name for m in measures] == ["b_measure"]
+    assert dimensions[0]._client_unchecked is client
+
+
+@pytest.mark.parametrize("return_exceptions", [True, False])
+def test_sync_run_many_partial_errors(return_exceptions: bool) -> None:
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+
+    def execute(document: DocumentNode, variable_values: Dict[str, Any]) -> Dict[str, Any]:
+        data = _fake_metadata_execute(document, variable_values)
+        data["op0_dimensions"] = None
+        raise TransportQueryError(
+            "metric not found",
+            errors=[{"message": "metric not found", "path": ["op0_dimensions"]}],
+            data=data,
+        )
+
+    session = MagicMock()
+    session.execute.side_effect = execute
+    client._gql_session_unsafe = session
+
+    requests = [("dimensions", {"metrics": ["a"]}), ("dimensions", {"metrics": ["b"]})]
+    if not return_exceptions:
+        with pytest.raises(TransportQueryError):
+            client.run_many(requests)
+        return
+
+    err, dimensions = client.run_many(requests, return_exceptions=True)
+    assert isinstance(err, TransportQueryError)
+    assert [d.name for d in dimensions] == ["b_dim"]
+
+
+def test_sync_run_many_invalid_operation() -> None:
+    client = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    with pytest.raises(ValueError):
+        client.run_many(["metrics", "not_an_operation"])
+
+
+async def test_async_run_many() -> None:
+    client: Any = AsyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=_fake_metadata_execute)
+    client._gql_session_unsafe = session
+
+    dimensions, measures = await client.run_many([("dimensions", {"metrics": ["a"]}), ("measures", {"metrics": ["b"]})])
+
+    assert session.execute.call_count == 1
+    assert [d.name for d in dimensions] == ["a_dim"]
+    assert [m.name for m in measures] == ["b_measure"]
+
+
+def _persisted_query_hash(op: ProtocolOperation[Any, Any], lazy: bool) -> str:
+    return hashlib.sha256(op.get_request_text(lazy=lazy).encode("utf-8")).hexdigest()
+
+
+def test_sync_persisted_queries() -> None:
+    """Test that queries are sent with their text once, and then only as a hash."""
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=True, persisted_queries=True
+    )
+    session = MagicMock()
+    session.execute.side_effect = _fake_metadata_execute
+    client._gql_session_unsafe = session
+
+    query_hash = _persisted_query_hash(GraphQLProtocol.dimensions, lazy=True)
+    variables = {"environmentId": 0, "metrics": [{"name": "a"}]}
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}
+
+    for _ in range(2):
+        assert [d.name for d in client.dimensions(metrics=["a"])] == ["a_dim"]
+
+    first, second = session.execute.call_args_list
+    assert first.kwargs["extra_args"] == {
+        "json": {
+            "extensions": extensions,
+            "query": GraphQLProtocol.dimensions.get_request_text(lazy=True),
+            "variables": variables,
+        }
+    }
+    assert second.kwargs["extra_args"] == {"json": {"extensions": extensions, "variables": variables}}
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        {"message": "PersistedQueryNotFound"},
+        {"message": "not found", "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}},
+    ],
+)
+def test_sync_persisted_query_miss(error: Dict[str, Any]) -> None:
+    """Test that queries are sent with their text again if the server forgot their hash."""
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=True, persisted_queries=True
+    )
+    client._known_query_hashes.add(_persisted_query_hash(GraphQLProtocol.dimensions, lazy=True))
+
+    def execute(document: DocumentNode, variable_values: Dict[str, Any], extra_args: Dict[str, Any]) -> Any:
+        if "query" not in extra_args["json"]:
+            raise TransportQueryError(error["message"], errors=[error])
+        return _fake_metadata_execute(document, variable_values)
+
+    session = MagicMock()
+    session.execute.side_effect = execute
+    client._gql_session_unsafe = session
+
+    assert [d.name for d in client.dimensions(metrics=["a"])] == ["a_dim"]
+    assert session.execute.call_count == 2
+
+
+def test_sync_persisted_queries_other_errors_are_raised() -> None:
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=True, persisted_queries=True
+    )
+    client._known_query_hashes.add(_persisted_query_hash(GraphQLProtocol.dimensions, lazy=True))
+    session = MagicMock()
+    session.execute.side_effect = TransportQueryError("boom", errors=[{"message": "boom"}])
+    client._gql_session_unsafe = session
+
+    with pytest.raises(TransportQueryError):
+        client.dimensions(metrics=["a"])
+    assert session.execute.call_count == 1
+
+
+def test_sync_persisted_queries_disabled_by_default() -> None:
+    client: Any = SyncGraphQLClient(server_host="test", environment_id=0, auth_token="test", lazy=True)
+    session = MagicMock()
+    session.execute.side_effect = _fake_metadata_execute
+    client._gql_session_unsafe = session
+
+    client.dimensions(metrics=["a"])
+    assert "extra_args" not in session.execute.call_args.kwargs
+
+
+async def test_async_persisted_queries_request_body() -> None:
+    """Test that the aiohttp transport sends the persisted query instead of the document."""
+    bodies: List[Dict[str, Any]] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        bodies.append(await request.json())
+        return web.json_response({"data": {"dimensions": _metadata_response("dimensions", "a")}})
+
+    app = web.Application()
+    app.router.add_post("/api/graphql", handler)
+    async with TestServer(app) as server:
+        client = AsyncGraphQLClient(
+            server_host=f"{server.host}:{server.port}",
+            environment_id=0,
+            auth_token="test",
+            url_format="http://{server_host}/api/graphql",
+            lazy=True,
+            persisted_queries=True,
+        )
+        async with client.session():
+            for _ in range(2):
+                await client.dimensions(metrics=["a"])
+
+    query_hash = _persisted_query_hash(GraphQLProtocol.dimensions, lazy=True)
+    assert [body["extensions"]["persistedQuery"]["sha256Hash"] for body in bodies] == [query_hash, query_hash]
+    assert "query" in bodies[0]
+    assert "query" not in bodies[1]
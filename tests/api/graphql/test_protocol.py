@@ -1,8 +1,17 @@
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Tuple, Type
 
 import pytest
+from pytest_mock import MockerFixture
 
-from dbtsl.api.graphql.protocol import GraphQLProtocol
+from dbtsl.api.graphql.protocol import (
+    CompactGraphQLProtocol,
+    CompositeOperation,
+    GraphQLProtocol,
+    ListDimensionsOperation,
+    get_composite_operation,
+    get_decoder,
+    prepare_operations,
+)
 
 from ...conftest import QueryValidator
 from ...query_test_cases import TEST_QUERIES
@@ -13,7 +22,13 @@ VARIABLES: dict[str, list[dict[str, Any]]] = {
     "measures": [{"metrics": ["m"]}],
     "entities": [{"metrics": ["m"]}],
     "saved_queries": [{}],
+    "metrics_table": [{}],
+    "dimensions_table": [{"metrics": ["m"]}],
+    "measures_table": [{"metrics": ["m"]}],
+    "entities_table": [{"metrics": ["m"]}],
+    "saved_queries_table": [{}],
     "get_query_result": [{"query_id": 1}],
+    "get_query_status": [{"query_id": 1}],
     "create_query": TEST_QUERIES,
     "compile_sql": TEST_QUERIES,
     "environment_info": [{}],
@@ -51,3 +66,139 @@ def test_queries_are_valid(test_case: TestCase, validate_query: QueryValidator)
     query = op.get_request_text(lazy=False)
     variable_values = op.get_request_variables(environment_id=123, variables=raw_variables)
     validate_query(query, variable_values)
+
+
+def test_only_metadata_operations_are_cacheable() -> None:
+    cacheable = {op_name for op_name in VARIABLES if getattr(GraphQLProtocol, op_name).cacheable}
+    assert cacheable == {
+        "metrics",
+        "dimensions",
+        "measures",
+        "entities",
+        "saved_queries",
+        "metrics_table",
+        "dimensions_table",
+        "measures_table",
+        "entities_table",
+        "saved_queries_table",
+    }
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_composite_query_is_valid(validate_query: QueryValidator, lazy: bool) -> None:
+    """Test that merging queries, some of which share fragments, is valid against the server schema."""
+    op = CompositeOperation(
+        [GraphQLProtocol.dimensions, GraphQLProtocol.measures, GraphQLProtocol.dimensions, GraphQLProtocol.metrics]
+    )
+    variables = op.get_request_variables(
+        environment_id=123,
+        variables={"variables": [{"metrics": ["a"]}, {"metrics": ["a"]}, {"metrics": ["b"]}, {}]},
+    )
+    assert variables["op2_metrics"] == [{"name": "b"}]
+    validate_query(op.get_request_text(lazy=lazy), variables)
+
+
+def test_composite_mutation_is_valid(validate_query: QueryValidator) -> None:
+    op = CompositeOperation([GraphQLProtocol.create_query, GraphQLProtocol.compile_sql])
+    variables = op.get_request_variables(environment_id=123, variables={"variables": TEST_QUERIES[:2]})
+    validate_query(op.get_request_text(lazy=False), variables)
+
+
+def test_composite_cannot_mix_queries_and_mutations() -> None:
+    with pytest.raises(ValueError):
+        CompositeOperation([GraphQLProtocol.metrics, GraphQLProtocol.create_query])
+
+
+def test_composite_is_hashable_by_its_operations() -> None:
+    a = CompositeOperation([GraphQLProtocol.dimensions, GraphQLProtocol.measures])
+    b = CompositeOperation([GraphQLProtocol.dimensions, GraphQLProtocol.measures])
+    c = CompositeOperation([GraphQLProtocol.measures, GraphQLProtocol.dimensions])
+    assert a == b
+    assert hash(a) == hash(b)
+    assert a != c
+
+
+def test_composite_operations_are_reused() -> None:
+    ops = (GraphQLProtocol.get_query_status, GraphQLProtocol.get_query_status)
+    op = get_composite_operation(ops)
+    assert get_composite_operation(ops) is op
+    assert get_composite_operation(ops[:1]) is not op
+
+
+def test_composite_split_response() -> None:
+    op = CompositeOperation([GraphQLProtocol.get_query_result, GraphQLProtocol.get_query_result])
+    data = {"op0_query": {"queryId": "a"}, "op1_query": None}
+    errors: List[Dict[str, Any]] = [
+        {"message": "not found", "path": ["op1_query"]},
+        {"message": "global"},
+    ]
+    assert op.split_response(data, errors) == [
+        ({"query": {"queryId": "a"}}, [{"message": "global"}]),
+        ({"query": None}, [{"message": "not found", "path": ["op1_query"]}, {"message": "global"}]),
+    ]
+
+
+def test_decoders_are_reused() -> None:
+    data = {
+        "environmentInfo": {
+            "sqlDialect": "SNOWFLAKE",
+            "hasMetricsDefined": True,
+            "dialect": "SNOWFLAKE",
+            "dialectSupportedBySlg": True,
+        }
+    }
+    GraphQLProtocol.environment_info.parse_response(data)
+    misses = get_decoder.cache_info().misses
+
+    GraphQLProtocol.environment_info.parse_response(data)
+    assert get_decoder.cache_info().misses == misses
+
+
+@pytest.mark.parametrize("protocol", [GraphQLProtocol, CompactGraphQLProtocol])
+def test_prepare_operations(protocol: Type[GraphQLProtocol]) -> None:
+    prepare_operations(protocol)
+    misses = get_decoder.cache_info().misses
+
+    protocol.metrics.parse_response({"metrics": []})
+    protocol.get_query_result.parse_response(
+        {
+            "query": {
+                "queryId": "q",
+                "status": "RUNNING",
+                "sql": None,
+                "error": None,
+                "totalPages": None,
+                "arrowResult": None,
+            }
+        }
+    )
+    assert get_decoder.cache_info().misses == misses
+
+
+def test_request_text_is_rendered_once_per_lazy_mode(mocker: MockerFixture) -> None:
+    op = ListDimensionsOperation()
+    render_spy = mocker.spy(op, "render_request_text")
+
+    text = op.get_request_text(lazy=False)
+    assert op.get_request_text(lazy=False) is text
+    lazy_text = op.get_request_text(lazy=True)
+    assert op.get_request_text(lazy=True) is lazy_text
+
+    assert render_spy.call_count == 2
+    assert op.request_texts == {False: text, True: lazy_text}
+
+
+def test_equal_request_texts_are_shared() -> None:
+    assert CompactGraphQLProtocol.metrics.get_request_text(lazy=False) is GraphQLProtocol.metrics.get_request_text(
+        lazy=False
+    )
+    assert GraphQLProtocol.metrics_table.get_request_text(lazy=True) is GraphQLProtocol.metrics.get_request_text(
+        lazy=True
+    )
+
+
+@pytest.mark.parametrize("protocol", [GraphQLProtocol, CompactGraphQLProtocol])
+def test_prepare_operations_renders_request_texts(protocol: Type[GraphQLProtocol]) -> None:
+    prepare_operations(protocol)
+    for name in VARIABLES:
+        assert set(getattr(protocol, name).request_texts) == {False, True}
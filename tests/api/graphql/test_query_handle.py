@@ -0,0 +1,172 @@
+import base64
+import io
+import time
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock
+
+import pyarrow as pa
+import pytest
+
+from dbtsl.api.graphql.client.asyncio import AsyncGraphQLClient
+from dbtsl.api.graphql.client.query_handle import (
+    as_completed,
+    async_as_completed,
+    async_wait_all,
+    wait_all,
+)
+from dbtsl.api.graphql.client.status_poller import AsyncStatusPoller, SyncStatusPoller
+from dbtsl.api.graphql.client.sync import SyncGraphQLClient
+from dbtsl.api.graphql.protocol import GraphQLProtocol
+from dbtsl.error import QueryFailedError, TimeoutError
+from dbtsl.models.query import QueryId, QueryResult, QueryStatus
+from tests.api.graphql.util import FakeServer, FixedPolling
+
+
+def _table_result(query_id: QueryId) -> QueryResult:
+    """Get a single page of results, whose only row is the query ID."""
+    table = pa.Table.from_arrays([pa.array([query_id])], names=["query_id"])
+    byte_stream = io.BytesIO()
+    with pa.ipc.new_stream(byte_stream, table.schema) as writer:
+        writer.write_table(table)
+
+    return QueryResult(
+        query_id=query_id,
+        status=QueryStatus.SUCCESSFUL,
+        sql=None,
+        error=None,
+        total_pages=1,
+        arrow_result=base64.b64encode(byte_stream.getvalue()).decode("utf-8"),
+    )
+
+
+def _create_query(**params: Any) -> QueryId:
+    return QueryId(params["saved_query"])
+
+
+def _run(op: Any, raw_variables: Dict[str, Any]) -> QueryResult:
+    return _table_result(raw_variables["query_id"])
+
+
+def _sync_client(server: FakeServer) -> Any:
+    """Get a sync client whose queries are named after their saved query, and polled by `server`."""
+    client: Any = SyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, polling_strategy=FixedPolling()
+    )
+    client._status_poller = SyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch)
+    client.create_query = MagicMock(side_effect=_create_query)
+    client._run = MagicMock(side_effect=_run)
+    return client
+
+
+def _async_client(server: FakeServer) -> Any:
+    """Get an asyncio client whose queries are named after their saved query, and polled by `server`."""
+    client: Any = AsyncGraphQLClient(
+        server_host="test", environment_id=0, auth_token="test", lazy=False, polling_strategy=FixedPolling()
+    )
+    client._status_poller = AsyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch_async)
+    client.create_query = AsyncMock(side_effect=_create_query)
+    client._run = AsyncMock(side_effect=_run)
+    return client
+
+
+def test_sync_submit_query_returns_before_query_completes() -> None:
+    server = FakeServer({"a": 1000})
+    client = _sync_client(server)
+
+    handle = client.submit_query(saved_query="a")
+
+    assert handle.query_id == "a"
+    assert not handle.done()
+    assert not handle.wait(timeout=0.05)
+    assert handle.status() == QueryStatus.RUNNING
+
+    server.polls["a"] = 0
+    assert handle.wait(timeout=10)
+    assert handle.status() == QueryStatus.SUCCESSFUL
+    assert handle.result()["query_id"].to_pylist() == ["a"]
+    assert [b.num_rows for b in handle.batches()] == [1]
+
+    # the first page and the table are only fetched once
+    assert handle.result() is handle.result()
+    assert client._run.call_count == 1
+
+
+def test_sync_as_completed_yields_queries_in_completion_order() -> None:
+    server = FakeServer({"a": 10, "b": 1, "c": 5})
+    client = _sync_client(server)
+
+    handles = [client.submit_query(saved_query=q) for q in ("a", "b", "c")]
+
+    assert [h.query_id for h in as_completed(handles)] == ["b", "c", "a"]
+    # the status checks of all the submitted queries shared requests
+    assert max(len(batch) for batch in server.batches) == 3
+
+
+def test_sync_wait_all_timeout() -> None:
+    server = FakeServer({"a": 1, "b": 1000})
+    client = _sync_client(server)
+    a, b = (client.submit_query(saved_query=q) for q in ("a", "b"))
+
+    done, not_done = wait_all([a, b], timeout=0.1)
+
+    assert done == [a]
+    assert not_done == [b]
+    with pytest.raises(TimeoutError):
+        list(as_completed([b], timeout=0.05))
+
+    b.cancel()
+    assert b.done()
+    assert b.wait()
+
+
+def test_sync_failed_query_handle_raises_on_result() -> None:
+    server = FakeServer({"a": 2})
+    server.failed.add("a")
+    client = _sync_client(server)
+
+    handle = client.submit_query(saved_query="a")
+
+    assert handle.wait()
+    assert handle.status() == QueryStatus.FAILED
+    with pytest.raises(QueryFailedError):
+        handle.result()
+    client._run.assert_not_called()
+
+
+async def test_async_submit_query_and_collect_results() -> None:
+    server = FakeServer({"a": 10, "b": 1, "c": 5})
+    client = _async_client(server)
+
+    handles = [await client.submit_query(saved_query=q) for q in ("a", "b", "c")]
+    assert not any(h.done() for h in handles)
+
+    order = [h.query_id async for h in async_as_completed(handles)]
+    assert order == ["b", "c", "a"]
+    assert max(len(batch) for batch in server.batches) == 3
+
+    tables = [await h.result() for h in handles]
+    assert [t["query_id"].to_pylist() for t in tables] == [["a"], ["b"], ["c"]]
+    assert [b.num_rows async for b in handles[0].batches()] == [1]
+
+
+async def test_async_wait_all_timeout() -> None:
+    server = FakeServer({"a": 1, "b": 1000})
+    client = _async_client(server)
+    a = await client.submit_query(saved_query="a")
+    b = await client.submit_query(saved_query="b")
+
+    start = time.monotonic()
+    done, not_done = await async_wait_all([a, b], timeout=0.1)
+
+    assert time.monotonic() - start < 1
+    assert done == [a]
+    assert not_done == [b]
+    assert not await b.wait(timeout=0.01)
+    with pytest.raises(TimeoutError):
+        async for _ in async_as_completed([b], timeout=0.05):
+            pass
+
+    # stop polling for the query, so that the poller stops
+    b.cancel()
+    await client._status_poller._task
+    assert server.polls["b"] > 0
@@ -0,0 +1,206 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional, Sequence
+
+import pytest
+from typing_extensions import override
+
+from dbtsl.api.graphql.client.base import BatchRequest
+from dbtsl.api.graphql.client.status_poller import AsyncStatusPoller, SyncStatusPoller
+from dbtsl.api.graphql.protocol import GraphQLProtocol
+from dbtsl.backoff import ExponentialBackoff
+from dbtsl.error import RetryTimeoutError
+from dbtsl.models.query import QueryId, QueryStatus, QueryStatusResult
+from tests.api.graphql.util import FakeServer, FixedPolling
+
+
+async def test_async_poller_batches_status_checks() -> None:
+    server = FakeServer({"a": 1, "b": 3, "c": 5})
+    poller = AsyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch_async)
+    strategy = FixedPolling()
+
+    results = await asyncio.gather(
+        *(poller.wait(QueryId(q), strategy=strategy, key=q, timeout_s=10) for q in ("a", "b", "c"))
+    )
+
+    assert [r.query_id for r in results] == ["a", "b", "c"]
+    assert all(r.status == QueryStatus.SUCCESSFUL for r in results)
+    assert server.batches == [["a", "b", "c"], ["b", "c"], ["b", "c"], ["c"], ["c"]]
+    # "a" completed on its first poll, so we don't know how long it took
+    assert len(strategy.durations_ms) == 2
+    assert poller._task is None or poller._task.done()
+
+
+async def test_async_poller_polls_new_queries_right_away() -> None:
+    server = FakeServer({"a": 100, "b": 1})
+    poller = AsyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch_async)
+    slow = ExponentialBackoff(base_interval_ms=10_000, max_interval_ms=10_000)
+
+    task = asyncio.ensure_future(poller.wait(QueryId("a"), strategy=slow, key=None, timeout_s=60))
+    await asyncio.sleep(0.05)
+
+    start = time.monotonic()
+    result = await poller.wait(QueryId("b"), strategy=slow, key=None, timeout_s=60)
+    assert result.status == QueryStatus.SUCCESSFUL
+    assert time.monotonic() - start < 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+async def test_async_poller_errors_only_fail_their_query() -> None:
+    server = FakeServer({"a": 2, "b": 2})
+    server.errors["a"] = ValueError("oops")
+    poller = AsyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch_async)
+    strategy = FixedPolling()
+
+    results = await asyncio.gather(
+        poller.wait(QueryId("a"), strategy=strategy, key=None, timeout_s=10),
+        poller.wait(QueryId("b"), strategy=strategy, key=None, timeout_s=10),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], ValueError)
+    assert isinstance(results[1], QueryStatusResult)
+
+
+async def test_async_poller_timeout() -> None:
+    server = FakeServer({"a": 1000})
+    poller = AsyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch_async)
+
+    with pytest.raises(RetryTimeoutError) as exc_info:
+        await poller.wait(QueryId("a"), strategy=FixedPolling(), key=None, timeout_s=0.05)
+
+    assert exc_info.value.status == "RUNNING"
+
+
+def test_sync_poller_batches_status_checks_across_threads() -> None:
+    server = FakeServer({f"q{i}": 5 for i in range(8)})
+    poller = SyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch)
+    strategy = FixedPolling()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [
+            pool.submit(poller.wait, QueryId(q), strategy=strategy, key=None, timeout_s=10) for q in server.polls
+        ]
+        results = [f.result() for f in futures]
+
+    assert all(r.status == QueryStatus.SUCCESSFUL for r in results)
+    # the 8 queries take 5 polls each, so they can't take 40 requests unless they were batched
+    assert len(server.batches) < 40
+    assert max(len(batch) for batch in server.batches) > 1
+
+
+def test_sync_poller_thread_stops_when_idle() -> None:
+    server = FakeServer({"a": 2})
+    poller = SyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch)
+
+    poller.wait(QueryId("a"), strategy=FixedPolling(), key=None, timeout_s=10)
+
+    for _ in range(100):
+        if poller._thread is None:
+            break
+        time.sleep(0.01)
+    assert poller._thread is None
+
+
+def test_sync_poller_timeout() -> None:
+    server = FakeServer({"a": 1000})
+    poller = SyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch)
+
+    with pytest.raises(RetryTimeoutError):
+        poller.wait(QueryId("a"), strategy=FixedPolling(), key=None, timeout_s=0.05)
+
+
+class FinitePolling(FixedPolling):
+    """Poll once more after the first poll, then run out of intervals."""
+
+    @override
+    def iter_ms(self, key: Optional[str] = None) -> Iterator[int]:
+        return iter([10])
+
+
+class FailingRecord(FixedPolling):
+    """Fail when recording how long a query took."""
+
+    @override
+    def record(self, key: Optional[str], duration_ms: int) -> None:
+        raise RuntimeError("can't record")
+
+
+async def test_async_poller_strategy_errors_only_fail_their_query() -> None:
+    server = FakeServer({"a": 5, "b": 2, "c": 3})
+    poller = AsyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch_async)
+
+    results = await asyncio.gather(
+        poller.wait(QueryId("a"), strategy=FinitePolling(), key=None, timeout_s=10),
+        poller.wait(QueryId("b"), strategy=FailingRecord(), key=None, timeout_s=10),
+        poller.wait(QueryId("c"), strategy=FixedPolling(), key=None, timeout_s=10),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], ValueError)
+    assert isinstance(results[1], RuntimeError)
+    assert isinstance(results[2], QueryStatusResult)
+
+    # the poller still works afterwards
+    server.polls["d"] = 2
+    result = await poller.wait(QueryId("d"), strategy=FixedPolling(), key=None, timeout_s=10)
+    assert result.status == QueryStatus.SUCCESSFUL
+
+
+async def test_async_poller_cancelled_task_fails_waiters() -> None:
+    server = FakeServer({"a": 1000})
+    poller = AsyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch_async)
+
+    waiter = poller.submit(QueryId("a"), strategy=FixedPolling(), key=None, timeout_s=10)
+    task = poller._task
+    assert task is not None
+    await asyncio.sleep(0.02)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert waiter.future.cancelled()
+    assert poller._task is None
+
+
+def test_sync_poller_strategy_errors_only_fail_their_query() -> None:
+    server = FakeServer({"a": 5, "b": 2, "c": 3})
+    poller = SyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch)
+
+    waiters = [
+        poller.submit(QueryId("a"), strategy=FinitePolling(), key=None, timeout_s=10),
+        poller.submit(QueryId("b"), strategy=FailingRecord(), key=None, timeout_s=10),
+        poller.submit(QueryId("c"), strategy=FixedPolling(), key=None, timeout_s=10),
+    ]
+
+    with pytest.raises(ValueError):
+        waiters[0].future.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        waiters[1].future.result(timeout=5)
+    assert waiters[2].future.result(timeout=5).status == QueryStatus.SUCCESSFUL
+
+    # the poller still works afterwards
+    server.polls["d"] = 2
+    result = poller.wait(QueryId("d"), strategy=FixedPolling(), key=None, timeout_s=10)
+    assert result.status == QueryStatus.SUCCESSFUL
+
+
+def test_sync_poller_tolerates_concurrent_cancel() -> None:
+    server = FakeServer({"a": 3, "b": 3})
+    poller = SyncStatusPoller(GraphQLProtocol.get_query_status, server.run_batch)
+
+    def cancel_while_polling(requests: Sequence[BatchRequest]) -> List[Any]:
+        # cancel "a" outside of the poller's lock, while its status is being checked
+        waiter_a.future.cancel()
+        return server.run_batch(requests)
+
+    poller._run_batch = cancel_while_polling
+    waiter_a = poller.submit(QueryId("a"), strategy=FixedPolling(), key=None, timeout_s=10)
+    result = poller.wait(QueryId("b"), strategy=FixedPolling(), key=None, timeout_s=10)
+
+    assert waiter_a.future.cancelled()
+    assert result.status == QueryStatus.SUCCESSFUL
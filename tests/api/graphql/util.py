@@ -0,0 +1,52 @@
+import itertools
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+from typing_extensions import override
+
+from dbtsl.api.graphql.client.base import BatchRequest
+from dbtsl.backoff import PollingStrategy
+from dbtsl.models.query import QueryStatus, QueryStatusResult
+
+
+class FixedPolling(PollingStrategy):
+    """Poll every 10ms, and remember the recorded durations."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self.durations_ms: List[int] = []
+
+    @override
+    def iter_ms(self, key: Optional[str] = None) -> Iterator[int]:
+        return itertools.repeat(10)
+
+    @override
+    def record(self, key: Optional[str], duration_ms: int) -> None:
+        self.durations_ms.append(duration_ms)
+
+
+class FakeServer:
+    """Answers batches of status requests, completing each query after some polls."""
+
+    def __init__(self, polls: Dict[str, int]) -> None:  # noqa: D107
+        self.polls = polls
+        self.batches: List[List[str]] = []
+        self.errors: Dict[str, Exception] = {}
+        self.failed: Set[str] = set()
+
+    def run_batch(self, requests: Sequence[BatchRequest]) -> List[Any]:
+        query_ids = [raw_variables["query_id"] for _, raw_variables in requests]
+        self.batches.append(query_ids)
+        results: List[Any] = []
+        for query_id in query_ids:
+            self.polls[query_id] -= 1
+            if query_id in self.errors:
+                results.append(self.errors[query_id])
+                continue
+            if self.polls[query_id] > 0:
+                status = QueryStatus.RUNNING
+            else:
+                status = QueryStatus.FAILED if query_id in self.failed else QueryStatus.SUCCESSFUL
+            results.append(QueryStatusResult(query_id=query_id, status=status, error=None, total_pages=1))
+        return results
+
+    async def run_batch_async(self, requests: Sequence[BatchRequest]) -> List[Any]:
+        return self.run_batch(requests)
@@ -0,0 +1,43 @@
+import importlib
+import sys
+from typing import Iterator, Union
+
+import pytest
+from pytest_mock import MockerFixture
+
+from dbtsl.api.shared import fast_json
+
+DOCUMENT = '{"data": {"metrics": [{"name": "m\\u00e9trique", "value": 1.5, "tags": [null, true]}]}}'
+EXPECTED = {"data": {"metrics": [{"name": "métrique", "value": 1.5, "tags": [None, True]}]}}
+
+
+@pytest.fixture
+def stdlib_fast_json(mocker: MockerFixture) -> Iterator[None]:
+    """Reload `fast_json` as if no fast backend was installed."""
+    mocker.patch.dict(sys.modules, {"orjson": None})
+    importlib.reload(fast_json)
+    yield
+    mocker.stopall()
+    importlib.reload(fast_json)
+
+
+def test_backend_is_orjson_when_installed() -> None:
+    pytest.importorskip("orjson")
+    assert fast_json.FAST_JSON_BACKEND == "orjson"
+
+
+@pytest.mark.parametrize("document", [DOCUMENT, DOCUMENT.encode("utf-8")])
+def test_loads(document: Union[str, bytes]) -> None:
+    assert fast_json.loads(document) == EXPECTED
+
+
+@pytest.mark.usefixtures("stdlib_fast_json")
+@pytest.mark.parametrize("document", [DOCUMENT, DOCUMENT.encode("utf-8")])
+def test_loads_falls_back_to_stdlib(document: Union[str, bytes]) -> None:
+    assert fast_json.FAST_JSON_BACKEND is None
+    assert fast_json.loads(document) == EXPECTED
+
+
+def test_loads_invalid_document() -> None:
+    with pytest.raises(ValueError):
+        fast_json.loads(b'{"data": ')
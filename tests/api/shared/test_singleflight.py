@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import pytest
+
+from dbtsl.api.shared.singleflight import AsyncSingleFlight, SyncSingleFlight
+
+
+def test_sync_single_flight_coalesces_concurrent_calls() -> None:
+    flights = SyncSingleFlight()
+    release = threading.Event()
+    calls: List[int] = []
+
+    def fn() -> int:
+        calls.append(1)
+        release.wait()
+        return 42
+
+    n_threads = 8
+    started = threading.Barrier(n_threads + 1)
+
+    def call() -> int:
+        started.wait()
+        return flights.do("k", fn)
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        futures = [pool.submit(call) for _ in range(n_threads)]
+        started.wait()
+        # give every thread time to join the call in flight
+        time.sleep(0.1)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert results == [42] * n_threads
+    assert len(calls) == 1
+    assert len(flights) == 0
+
+
+def test_sync_single_flight_sequential_calls_are_not_shared() -> None:
+    flights = SyncSingleFlight()
+    calls: List[int] = []
+
+    def fn() -> int:
+        calls.append(1)
+        return len(calls)
+
+    assert flights.do("k", fn) == 1
+    assert flights.do("k", fn) == 2
+
+
+def test_sync_single_flight_propagates_exception() -> None:
+    flights = SyncSingleFlight()
+
+    def fn() -> int:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flights.do("k", fn)
+    assert len(flights) == 0
+
+
+async def test_async_single_flight_coalesces_concurrent_calls() -> None:
+    flights = AsyncSingleFlight()
+    calls: List[int] = []
+
+    async def fn() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flights.do("k", fn) for _ in range(8)), flights.do("other", fn))
+    assert results == [42] * 9
+    assert len(calls) == 2
+    assert len(flights) == 0
+
+
+async def test_async_single_flight_propagates_exception() -> None:
+    flights = AsyncSingleFlight()
+
+    async def fn() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flights.do("k", fn), flights.do("k", fn), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert results[0] is results[1]
+
+
+async def test_async_single_flight_cancelling_a_waiter_does_not_cancel_the_call() -> None:
+    flights = AsyncSingleFlight()
+
+    async def fn() -> int:
+        await asyncio.sleep(0.01)
+        return 42
+
+    leader = asyncio.ensure_future(flights.do("k", fn))
+    follower = asyncio.ensure_future(flights.do("k", fn))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == 42
+    with pytest.raises(asyncio.CancelledError):
+        await leader
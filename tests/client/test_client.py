@@ -0,0 +1,307 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Dict, Generator, List
+from unittest.mock import AsyncMock, MagicMock
+
+import pyarrow as pa
+import pytest
+from pytest_mock import MockerFixture
+
+from dbtsl.api.shared.query_params import OrderByMetric, QueryParameters
+from dbtsl.backoff import AdaptivePolling
+from dbtsl.cache import InMemoryResultCache
+from dbtsl.client.asyncio import AsyncSemanticLayerClient
+from dbtsl.client.sync import SyncSemanticLayerClient
+
+TABLE = pa.table({"a": [1, 2, 3]})
+
+
+# The clients' internals are hidden by their `.pyi` stubs, so these helpers take `Any`
+def mock_adbc_query(mocker: MockerFixture, client: Any, **kwargs: Any) -> MagicMock:
+    """Mock the ADBC client's `query`, and pretend that a session is open."""
+    client._has_session = True
+    return mocker.patch.object(client._adbc, "query", **kwargs)
+
+
+def query_key(client: Any, params: QueryParameters) -> str:
+    return client._query_key(params)
+
+
+def test_sync_query_without_cache(mocker: MockerFixture) -> None:
+    client = SyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+    adbc_query = mock_adbc_query(mocker, client, return_value=TABLE)
+
+    assert client.query(metrics=["m"]) is TABLE
+    assert client.query(metrics=["m"]) is TABLE
+    assert adbc_query.call_count == 2
+
+
+@pytest.mark.parametrize("client_cls", [SyncSemanticLayerClient, AsyncSemanticLayerClient])
+async def test_client_forwards_polling_strategy(client_cls: Any) -> None:
+    strategy = AdaptivePolling()
+    client = client_cls(environment_id=0, auth_token="test", host="test", polling_strategy=strategy)
+    assert client._gql.polling_strategy is strategy
+
+
+def test_sync_query_requires_session() -> None:
+    client = SyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+    with pytest.raises(ValueError):
+        client.query(metrics=["m"])
+
+
+def test_sync_query_uses_cache(mocker: MockerFixture) -> None:
+    client = SyncSemanticLayerClient(
+        environment_id=0,
+        auth_token="test",
+        host="test",
+        result_cache=InMemoryResultCache(),
+    )
+    adbc_query = mock_adbc_query(mocker, client, return_value=TABLE)
+
+    assert client.query(metrics=["m"], group_by=["d"]) is TABLE
+    assert client.query(metrics=["m"], group_by=["d"]) is TABLE
+    assert adbc_query.call_count == 1
+
+    # different query
+    client.query(metrics=["m"], group_by=["d"], limit=1)
+    assert adbc_query.call_count == 2
+
+    # read_cache=False bypasses the lookup but refreshes the cache
+    fresh = pa.table({"a": [4]})
+    adbc_query.return_value = fresh
+    assert client.query(metrics=["m"], group_by=["d"], read_cache=False) is fresh
+    assert adbc_query.call_count == 3
+    assert client.query(metrics=["m"], group_by=["d"]) is fresh
+    assert adbc_query.call_count == 3
+
+
+def test_sync_query_cache_key_includes_environment(mocker: MockerFixture) -> None:
+    cache = InMemoryResultCache()
+    client_a = SyncSemanticLayerClient(environment_id=1, auth_token="test", host="test", result_cache=cache)
+    client_b = SyncSemanticLayerClient(environment_id=2, auth_token="test", host="test", result_cache=cache)
+    assert query_key(client_a, {"metrics": ["m"]}) != query_key(client_b, {"metrics": ["m"]})
+
+
+async def test_async_query_uses_cache(mocker: MockerFixture) -> None:
+    client = AsyncSemanticLayerClient(
+        environment_id=0,
+        auth_token="test",
+        host="test",
+        result_cache=InMemoryResultCache(),
+    )
+    adbc_query = mock_adbc_query(mocker, client, new=AsyncMock(return_value=TABLE))
+
+    assert await client.query(metrics=["m"]) is TABLE
+    assert await client.query(metrics=["m"]) is TABLE
+    assert adbc_query.await_count == 1
+
+    await client.query(metrics=["m"], read_cache=False)
+    assert adbc_query.await_count == 2
+
+
+def test_sync_query_coalesces_concurrent_queries(mocker: MockerFixture) -> None:
+    client = SyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+
+    release = threading.Event()
+
+    def slow_query(**_: object) -> "pa.Table":
+        release.wait()
+        return TABLE
+
+    adbc_query = mock_adbc_query(mocker, client, side_effect=slow_query)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(client.query, metrics=["m"], order_by=["m"]) for _ in range(3)]
+        futures.append(pool.submit(client.query, metrics=["m"], order_by=[OrderByMetric(name="m")]))
+        time.sleep(0.1)
+        release.set()
+        assert all(f.result() is TABLE for f in futures)
+
+    assert adbc_query.call_count == 1
+
+
+async def test_async_query_coalesces_concurrent_queries(mocker: MockerFixture) -> None:
+    client = AsyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+
+    async def slow_query(**_: object) -> "pa.Table":
+        await asyncio.sleep(0.01)
+        return TABLE
+
+    adbc_query = mock_adbc_query(mocker, client, new=AsyncMock(side_effect=slow_query))
+
+    results = await asyncio.gather(*(client.query(metrics=["m"]) for _ in range(4)))
+    assert all(r is TABLE for r in results)
+    assert adbc_query.await_count == 1
+
+    # read_cache=False always runs its own query
+    await asyncio.gather(client.query(metrics=["m"]), client.query(metrics=["m"], read_cache=False))
+    assert adbc_query.await_count == 3
+
+
+def failing_query(**params: Any) -> "pa.Table":
+    """Pretend to query, failing for the metric named "bad"."""
+    if params["metrics"] == ["bad"]:
+        raise ValueError("bad metric")
+    return pa.table({"metric": params["metrics"]})
+
+
+class PoolCounter:
+    """Count how many pooled connections get borrowed, and how many at the same time."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self.lock = threading.Lock()
+        self.borrowed = 0
+        self.in_use = 0
+        self.max_in_use = 0
+
+    def enter(self) -> None:
+        with self.lock:
+            self.borrowed += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def exit(self) -> None:
+        with self.lock:
+            self.in_use -= 1
+
+    @contextmanager
+    def sync(self) -> Generator[None, None, None]:
+        self.enter()
+        try:
+            time.sleep(0.01)
+            yield
+        finally:
+            self.exit()
+
+    @asynccontextmanager
+    async def async_(self) -> AsyncGenerator[None, None]:
+        self.enter()
+        try:
+            await asyncio.sleep(0.01)
+            yield
+        finally:
+            self.exit()
+
+
+def test_sync_query_many(mocker: MockerFixture) -> None:
+    client: Any = SyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+    mock_adbc_query(mocker, client, side_effect=failing_query)
+    pool = PoolCounter()
+    mocker.patch.object(client._adbc, "_pooled_connection", side_effect=pool.sync)
+
+    params: List[Dict[str, Any]] = [{"metrics": [f"m{i}"]} for i in range(10)]
+    params[3] = {"metrics": ["bad"]}
+    results = client.query_many(params, max_concurrency=3)
+
+    assert isinstance(results[3], ValueError)
+    assert [r["metric"].to_pylist() for i, r in enumerate(results) if i != 3] == [
+        [f"m{i}"] for i in range(10) if i != 3
+    ]
+    assert pool.borrowed == 10
+    assert 1 < pool.max_in_use <= 3
+
+    with pytest.raises(ValueError):
+        client.query_many(params, return_exceptions=False)
+
+
+def test_sync_query_many_without_adbc(mocker: MockerFixture) -> None:
+    """Test that queries which go through GraphQL run on a GraphQL worker session of their own."""
+    client: Any = SyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+    client._has_session = True
+    client._method_map["query"] = "graphql"
+    mocker.patch.object(client._gql, "query", return_value=TABLE)
+    pool = PoolCounter()
+    mocker.patch.object(client._gql, "_worker_session", side_effect=pool.sync)
+    pooled = mocker.patch.object(client._adbc, "_pooled_connection")
+
+    results = client.query_many([{"metrics": [f"m{i}"]} for i in range(4)], max_concurrency=2)
+
+    assert results == [TABLE] * 4
+    assert pool.borrowed == 4
+    pooled.assert_not_called()
+
+
+def test_sync_query_many_preflight() -> None:
+    client = SyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+    with pytest.raises(ValueError):
+        client.query_many([{"metrics": ["m"]}])
+
+    client_any: Any = client
+    client_any._has_session = True
+    with pytest.raises(ValueError):
+        client.query_many([{"metrics": ["m"]}], max_concurrency=0)
+    assert client.query_many([]) == []
+
+
+async def test_async_query_many(mocker: MockerFixture) -> None:
+    client: Any = AsyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+
+    async def query(**params: Any) -> "pa.Table":
+        await asyncio.sleep(0.01)
+        return failing_query(**params)
+
+    mock_adbc_query(mocker, client, new=AsyncMock(side_effect=query))
+    pool = PoolCounter()
+    mocker.patch.object(client._adbc, "_pooled_connection", side_effect=pool.async_)
+
+    params: List[Dict[str, Any]] = [{"metrics": [f"m{i}"]} for i in range(10)]
+    params[3] = {"metrics": ["bad"]}
+    results = await client.query_many(params, max_concurrency=3)
+
+    assert isinstance(results[3], ValueError)
+    assert [r["metric"].to_pylist() for i, r in enumerate(results) if i != 3] == [
+        [f"m{i}"] for i in range(10) if i != 3
+    ]
+    assert pool.borrowed == 10
+    assert pool.max_in_use == 3
+
+    with pytest.raises(ValueError):
+        await client.query_many(params, return_exceptions=False)
+
+
+async def test_async_query_many_without_adbc(mocker: MockerFixture) -> None:
+    """Test that queries which go through GraphQL don't borrow ADBC connections."""
+    client: Any = AsyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+    client._has_session = True
+    client._method_map["query"] = "graphql"
+    gql_query = mocker.patch.object(client._gql, "query", new=AsyncMock(return_value=TABLE))
+    pooled = mocker.patch.object(client._adbc, "_pooled_connection")
+
+    results = await client.query_many([{"metrics": ["a"]}, {"metrics": ["b"]}])
+
+    assert results == [TABLE, TABLE]
+    assert gql_query.await_count == 2
+    pooled.assert_not_called()
+
+
+async def test_async_query_many_keeps_connection_of_shared_query(mocker: MockerFixture) -> None:
+    """Test that cancelling `query_many` doesn't release a connection still used by an equivalent query."""
+    client: Any = AsyncSemanticLayerClient(environment_id=0, auth_token="test", host="test")
+    release = asyncio.Event()
+
+    async def query(**params: Any) -> "pa.Table":
+        await release.wait()
+        return TABLE
+
+    mock_adbc_query(mocker, client, new=AsyncMock(side_effect=query))
+    pool = PoolCounter()
+    mocker.patch.object(client._adbc, "_pooled_connection", side_effect=pool.async_)
+
+    many = asyncio.ensure_future(client.query_many([{"metrics": ["m"]}]))
+    await asyncio.sleep(0.05)
+    # this shares the query started by `query_many`
+    shared = asyncio.ensure_future(client.query(metrics=["m"]))
+    await asyncio.sleep(0)
+
+    many.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await many
+    assert pool.in_use == 1
+
+    release.set()
+    assert await shared is TABLE
+    assert pool.in_use == 0
+    assert pool.borrowed == 1
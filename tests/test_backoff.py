@@ -0,0 +1,103 @@
+import itertools
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+from dbtsl.backoff import AdaptivePolling, ExponentialBackoff
+
+
+def take(backoff: ExponentialBackoff, n: int) -> List[int]:
+    return list(itertools.islice(backoff.iter_ms(), n))
+
+
+def test_exponential_backoff() -> None:
+    backoff = ExponentialBackoff(base_interval_ms=100, max_interval_ms=300, exp_factor=2)
+    assert take(backoff, 4) == [100, 200, 300, 300]
+
+
+def test_exponential_backoff_first_intervals() -> None:
+    backoff = ExponentialBackoff(base_interval_ms=100, max_interval_ms=1000, exp_factor=2, first_intervals_ms=(10, 20))
+    assert take(backoff, 4) == [10, 20, 100, 200]
+
+
+def test_exponential_backoff_full_jitter() -> None:
+    random.seed(0)
+    backoff = ExponentialBackoff(base_interval_ms=100, max_interval_ms=1000, exp_factor=2, jitter="full")
+    intervals = take(backoff, 100)
+    exponential = take(ExponentialBackoff(base_interval_ms=100, max_interval_ms=1000, exp_factor=2), 100)
+    assert all(50 <= jittered <= exp for jittered, exp in zip(intervals, exponential))
+    assert len(set(intervals)) > 1
+
+
+def test_exponential_backoff_full_jitter_floor() -> None:
+    random.seed(0)
+    backoff = ExponentialBackoff(
+        base_interval_ms=100, max_interval_ms=1000, exp_factor=2, jitter="full", min_jitter_ms=90
+    )
+    assert all(90 <= jittered for jittered in take(backoff, 100))
+
+    # the floor never makes intervals longer than their exponential value
+    backoff = ExponentialBackoff(
+        base_interval_ms=10, max_interval_ms=1000, exp_factor=1, jitter="full", min_jitter_ms=90
+    )
+    assert take(backoff, 3) == [10, 10, 10]
+
+
+def test_exponential_backoff_decorrelated_jitter() -> None:
+    random.seed(0)
+    backoff = ExponentialBackoff(base_interval_ms=100, max_interval_ms=1000, jitter="decorrelated")
+    intervals = take(backoff, 100)
+    previous = 100
+    for interval in intervals:
+        assert 100 <= interval <= min(previous * 3, 1000)
+        previous = interval
+    assert len(set(intervals)) > 1
+
+
+def test_exponential_backoff_invalid_jitter() -> None:
+    with pytest.raises(ValueError):
+        ExponentialBackoff(base_interval_ms=100, max_interval_ms=1000, jitter="half")  # type: ignore
+
+
+def test_adaptive_polling_falls_back_for_unknown_keys() -> None:
+    fallback = ExponentialBackoff(base_interval_ms=100, max_interval_ms=1000, exp_factor=2)
+    polling = AdaptivePolling(fallback)
+    polling.record("other", 500)
+
+    assert list(itertools.islice(polling.iter_ms("key"), 3)) == [100, 200, 400]
+    assert list(itertools.islice(polling.iter_ms(None), 3)) == [100, 200, 400]
+
+
+def test_adaptive_polling_waits_for_expected_duration() -> None:
+    fallback = ExponentialBackoff(base_interval_ms=100, max_interval_ms=1000, exp_factor=2)
+    polling = AdaptivePolling(fallback, smoothing=0.5)
+    polling.record("key", 1000)
+    polling.record("key", 2000)
+
+    assert polling.expected_duration_ms("key") == 1500
+    assert list(itertools.islice(polling.iter_ms("key"), 3)) == [1500, 100, 200]
+
+
+def test_adaptive_polling_ignores_unknown_key() -> None:
+    polling = AdaptivePolling()
+    polling.record(None, 1000)
+    assert polling.expected_duration_ms("None") is None
+
+
+def test_adaptive_polling_forgets_least_recently_completed() -> None:
+    polling = AdaptivePolling(max_keys=2)
+    polling.record("a", 100)
+    polling.record("b", 100)
+    polling.record("a", 100)
+    polling.record("c", 100)
+
+    assert polling.expected_duration_ms("a") is not None
+    assert polling.expected_duration_ms("b") is None
+    assert polling.expected_duration_ms("c") is not None
+
+
+@pytest.mark.parametrize("kwargs", [{"smoothing": 0}, {"smoothing": 1.5}, {"max_keys": 0}])
+def test_adaptive_polling_invalid_args(kwargs: Dict[str, Any]) -> None:
+    with pytest.raises(ValueError):
+        AdaptivePolling(**kwargs)
@@ -0,0 +1,181 @@
+import os
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from dbtsl.cache import DiskResultCache, InMemoryResultCache
+
+
+def table(n_rows: int) -> "pa.Table":
+    return pa.table({"a": pa.array(range(n_rows), type=pa.int64())})
+
+
+def test_in_memory_cache_get_put() -> None:
+    cache = InMemoryResultCache()
+    t = table(10)
+
+    assert cache.get("k") is None
+    cache.put("k", t)
+    assert cache.get("k") is t
+    assert cache.total_bytes == t.nbytes
+
+
+def test_in_memory_cache_evicts_lru() -> None:
+    t = table(10)
+    cache = InMemoryResultCache(max_bytes=2 * t.nbytes)
+
+    cache.put("a", t)
+    cache.put("b", t)
+    # touch "a" so "b" becomes the least recently used
+    assert cache.get("a") is t
+    cache.put("c", t)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is t
+    assert cache.get("c") is t
+    assert cache.total_bytes == 2 * t.nbytes
+
+
+def test_in_memory_cache_skips_tables_larger_than_max_bytes() -> None:
+    small = table(1)
+    cache = InMemoryResultCache(max_bytes=small.nbytes)
+    cache.put("small", small)
+    cache.put("big", table(100))
+
+    assert cache.get("big") is None
+    assert cache.get("small") is small
+
+
+def test_in_memory_cache_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    cache = InMemoryResultCache(ttl_s=10)
+    cache.put("k", table(1))
+
+    now += 9
+    assert cache.get("k") is not None
+
+    now += 1
+    assert cache.get("k") is None
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
+
+
+def test_in_memory_cache_invalidate() -> None:
+    cache = InMemoryResultCache()
+    cache.put("a", table(1))
+    cache.put("b", table(1))
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+    cache.invalidate()
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
+
+
+def test_in_memory_cache_invalid_options() -> None:
+    with pytest.raises(ValueError):
+        InMemoryResultCache(max_bytes=-1)
+
+    with pytest.raises(ValueError):
+        InMemoryResultCache(ttl_s=0)
+
+
+def test_disk_cache_get_put(tmp_path: Path) -> None:
+    cache = DiskResultCache(tmp_path / "cache")
+    t = table(10)
+
+    assert cache.get("k") is None
+    cache.put("k", t)
+    assert cache.get("k").equals(t)  # pyright: ignore[reportOptionalMemberAccess]
+
+    # no temporary files are left behind
+    assert [p.suffix for p in (tmp_path / "cache").iterdir()] == [DiskResultCache.SUFFIX]
+
+
+def test_disk_cache_get_is_zero_copy(tmp_path: Path) -> None:
+    cache = DiskResultCache(tmp_path)
+    cache.put("k", table(100_000))
+
+    allocated_before = pa.total_allocated_bytes()
+    cached = cache.get("k")
+    assert cached is not None
+    assert len(cached) == 100_000
+    assert pa.total_allocated_bytes() - allocated_before < 1024
+
+
+def test_disk_cache_shared_between_instances(tmp_path: Path) -> None:
+    t = table(10)
+    DiskResultCache(tmp_path).put("k", t)
+    assert DiskResultCache(tmp_path).get("k").equals(t)  # pyright: ignore[reportOptionalMemberAccess]
+
+
+def test_disk_cache_evicts_lru(tmp_path: Path) -> None:
+    t = table(1000)
+    file_size = _put_and_get_size(tmp_path / "probe", t)
+    cache = DiskResultCache(tmp_path / "cache", max_bytes=2 * file_size)
+
+    cache.put("a", t)
+    cache.put("b", t)
+    # make "b" the least recently used
+    os.utime(cache._path("b"), (0, time.time()))
+    cache.put("c", t)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_disk_cache_get_bumps_access_time(tmp_path: Path) -> None:
+    cache = DiskResultCache(tmp_path)
+    cache.put("k", table(1))
+    path = cache._path("k")
+    os.utime(path, (0, 1000))
+
+    assert cache.get("k") is not None
+    stat = path.stat()
+    assert stat.st_atime > 1000
+    assert stat.st_mtime == 1000
+
+
+def test_disk_cache_ttl(tmp_path: Path) -> None:
+    cache = DiskResultCache(tmp_path, ttl_s=10)
+    cache.put("k", table(1))
+    assert cache.get("k") is not None
+
+    written_at = time.time() - 11
+    os.utime(cache._path("k"), (written_at, written_at))
+    assert cache.get("k") is None
+    assert not cache._path("k").exists()
+
+
+def test_disk_cache_corrupted_file(tmp_path: Path) -> None:
+    cache = DiskResultCache(tmp_path)
+    cache._path("k").write_bytes(b"not arrow")
+
+    assert cache.get("k") is None
+    assert not cache._path("k").exists()
+
+
+def test_disk_cache_invalidate(tmp_path: Path) -> None:
+    cache = DiskResultCache(tmp_path)
+    cache.put("a", table(1))
+    cache.put("b", table(1))
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+    cache.invalidate()
+    assert list(tmp_path.iterdir()) == []
+
+
+def _put_and_get_size(directory: Path, t: "pa.Table") -> int:
+    cache = DiskResultCache(directory)
+    cache.put("k", t)
+    return cache._path("k").stat().st_size
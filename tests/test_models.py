@@ -1,11 +1,16 @@
+import base64
 import dataclasses as dc
 import inspect
+import io
+import pickle
 import warnings
 from enum import Enum
 from typing import List, Optional, Union
 
+import pyarrow as pa
 import pytest
 from mashumaro.codecs.basic import decode
+from pytest_mock import MockerFixture
 from typing_extensions import override
 
 import dbtsl.models as ALL_EXPORTED_MODELS
@@ -18,11 +23,16 @@ from dbtsl.api.shared.query_params import (
     OrderByMetric,
     QueryParameters,
     SavedQueryQueryParametersStrict,
+    query_fingerprint,
     validate_order_by,
     validate_query_parameters,
 )
-from dbtsl.models.base import BaseModel, DeprecatedMixin, FlexibleEnumMeta, GraphQLFragmentMixin
+from dbtsl.models import Metric
+from dbtsl.models.arrow import decode_to_table, model_arrow_type
+from dbtsl.models.base import BaseModel, DeprecatedMixin, FlexibleEnumMeta, GraphQLFragmentMixin, compact_model
 from dbtsl.models.base import snake_case_to_camel_case as stc
+from dbtsl.models.compact import CompactDimension, CompactMetric
+from dbtsl.models.query import QueryId, QueryResult, QueryStatus, _decode_base64
 
 
 def test_snake_case_to_camel_case() -> None:
@@ -267,6 +277,126 @@ def test_attr_deprecation_warning() -> None:
         assert msg == str(w[0].message)
 
 
+def test_attr_deprecation_warning_mutable() -> None:
+    msg = "i am deprecated too :("
+
+    @dc.dataclass
+    class MyMutableClassWithDeprecatedField(BaseModel):
+        its_fine: bool
+        oh_no: bool = dc.field(metadata={BaseModel.DEPRECATED: msg})
+
+    BaseModel._register_subclasses()
+
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+
+        m = MyMutableClassWithDeprecatedField(its_fine=True, oh_no=False)
+        m.oh_no = True
+        m.its_fine = False
+        assert len(w) == 0
+
+        assert m.oh_no
+        assert len(w) == 1
+        assert msg == str(w[0].message)
+
+        assert m == MyMutableClassWithDeprecatedField.from_dict({"itsFine": False, "ohNo": True})
+
+    # non-deprecated fields are plain attributes, without any per-access checks
+    assert "__getattribute__" not in BaseModel.__dict__
+    assert "its_fine" not in MyMutableClassWithDeprecatedField.__dict__
+
+
+METRIC_DATA = {
+    "name": "m",
+    "description": None,
+    "type": "SIMPLE",
+    "queryableGranularities": [],
+    "queryableTimeGranularities": ["day"],
+    "label": "M",
+    "requiresMetricTime": False,
+    "dimensions": [
+        {
+            "name": "d",
+            "qualifiedName": "m__d",
+            "description": None,
+            "type": "TIME",
+            "label": None,
+            "isPartition": False,
+            "expr": None,
+            "queryableGranularities": [],
+            "queryableTimeGranularities": ["day"],
+        }
+    ],
+    "measures": [],
+    "entities": [],
+}
+
+
+def test_compact_model_decoding() -> None:
+    metric = decode(METRIC_DATA, CompactMetric)
+    assert type(metric) is CompactMetric
+    assert type(metric.dimensions[0]) is CompactDimension
+    assert metric.dimensions[0].qualified_name == "m__d"
+    assert metric.to_dict() == decode(METRIC_DATA, Metric).to_dict()
+    assert metric == CompactMetric.from_dict(METRIC_DATA)
+    assert pickle.loads(pickle.dumps(metric)) == metric
+
+
+def test_compact_model_is_slotted() -> None:
+    metric = decode(METRIC_DATA, CompactMetric)
+    assert not hasattr(metric, "__dict__")
+    with pytest.raises(AttributeError):
+        metric.not_a_field = True  # type: ignore
+
+    # same fields, lazy loading methods and GraphQL type as the original model
+    assert [f.name for f in dc.fields(CompactMetric)] == [f.name for f in dc.fields(Metric)]
+    assert CompactMetric._lazy_loadable_fields == Metric._lazy_loadable_fields
+    assert callable(getattr(metric, "load_dimensions"))
+    assert CompactMetric.gql_model_name() == "Metric"
+    assert compact_model(Metric) is CompactMetric
+
+
+def test_compact_model_deprecated_field() -> None:
+    BaseModel._register_subclasses()
+
+    metric = decode(METRIC_DATA, CompactMetric)
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+
+        _ = metric.queryable_time_granularities
+        assert len(w) == 0
+
+        metric.queryable_granularities = []
+        assert metric.queryable_granularities == []
+        assert len(w) == 1
+        assert issubclass(w[0].category, DeprecationWarning)
+
+
+def test_decode_to_table() -> None:
+    table = decode_to_table([METRIC_DATA, {**METRIC_DATA, "name": "n", "dimensions": []}], Metric)
+
+    assert table.schema == pa.schema(list(model_arrow_type(Metric)))
+    assert table.column_names[:3] == ["name", "description", "type"]
+    assert table.column("name").to_pylist() == ["m", "n"]
+    assert table.column("type").to_pylist() == ["SIMPLE", "SIMPLE"]
+    assert table.column("dimensions").to_pylist() == [
+        [decode(METRIC_DATA, Metric).dimensions[0].to_dict()],
+        [],
+    ]
+    assert table.column("measures").to_pylist() == [[], []]
+
+
+def test_decode_to_table_missing_fields() -> None:
+    data = {k: v for k, v in METRIC_DATA.items() if k not in ("dimensions", "measures", "entities")}
+    table = decode_to_table([data], Metric)
+    # fields that weren't in the response, like lazy fields, are null
+    assert table.column("dimensions").to_pylist() == [None]
+
+    empty = decode_to_table([], Metric)
+    assert empty.num_rows == 0
+    assert empty.schema == table.schema
+
+
 def test_validate_order_by_params_passthrough_OrderByMetric() -> None:
     i = OrderByMetric(name="asdf", descending=True)
     r = validate_order_by([], [], i)
@@ -404,3 +534,85 @@ def test_validate_missing_query_params_group_by_param() -> None:
     }
     with pytest.raises(ValueError):
         validate_query_parameters(p)
+
+
+def test_query_fingerprint_ignores_read_cache() -> None:
+    a = validate_query_parameters({"metrics": ["a"], "group_by": ["b"], "read_cache": True})
+    b = validate_query_parameters({"metrics": ["a"], "group_by": ["b"], "read_cache": False})
+    assert query_fingerprint(a) == query_fingerprint(b)
+
+
+def test_query_fingerprint_normalizes_order_by() -> None:
+    a = validate_query_parameters({"metrics": ["a"], "group_by": ["b"], "order_by": ["-a", "b"]})
+    b = validate_query_parameters(
+        {
+            "metrics": ["a"],
+            "group_by": ["b"],
+            "order_by": [OrderByMetric(name="a", descending=True), OrderByGroupBy(name="b", grain=None)],
+        }
+    )
+    assert query_fingerprint(a) == query_fingerprint(b)
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        {"metrics": ["b"]},
+        {"metrics": ["a"], "limit": 1},
+        {"metrics": ["a"], "where": ["1=1"]},
+        {"metrics": ["a"], "group_by": [GroupByParam(name="b", grain=None, type=GroupByType.DIMENSION)]},
+        {"metrics": ["a"], "group_by": [GroupByParam(name="b", grain=None, type=GroupByType.ENTITY)]},
+        {"saved_query": "a"},
+    ],
+)
+def test_query_fingerprint_differs(other: QueryParameters) -> None:
+    base = validate_query_parameters({"metrics": ["a"]})
+    assert query_fingerprint(base) != query_fingerprint(validate_query_parameters(other))
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 5, 29, 30, 31, 32, 100])
+def test_decode_base64_chunked(mocker: MockerFixture, size: int) -> None:
+    """Make sure chunked base64 decoding matches the stdlib, including across chunk boundaries and padding."""
+    mocker.patch("dbtsl.models.query._BASE64_CHUNK_SIZE", 8)
+    data = bytes(range(size))
+    encoded = base64.b64encode(data).decode("ascii")
+
+    assert _decode_base64(encoded) == data
+
+
+def test_decode_base64_non_canonical() -> None:
+    """Make sure base64 that can't be decoded in chunks still works."""
+    assert _decode_base64("aGVs\nbG8=") == b"hello"
+
+
+def test_query_result_table_drops_base64() -> None:
+    """Make sure the base64 payload is released once the table is decoded."""
+    table = pa.Table.from_arrays([pa.array([1, 2, 3])], names=["a"])
+    stream = io.BytesIO()
+    with pa.ipc.new_stream(stream, table.schema) as writer:
+        writer.write_table(table)
+
+    qr = QueryResult(
+        query_id=QueryId("id"),
+        status=QueryStatus.SUCCESSFUL,
+        sql=None,
+        error=None,
+        total_pages=1,
+        arrow_result=base64.b64encode(stream.getvalue()).decode("ascii"),
+    )
+
+    assert qr.result_table.equals(table)
+    assert qr.arrow_result is None
+    # cached, doesn't need arrow_result anymore
+    assert qr.result_table.equals(table)
+
+
+def test_decode_base64_line_breaks_multiple_of_4(mocker: MockerFixture) -> None:
+    """Make sure base64 with line breaks still works when chunks don't line up with groups of 4 chars."""
+    mocker.patch("dbtsl.models.query._BASE64_CHUNK_SIZE", 8)
+    data = bytes(range(30))
+    b64 = base64.b64encode(data).decode("ascii")
+    encoded = b64[:6] + "\n\n" + b64[6:22] + "\n\n" + b64[22:]
+    assert len(encoded) % 4 == 0
+
+    assert _decode_base64(encoded) == data